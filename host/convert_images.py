@@ -0,0 +1,256 @@
+# convert_images.py (Version 0.1.0 - Convert images to Inky Pack frame files)
+# Turns ordinary images into 296x128 1-bpp frame files in the exact byte layout of the
+# Pico's framebuffer (see panel_format.py), so picture mode only has to copy bytes.
+# Resizing and dithering are vectorised with NumPy; directories are converted in
+# parallel across a process pool.
+#
+# Reading PNG/JPEG/etc. uses Pillow if installed; without it only PGM/PPM/PBM
+# (netpbm) inputs are supported. NumPy is always required.
+#
+# Usage (from the repository root):
+#   python host/convert_images.py photos/ -o pictures/                  # every image in a directory
+#   python host/convert_images.py cat.jpg --dither ordered --fit fill -o pictures/
+#   python host/convert_images.py photos/ -o pictures/ --preview         # also write .png previews
+#   python host/convert_images.py photos/ -o pictures/ --compress        # .rle frames (see frame_encoder.py)
+#   python host/convert_images.py photos/ --benchmark                    # images/sec, serial vs pool
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import frame_encoder
+import panel_format
+from panel_format import WIDTH, HEIGHT
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".bmp", ".webp", ".pgm", ".ppm", ".pbm")
+FRAME_EXTENSION = ".bin"
+COMPRESSED_EXTENSION = ".rle"
+
+# 8x8 Bayer threshold matrix, normalised to (0, 1)
+_BAYER_2 = np.array([[0, 2], [3, 1]])
+_BAYER_8 = _BAYER_2
+for _ in range(2):
+    _BAYER_8 = np.block([[4 * _BAYER_8, 4 * _BAYER_8 + 2], [4 * _BAYER_8 + 3, 4 * _BAYER_8 + 1]])
+BAYER_THRESHOLDS = (_BAYER_8 + 0.5) / 64
+
+
+# --- Loading ---
+
+def load_greyscale(path):
+    """Loads an image as a float32 (height, width) array of luminance in 0..1."""
+    if Image is not None:
+        with Image.open(path) as image:
+            return np.asarray(image.convert("L"), dtype=np.float32) / 255
+    return _load_netpbm(path)
+
+
+def _load_netpbm(path):
+    """Minimal binary netpbm reader (P4 bitmap, P5 greyscale, P6 colour)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    fields = []
+    position = 0
+    while len(fields) < (3 if data[:2] == b"P4" else 4):
+        while data[position:position + 1].isspace():
+            position += 1
+        if data[position:position + 1] == b"#":
+            position = data.index(b"\n", position)
+            continue
+        end = position
+        while not data[end:end + 1].isspace():
+            end += 1
+        fields.append(data[position:end])
+        position = end
+    position += 1 # Single whitespace byte before the raster
+    magic, width, height = fields[0], int(fields[1]), int(fields[2])
+    if magic == b"P4":
+        rows = np.frombuffer(data, dtype=np.uint8, offset=position).reshape(height, -1)
+        return 1 - np.unpackbits(rows, axis=1)[:, :width].astype(np.float32)
+    max_value = float(fields[3])
+    raster = np.frombuffer(data, dtype=np.uint8 if max_value < 256 else ">u2", offset=position)
+    if magic == b"P5":
+        return raster.reshape(height, width).astype(np.float32) / max_value
+    if magic == b"P6":
+        rgb = raster.reshape(height, width, 3).astype(np.float32) / max_value
+        return rgb @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    raise ValueError(f"{path}: unsupported image format (install Pillow for PNG/JPEG)")
+
+
+# --- Resizing ---
+
+def _box_weights(source_size, target_size, offset, span):
+    """
+    Returns a (target_size, source_size) matrix averaging source pixels into target
+    pixels, mapping the source range [offset, offset + span) onto the target.
+    """
+    edges = offset + np.arange(target_size + 1) * (span / target_size)
+    lower = np.clip(edges[:-1, np.newaxis], np.arange(source_size), np.arange(source_size) + 1)
+    upper = np.clip(edges[1:, np.newaxis], np.arange(source_size), np.arange(source_size) + 1)
+    weights = np.maximum(upper - lower, 0)
+    return (weights / np.maximum(weights.sum(axis=1, keepdims=True), 1e-9)).astype(np.float32)
+
+
+def resize(grey, fit="fit"):
+    """
+    Resizes a greyscale array to the panel's HEIGHT x WIDTH with area averaging.
+    fit="fit" keeps the whole image and pads with white, fit="fill" crops to fill the panel.
+    """
+    height, width = grey.shape
+    scale = min(WIDTH / width, HEIGHT / height) if fit == "fit" else max(WIDTH / width, HEIGHT / height)
+    out_width = max(1, min(WIDTH, round(width * scale)))
+    out_height = max(1, min(HEIGHT, round(height * scale)))
+    # Source range covered by the output (the centre part when cropping)
+    span_x, span_y = out_width / scale, out_height / scale
+    rows = _box_weights(height, out_height, (height - span_y) / 2, span_y)
+    columns = _box_weights(width, out_width, (width - span_x) / 2, span_x)
+    scaled = rows @ grey @ columns.T
+
+    canvas = np.ones((HEIGHT, WIDTH), dtype=np.float32)
+    top, left = (HEIGHT - out_height) // 2, (WIDTH - out_width) // 2
+    canvas[top:top + out_height, left:left + out_width] = scaled
+    return canvas
+
+
+# --- Dithering ---
+
+def dither_threshold(grey):
+    return (grey >= 0.5).astype(np.uint8)
+
+
+def dither_ordered(grey):
+    """Ordered (8x8 Bayer) dithering, fully vectorised."""
+    height, width = grey.shape
+    thresholds = np.tile(BAYER_THRESHOLDS, (height // 8 + 1, width // 8 + 1))[:height, :width]
+    return (grey > thresholds).astype(np.uint8)
+
+
+def dither_floyd_steinberg(grey):
+    """
+    Floyd-Steinberg error diffusion, vectorised along anti-diagonal wavefronts.
+    Pixel (y, x) only depends on pixels with a smaller x + 2y, so every pixel with
+    the same x + 2y can be processed in one NumPy step.
+    """
+    height, width = grey.shape
+    # One column of padding each side and a row below, so edge pixels need no special cases
+    work = np.zeros((height + 1, width + 2), dtype=np.float32)
+    work[:height, 1:width + 1] = grey
+    out = np.zeros((height, width), dtype=np.uint8)
+    all_rows = np.arange(height)
+    for step in range(width + 2 * (height - 1)):
+        xs = step - 2 * all_rows
+        on_wavefront = (xs >= 0) & (xs < width)
+        ys, xs = all_rows[on_wavefront], xs[on_wavefront]
+        columns = xs + 1
+        old = work[ys, columns]
+        new = (old >= 0.5).astype(np.float32)
+        out[ys, xs] = new
+        error = old - new
+        work[ys, columns + 1] += error * (7 / 16)
+        work[ys + 1, columns - 1] += error * (3 / 16)
+        work[ys + 1, columns] += error * (5 / 16)
+        work[ys + 1, columns + 1] += error * (1 / 16)
+    return out
+
+
+DITHERERS = {
+    "fs": dither_floyd_steinberg,
+    "ordered": dither_ordered,
+    "threshold": dither_threshold,
+}
+
+
+# --- Conversion ---
+
+def convert_image(path, dither="fs", fit="fit", invert=False):
+    """Converts one image file into packed frame bytes."""
+    grey = resize(load_greyscale(path), fit)
+    if invert:
+        grey = 1 - grey
+    return panel_format.pack(DITHERERS[dither](grey))
+
+
+def _convert_job(job):
+    """Process pool worker: converts one file and writes the frame (and optional preview)."""
+    source, destination, dither, fit, invert, preview = job
+    frame = convert_image(source, dither, fit, invert)
+    if destination:
+        with open(destination, "wb") as f:
+            f.write(frame_encoder.encode(frame) if destination.endswith(COMPRESSED_EXTENSION) else frame)
+        if preview:
+            panel_format.save_image(os.path.splitext(destination)[0] + ".png", panel_format.unpack(frame))
+    return source
+
+
+def find_images(inputs):
+    """Expands files and directories into a sorted list of image paths."""
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.extend(os.path.join(item, name) for name in sorted(os.listdir(item))
+                         if name.lower().endswith(IMAGE_EXTENSIONS))
+        else:
+            paths.append(item)
+    return paths
+
+
+def convert_all(paths, out_dir, dither="fs", fit="fit", invert=False, preview=False, workers=None, compress=False):
+    """Converts images in parallel. Returns the number converted."""
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    extension = COMPRESSED_EXTENSION if compress else FRAME_EXTENSION
+    jobs = [(path,
+             os.path.join(out_dir, os.path.splitext(os.path.basename(path))[0] + extension) if out_dir else None,
+             dither, fit, invert, preview)
+            for path in paths]
+    if workers == 1:
+        return len([_convert_job(job) for job in jobs])
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return len(list(pool.map(_convert_job, jobs, chunksize=4)))
+
+
+def benchmark(paths, dither, fit, repeat, workers):
+    """Prints conversion throughput (images/sec), serial and across the process pool."""
+    jobs = paths * repeat
+    print(f"{len(jobs)} conversions ({len(paths)} images x {repeat}), dither={dither}, fit={fit}")
+    for label, pool_workers in (("serial", 1), (f"pool ({workers or os.cpu_count()} workers)", workers)):
+        start = time.perf_counter()
+        convert_all(jobs, None, dither, fit, workers=pool_workers)
+        elapsed = time.perf_counter() - start
+        print(f"  {label:<22} {len(jobs) / elapsed:8.1f} images/sec")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert images to Inky Pack frame files.")
+    parser.add_argument("inputs", nargs="+", help="Image files and/or directories of images")
+    parser.add_argument("-o", "--out", default="pictures", help="Output directory for the frames")
+    parser.add_argument("--dither", default="fs", choices=sorted(DITHERERS), help="Dithering method")
+    parser.add_argument("--fit", default="fit", choices=("fit", "fill"), help="Letterbox (fit) or crop (fill)")
+    parser.add_argument("--invert", action="store_true", help="Invert black and white")
+    parser.add_argument("--compress", action="store_true", help="Write run-length compressed .rle frames")
+    parser.add_argument("--preview", action="store_true", help="Also write a .png preview next to each frame")
+    parser.add_argument("--workers", type=int, help="Process pool size (default: CPU count, 1 = no pool)")
+    parser.add_argument("--benchmark", action="store_true", help="Measure throughput instead of writing frames")
+    parser.add_argument("--repeat", type=int, default=5, help="Benchmark: convert each image this many times")
+    args = parser.parse_args()
+
+    paths = find_images(args.inputs)
+    if not paths:
+        sys.exit("No images found.")
+    if args.benchmark:
+        benchmark(paths, args.dither, args.fit, args.repeat, args.workers)
+        return
+    count = convert_all(paths, args.out, args.dither, args.fit, args.invert, args.preview, args.workers, args.compress)
+    print(f"Converted {count} image(s) into {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# fake_ntp_server.py (Version 0.1.0 - Local NTP stand-in server for testing the NTP client)
+# Answers NTP client requests on a local UDP port with the host clock plus a chosen
+# offset, after an optional delay (the server-side hold time shows up as t3 - t2, so it
+# doesn't count against the client's measured round trip, unlike a real network delay,
+# which it adds with latency). A server with a large offset plays a "falseticker".
+# run_app.py starts a few of these and points config.toml's [ntp] servers at them.
+#
+# Usage (standalone, e.g. against a Pico W on the same network):
+#   python host/fake_ntp_server.py --port 1123 --offset 0.35
+#
+# Then set servers = "<host ip>:1123" in the Pico's config.toml.
+
+import argparse
+import socket
+import struct
+import threading
+import time
+
+NTP_DELTA = 2208988800 # 1900 to 1970
+
+
+def ntp_timestamp(seconds):
+    """Unix seconds as an NTP (seconds, fraction) pair."""
+    seconds += NTP_DELTA
+    whole = int(seconds)
+    return whole & 0xFFFFFFFF, int((seconds - whole) * (1 << 32)) & 0xFFFFFFFF
+
+
+class FakeNtpServer:
+    """
+    An NTP server on 127.0.0.1 (or host) answering from a background thread.
+    offset: seconds added to the host clock; hold: seconds between receiving and answering;
+    latency: extra seconds of (symmetric) network delay; stratum 0 sends kiss-o'-death replies.
+    """
+    def __init__(self, host="127.0.0.1", port=0, offset=0.0, hold=0.0, latency=0.0, stratum=2):
+        self.offset = offset
+        self.hold = hold
+        self.latency = latency
+        self.stratum = stratum
+        self.requests = 0
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((host, port))
+        self.address = "{}:{}".format(*self.sock.getsockname())
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def close(self):
+        self.sock.close()
+
+    def _serve(self):
+        while True:
+            try:
+                request, client = self.sock.recvfrom(512)
+            except OSError:
+                return # Closed
+            time.sleep(self.latency / 2)
+            received = time.time() + self.offset
+            if len(request) < 48 or request[0] & 0x07 != 3:
+                continue
+            self.requests += 1
+            time.sleep(self.hold)
+            reply = struct.pack(
+                "!BBbbII4s",
+                0x24,           # LI 0, version 4, mode 4 (server)
+                self.stratum,
+                6,              # Poll interval (2**6 s)
+                -20,            # Precision (about 1 us)
+                0, 0,           # Root delay, root dispersion
+                b"HOST",        # Reference ID
+            )
+            reply += struct.pack("!II", *ntp_timestamp(received)) # Reference timestamp
+            reply += request[40:48]                               # Originate = client's transmit timestamp
+            reply += struct.pack("!II", *ntp_timestamp(received))
+            time.sleep(self.latency / 2)
+            reply += struct.pack("!II", *ntp_timestamp(time.time() + self.offset - self.latency / 2))
+            try:
+                self.sock.sendto(reply, client)
+            except OSError:
+                return
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local NTP stand-in server.")
+    parser.add_argument("--host", default="0.0.0.0", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=1123, help="UDP port (123 needs root)")
+    parser.add_argument("--offset", type=float, default=0.0, help="Seconds added to the host clock")
+    parser.add_argument("--hold", type=float, default=0.0, help="Seconds to hold each request before answering")
+    parser.add_argument("--latency", type=float, default=0.0, help="Extra round-trip seconds")
+    args = parser.parse_args()
+
+    server = FakeNtpServer(args.host, args.port, args.offset, args.hold, args.latency).start()
+    print(f"NTP stand-in on {server.address}, offset {args.offset:+.3f} s")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
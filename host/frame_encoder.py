@@ -0,0 +1,192 @@
+# frame_encoder.py (Version 0.1.0 - Compressed frame encoder and codec benchmark)
+# Encodes raw frame files (.bin) into the run-length format decoded on the Pico by
+# src/frame_codec.py (the format is documented there), and benchmarks the pair.
+#
+# Usage (from the repository root):
+#   python host/frame_encoder.py pictures/*.bin                # writes pictures/*.rle
+#   python host/frame_encoder.py pictures/ --benchmark         # ratio + speed, verifies round trips
+#   python host/frame_encoder.py                               # round-trip check on generated frames
+
+import argparse
+import io
+import os
+import random
+import struct
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+from frame_codec import FrameDecoder, MAGIC, VERSION, MAX_LITERAL, MAX_COPY, MAX_RUN, COPY_DISTANCE
+from framebuffer import BUFFER_SIZE
+
+def encode(data):
+    """
+    Encodes raw frame bytes into the compressed format.
+    At each position the token that saves the most bytes is chosen greedily
+    (white run, value run or column copy); otherwise the byte joins a literal.
+    """
+    out = bytearray(MAGIC)
+    out += struct.pack("<BH", VERSION, len(data))
+    literal_start = 0
+    i = 0
+    size = len(data)
+    while i < size:
+        value = data[i]
+        run = 1
+        while i + run < size and data[i + run] == value and run < MAX_RUN:
+            run += 1
+        copy = 0
+        if i >= COPY_DISTANCE:
+            while i + copy < size and data[i + copy] == data[i + copy - COPY_DISTANCE] and copy < MAX_COPY:
+                copy += 1
+
+        # Bytes saved by each token, compared with storing the bytes as literals
+        run_saving = run - (2 if value == 0xFF else 3)
+        copy_saving = copy - 1
+        if max(run_saving, copy_saving) <= 0:
+            i += 1
+            continue
+        _flush_literal(out, data, literal_start, i)
+        if copy_saving >= run_saving:
+            out.append(0x40 | (copy - 1))
+            i += copy
+        else:
+            length = run - 1
+            if value == 0xFF:
+                out += bytes((0x80 | (length >> 8), length & 0xFF))
+            else:
+                out += bytes((0xC0 | (length >> 8), length & 0xFF, value))
+            i += run
+        literal_start = i
+    _flush_literal(out, data, literal_start, size)
+    return bytes(out)
+
+
+def _flush_literal(out, data, start, end):
+    """Appends data[start:end] as literal tokens."""
+    while start < end:
+        count = min(MAX_LITERAL, end - start)
+        out.append(count - 1)
+        out += data[start:start + count]
+        start += count
+
+
+def decode(compressed):
+    """Decodes compressed bytes with the device decoder (for checks on the host)."""
+    f = io.BytesIO(compressed)
+    decoder = FrameDecoder()
+    size = decoder.read_header(f)
+    f.seek(0)
+    out = bytearray(size)
+    decoder.decode(f, out)
+    return bytes(out)
+
+
+def find_frames(inputs):
+    """Expands files and directories into a sorted list of .bin frame paths."""
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.extend(os.path.join(item, name) for name in sorted(os.listdir(item)) if name.endswith(".bin"))
+        else:
+            paths.append(item)
+    return paths
+
+
+def benchmark(paths, repeat):
+    """Prints per-frame compression ratio and encode/decode speed, verifying every round trip."""
+    decoder = FrameDecoder()
+    total_raw = total_compressed = 0
+    encode_seconds = decode_seconds = 0.0
+    print(f"{'frame':<32} {'raw':>6} {'rle':>6} {'ratio':>6}")
+    for path in paths:
+        with open(path, "rb") as f:
+            raw = f.read()
+        start = time.perf_counter()
+        for _ in range(repeat):
+            compressed = encode(raw)
+        encode_seconds += time.perf_counter() - start
+
+        out = bytearray(len(raw))
+        start = time.perf_counter()
+        for _ in range(repeat):
+            decoder.decode(io.BytesIO(compressed), out)
+        decode_seconds += time.perf_counter() - start
+        if bytes(out) != raw:
+            sys.exit(f"Round trip mismatch for {path}")
+
+        total_raw += len(raw)
+        total_compressed += len(compressed)
+        print(f"{os.path.basename(path):<32} {len(raw):>6} {len(compressed):>6} {len(raw) / len(compressed):>6.1f}")
+    frames = len(paths) * repeat
+    print(f"total ratio {total_raw / total_compressed:.1f}x, all {len(paths)} round trips OK")
+    print(f"encode {frames / encode_seconds:.0f} frames/sec, decode {frames / decode_seconds:.0f} frames/sec (host CPython)")
+
+
+def test_frames(seed=1):
+    """
+    Generated frames covering each token type and the limits between them:
+    returns a list of (name, bytes), all BUFFER_SIZE long.
+    """
+    rng = random.Random(seed)
+    column = bytes(rng.getrandbits(8) for _ in range(COPY_DISTANCE))
+    mixed = bytearray()
+    while len(mixed) < BUFFER_SIZE:
+        kind = rng.randrange(5)
+        if kind == 0:   # White run, sometimes longer than MAX_RUN
+            mixed += b"\xff" * rng.choice((1, 2, 3, 200, MAX_RUN + 5))
+        elif kind == 1: # Value run
+            mixed += bytes((rng.getrandbits(8),)) * rng.randrange(1, 300)
+        elif kind == 2: # Literals, sometimes longer than MAX_LITERAL
+            mixed += bytes(rng.getrandbits(8) for _ in range(rng.randrange(1, 2 * MAX_LITERAL)))
+        elif kind == 3: # Repeated columns (column copies, sometimes longer than MAX_COPY)
+            mixed += column * rng.randrange(1, 8)
+        else:           # A byte or two
+            mixed += bytes(rng.getrandbits(8) for _ in range(rng.randrange(1, 3)))
+    return [
+        ("all white", b"\xff" * BUFFER_SIZE),
+        ("all black", b"\x00" * BUFFER_SIZE),
+        ("random", bytes(rng.getrandbits(8) for _ in range(BUFFER_SIZE))),
+        ("repeated column", (column * (BUFFER_SIZE // COPY_DISTANCE + 1))[:BUFFER_SIZE]),
+        ("stripes", bytes((0x00, 0xFF)[(i // 3) % 2] for i in range(BUFFER_SIZE))),
+        ("mixed", bytes(mixed[:BUFFER_SIZE])),
+    ]
+
+
+def self_check():
+    """Round-trips the generated frames through encode() and the device decoder; exits on a mismatch."""
+    for name, raw in test_frames():
+        compressed = encode(raw)
+        if decode(compressed) != raw:
+            sys.exit(f"Round trip mismatch for the {name} frame")
+        print(f"{name:<16} {len(raw):>6} -> {len(compressed):>6} bytes  OK")
+    print("all round trips OK")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compress raw frames for picture mode.")
+    parser.add_argument("inputs", nargs="*", help=".bin frame files and/or directories (none: run the round-trip check)")
+    parser.add_argument("--benchmark", action="store_true", help="Report ratio and speed instead of writing files")
+    parser.add_argument("--repeat", type=int, default=20, help="Benchmark: encode/decode each frame this many times")
+    args = parser.parse_args()
+
+    if not args.inputs:
+        self_check()
+        return
+    paths = find_frames(args.inputs)
+    if not paths:
+        sys.exit("No frames found.")
+    if args.benchmark:
+        benchmark(paths, args.repeat)
+        return
+    for path in paths:
+        with open(path, "rb") as f:
+            compressed = encode(f.read())
+        destination = os.path.splitext(path)[0] + ".rle"
+        with open(destination, "wb") as f:
+            f.write(compressed)
+        print(f"{destination}: {len(compressed)} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# panel_format.py (Version 0.1.0 - Inky Pack frame packing and image encoding, host side)
+# Converts between (HEIGHT, WIDTH) NumPy pixel arrays (1 = white, 0 = black) and the
+# packed 4736-byte frame layout the Pico's framebuffer uses (see src/framebuffer.py):
+# column-major, 8 vertical pixels per byte, MSB = top pixel, set bit = white.
+# Also encodes arrays as PBM/PNG images for previews and snapshots.
+
+import struct
+import zlib
+
+import numpy as np
+
+WIDTH = 296
+HEIGHT = 128
+BANKS = HEIGHT // 8
+BUFFER_SIZE = WIDTH * BANKS
+
+
+def pack(pixels):
+    """Packs a (HEIGHT, WIDTH) array of 0/1 pixels into frame bytes."""
+    return np.packbits(np.asarray(pixels, dtype=np.uint8).T, axis=1).tobytes()
+
+
+def unpack(data):
+    """Unpacks frame bytes into a (HEIGHT, WIDTH) uint8 array of 0/1 pixels."""
+    packed = np.frombuffer(data, dtype=np.uint8).reshape(WIDTH, BANKS)
+    return np.unpackbits(packed, axis=1).T
+
+
+def pbm_bytes(pixels):
+    """Encodes a 1 = white pixel array as a binary PBM (P4, where 1 = black)."""
+    height, width = pixels.shape
+    rows = np.packbits(1 - pixels, axis=1)
+    return b"P4\n%d %d\n" % (width, height) + rows.tobytes()
+
+
+def png_bytes(pixels):
+    """Encodes a 1 = white pixel array as a 1-bit greyscale PNG."""
+    height, width = pixels.shape
+    rows = np.packbits(pixels, axis=1)
+    raw = b"".join(b"\x00" + row.tobytes() for row in rows) # Filter type 0 on every row
+
+    def chunk(kind, body):
+        return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body))
+
+    header = struct.pack(">IIBBBBB", width, height, 1, 0, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(raw)) + chunk(b"IEND", b"")
+
+
+def save_image(path, pixels):
+    """Saves a 1 = white pixel array as PNG or PBM, chosen by the file extension."""
+    data = png_bytes(pixels) if path.lower().endswith(".png") else pbm_bytes(pixels)
+    with open(path, "wb") as f:
+        f.write(data)
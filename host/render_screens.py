@@ -0,0 +1,120 @@
+# render_screens.py (Version 0.1.0 - Render every screen on the host simulator)
+# Renders each screen with the simulated Inky Pack, saves PNG/PBM snapshots and prints
+# per-screen render timings and panel update statistics.
+#
+# Usage (from the repository root, NumPy required):
+#   python host/render_screens.py --out snapshots
+#   python host/render_screens.py --time 2025-06-29T23:00:00 --format pbm
+#   python host/render_screens.py --picture pictures/      # a frame file or a directory of frames
+#   python host/render_screens.py --bench 200     # text cache on/off comparison, every screen
+
+import argparse
+import calendar
+import os
+import sys
+import time
+
+HOST_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [
+    os.path.join(HOST_DIR, "stubs"),                 # picographics, utime, machine, ... stand-ins
+    HOST_DIR,                                       # simulator
+    os.path.join(os.path.dirname(HOST_DIR), "src"), # the device code itself
+]
+
+import utime
+from display_manager import DisplayManager
+from image_loader import ImageLoader
+from slideshow import Slideshow, find_frames
+from time_manager import TimeManager
+import screens.datetime_screen
+import screens.log_screen
+import screens.picture_screen
+
+
+def parse_time(value):
+    """Parses YYYY-MM-DDTHH:MM:SS (UTC) into epoch seconds."""
+    return calendar.timegm(time.strptime(value, "%Y-%m-%dT%H:%M:%S"))
+
+
+def build_screens(display_manager, time_manager, picture_path=None):
+    """Returns (name, render function) pairs for every screen."""
+    slideshow = build_slideshow(display_manager, picture_path)
+    return [
+        ("datetime", lambda: screens.datetime_screen.render(display_manager, time_manager)),
+        ("log", lambda: screens.log_screen.render(display_manager)),
+        ("picture", lambda: screens.picture_screen.render(display_manager, slideshow)),
+    ]
+
+
+def build_slideshow(display_manager, picture_path):
+    """Returns a Slideshow over a frame file or a directory of frames (None for no pictures)."""
+    if not picture_path:
+        return None
+    paths = find_frames(picture_path) if os.path.isdir(picture_path) else [picture_path]
+    return Slideshow(display_manager, ImageLoader(display_manager), paths)
+
+
+def render_all(display_manager, time_manager, out_dir, image_format, picture_path=None):
+    """Renders each screen once, saving a snapshot and printing its timing."""
+    display = display_manager.display
+    os.makedirs(out_dir, exist_ok=True)
+    print(f"{'screen':<10} {'render ms':>10} {'draw calls':>11} {'update':>8} {'panel s':>8}")
+    for name, render in build_screens(display_manager, time_manager, picture_path):
+        display.reset_recording()
+        start = time.perf_counter()
+        render()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        update = display.updates[-1] if display.updates else None
+        print(f"{name:<10} {elapsed_ms:>10.2f} {len(display.draw_calls):>11} "
+              f"{update['kind'] if update else 'skipped':>8} {update['panel_seconds'] if update else 0:>8.2f}")
+        display.snapshot(os.path.join(out_dir, f"{name}.{image_format}"))
+    print(f"update stats: {display_manager.get_update_stats()}")
+
+
+def bench_screens(display_manager, time_manager, iterations, picture_path=None):
+    """
+    Times full redraws of every screen across minute ticks with the text cache
+    disabled and enabled. Each render starts from an invalidated buffer, so retained
+    widgets can't hide the cost of drawing the text.
+    """
+    bitmaps = display_manager.text_cache.bitmaps
+    print(f"{iterations} full redraws per screen, one minute apart:")
+    print(f"{'screen':<10} {'cache off ms':>13} {'cache on ms':>12} {'bitmap hits/misses':>19}")
+    for name, render in build_screens(display_manager, time_manager, picture_path):
+        per_render_ms = []
+        for enabled in (False, True):
+            display_manager.TEXT_CACHE_ENABLED = enabled
+            display_manager.text_cache.clear()
+            hits, misses = bitmaps.hits, bitmaps.misses
+            start = time.perf_counter()
+            for _ in range(iterations):
+                utime.advance(60)
+                display_manager.invalidate()
+                render()
+            per_render_ms.append((time.perf_counter() - start) * 1000 / iterations)
+        print(f"{name:<10} {per_render_ms[0]:>13.2f} {per_render_ms[1]:>12.2f} "
+              f"{f'{bitmaps.hits - hits}/{bitmaps.misses - misses}':>19}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--out", default="snapshots", help="Directory for the snapshots")
+    parser.add_argument("--format", default="png", choices=("png", "pbm"), help="Snapshot image format")
+    parser.add_argument("--time", default="2025-06-29T23:00:00", help="Frozen UTC time to render (YYYY-MM-DDTHH:MM:SS)")
+    parser.add_argument("--picture", help="Frame file or directory of frames for the picture screen")
+    parser.add_argument("--bench", type=int, metavar="N", help="Benchmark N full redraws of each screen with/without the text cache")
+    args = parser.parse_args()
+
+    utime.freeze(parse_time(args.time))
+    display_manager = DisplayManager()
+    time_manager = TimeManager("pool.ntp.org", display_manager)
+    time_manager.last_sync_time = utime.time() # The frozen clock counts as synced
+
+    if args.bench:
+        bench_screens(display_manager, time_manager, args.bench, args.picture)
+    else:
+        render_all(display_manager, time_manager, args.out, args.format, args.picture)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+# run_app.py (Version 0.1.0 - Run the whole app on the host simulator)
+# Runs src/main.py's asyncio runtime under CPython, with the host stand-ins for the
+# device modules, in a scratch directory holding a config.toml made from
+# config.example.toml (so the flash log etc. don't touch the repository).
+# Button presses are scripted, and each press's latency (press to the end of the
+# render it caused) is reported, along with the panel updates and the log.
+#
+# Usage (from the repository root, NumPy required):
+#   python host/run_app.py --duration 10 --press 2:B --press 4:C --press 6:A
+#   python host/run_app.py --connect-delay 8 --press 2:C   # buttons while WiFi connects
+#   python host/run_app.py --offline --duration 5            # WiFi never connects
+#   python host/run_app.py --always-on --outage 3:15 --duration 40  # access point restart: backoff, reconnect
+#   python host/run_app.py --low-power --duration 5 --press 2:B  # sleeps between updates
+#   python host/run_app.py --pictures pictures/ --press 1:B --press 2:B --snapshot app.png
+#   python host/run_app.py --press 1:C --press 2:C/1.5       # hold C: scrolls repeatedly
+#   python host/run_app.py --ntp-offset 2.4 --duration 5    # RTC stepped 2.4 s, falseticker rejected
+#
+# NTP is answered by local stand-in servers (fake_ntp_server.py), one of them 10 minutes
+# out, and the host clock seen by the app (utime) is the one the NTP client sets.
+
+import argparse
+import asyncio
+import os
+import re
+import sys
+import tempfile
+import time
+
+HOST_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(os.path.dirname(HOST_DIR), "src")
+sys.path[:0] = [os.path.join(HOST_DIR, "stubs"), HOST_DIR, SRC_DIR]
+
+import network
+import simulator
+from fake_ntp_server import FakeNtpServer
+
+BUTTON_PINS = {"A": 12, "B": 13, "C": 14}
+
+
+def parse_press(value):
+    """Parses SECONDS:BUTTON[/HOLD_SECONDS], e.g. 2.5:B or 3:C/1.5."""
+    seconds, button = value.split(":")
+    button, _, hold = button.partition("/")
+    return float(seconds), BUTTON_PINS[button.upper()], float(hold) if hold else 0.08
+
+
+def write_config(directory, pictures, low_power=False, always_on=False, ntp_servers=()):
+    """Writes config.toml into directory, from the example config."""
+    with open(os.path.join(SRC_DIR, "config.example.toml")) as f:
+        config = f.read()
+    if ntp_servers:
+        config = re.sub(r'^servers = .*$', 'servers = "{}"'.format(", ".join(ntp_servers)), config, flags=re.M)
+    config = config.replace("echo = false", "echo = true") # The log is the run's output
+    if always_on:
+        config = config.replace("always_on = false", "always_on = true")
+    if low_power:
+        config = config.replace("low_power = false", "low_power = true")
+    if pictures:
+        config = config.replace('directory = "pictures"', f'directory = "{os.path.abspath(pictures)}"')
+    with open(os.path.join(directory, "config.toml"), "w") as f:
+        f.write(config)
+
+
+async def press_buttons(presses, display_manager, latencies):
+    """
+    Queues the scripted presses and measures how long each takes to be rendered
+    (to a panel update, or to an update skipped because nothing changed).
+    """
+    def updates_seen():
+        return len(display_manager.display.updates) + display_manager.skipped_updates
+
+    start = time.perf_counter()
+    for at, pin, hold in sorted(presses):
+        await asyncio.sleep(max(0, at - (time.perf_counter() - start)))
+        before = updates_seen()
+        pressed = time.perf_counter()
+        simulator.press(pin, hold_ms=hold * 1000)
+        while updates_seen() == before and time.perf_counter() - pressed < 5:
+            await asyncio.sleep(0.005)
+        latencies.append((at, pin, (time.perf_counter() - pressed) * 1000 if updates_seen() > before else None))
+
+
+def parse_outage(value):
+    """Parses START:END seconds, e.g. 5:40."""
+    start, end = value.split(":")
+    return float(start), float(end)
+
+
+async def simulate_outages(outages, wlan):
+    """Drops the WiFi link (and makes reconnecting fail) between each START and END."""
+    start = time.perf_counter()
+    for outage_start, outage_end in sorted(outages):
+        await asyncio.sleep(max(0, outage_start - (time.perf_counter() - start)))
+        print(f"--- access point down at {outage_start:.1f}s")
+        network.FAIL_CONNECT = True
+        wlan.disconnect()
+        await asyncio.sleep(max(0, outage_end - (time.perf_counter() - start)))
+        print(f"--- access point back at {outage_end:.1f}s")
+        network.FAIL_CONNECT = False
+
+
+async def run_for(app, duration, presses, latencies, outages=()):
+    try:
+        await asyncio.wait_for(asyncio.gather(
+            app.run(),
+            press_buttons(presses, app.display_manager, latencies),
+            simulate_outages(outages, app.wifi_manager.wlan),
+        ), duration)
+    except asyncio.TimeoutError:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the app on the host simulator.")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds to run for")
+    parser.add_argument("--press", type=parse_press, action="append", default=[], metavar="SECONDS:BUTTON[/HOLD]",
+                        help="Press button A, B or C at this many seconds after start, optionally held for HOLD seconds (repeatable)")
+    parser.add_argument("--connect-delay", type=float, default=0, help="Seconds the WiFi connection takes")
+    parser.add_argument("--offline", action="store_true", help="WiFi never connects")
+    parser.add_argument("--outage", type=parse_outage, action="append", default=[], metavar="START:END",
+                        help="Access point down between these seconds after start (repeatable)")
+    parser.add_argument("--pictures", help="Directory of frames for picture mode")
+    parser.add_argument("--realtime", action="store_true", help="Panel updates take as long as on the device")
+    parser.add_argument("--always-on", action="store_true", help="Keep WiFi connected instead of network windows")
+    parser.add_argument("--low-power", action="store_true", help="Run in low-power mode (lightsleep between updates)")
+    parser.add_argument("--ntp-offset", type=float, default=0, help="Seconds the NTP servers are ahead of the host clock")
+    parser.add_argument("--snapshot", help="Save the final panel contents to this .png/.pbm file")
+    args = parser.parse_args()
+
+    network.CONNECT_DELAY_S = args.connect_delay
+    network.FAIL_CONNECT = args.offline
+    snapshot = os.path.abspath(args.snapshot) if args.snapshot else None
+
+    ntp_servers = [
+        FakeNtpServer(offset=args.ntp_offset, latency=0.03).start(),
+        FakeNtpServer(offset=args.ntp_offset, latency=0.01, hold=0.02).start(),
+        FakeNtpServer(offset=args.ntp_offset + 600).start(), # Falseticker
+    ]
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        write_config(work_dir, args.pictures, args.low_power, args.always_on, [server.address for server in ntp_servers])
+        os.chdir(work_dir)
+        import main as app
+        app.setup()
+        display = app.display_manager.display
+        display.realtime = args.realtime
+
+        latencies = []
+        asyncio.run(run_for(app, args.duration, args.press, latencies, args.outage))
+
+        print("\npanel updates:")
+        for update in display.updates:
+            print(f"  {update['kind']:<8} speed {update['speed']}  region {update['region']}")
+        print("button latency (press to rendered):")
+        names = {pin: name for name, pin in BUTTON_PINS.items()}
+        for at, pin, latency_ms in latencies:
+            print(f"  {at:6.2f}s {names[pin]}: " + (f"{latency_ms:.0f} ms" if latency_ms is not None else "not rendered"))
+        print(f"update stats: {app.display_manager.get_update_stats()}")
+        print(f"power stats: {app.power_manager.get_stats()}")
+        print(f"wifi stats: {app.wifi_supervisor.get_stats()}")
+        print(f"radio stats: {app.radio_manager.get_stats()}")
+        print(f"ntp stats: {app.time_manager.ntp_client.get_stats()}")
+        print(f"rtc drift: {app.time_manager.drift_model.get_stats()}")
+        if snapshot:
+            display.snapshot(snapshot)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+# simulator.py (Version 0.1.0 - Host-side PicoGraphics / Inky Pack simulator)
+# A CPython stand-in for PicoGraphics driving a 296x128 1-bpp Inky Pack, so the
+# display code, screens and main loop can be run, profiled and snapshotted on Linux.
+#
+# The framebuffer is a bytearray in the panel's own layout (see src/framebuffer.py),
+# so DisplayManager's partial-update diffing and cached text work unchanged; drawing
+# is done with NumPy on an unpacked view of it. Every draw call and panel update is
+# recorded, and the frame can be saved as a PBM or PNG snapshot.
+#
+# Text uses a built-in 5x7 font (6 px advance), not the device's bitmap8 font, so
+# text widths differ slightly from the real panel. Snapshots are meant for comparing
+# against earlier simulator snapshots, not against photos of a device.
+#
+# Requires NumPy (host only, never copied to the Pico).
+
+import threading
+import time
+
+import numpy as np
+
+import panel_format
+from panel_format import WIDTH, HEIGHT, BANKS, BUFFER_SIZE
+
+DISPLAY_INKY_PACK = "inky_pack"
+PEN_1BIT = 0
+
+# Approximate full-refresh duration in seconds for each update speed (0 = slowest)
+UPDATE_SECONDS = {0: 4.5, 1: 2.0, 2: 0.8, 3: 0.25}
+
+# Simulated button presses, consumed by the pimoroni.Button stand-in and by
+# machine.Pin (level and IRQs) for interrupt-driven input
+_pending_presses = []
+_held_until = {}   # pin -> time.monotonic() when the simulated press is released
+_irq_handlers = {} # pin -> list of (machine.Pin, handler)
+
+
+def press(pin, hold_ms=80):
+    """
+    Presses the button on the given GPIO pin (12 = A, 13 = B, 14 = C) for hold_ms:
+    queues it for pimoroni.Button and calls any machine.Pin IRQ handlers for the falling
+    edge now and, from a timer thread (like a real IRQ, even while the app is blocked in
+    a panel update), for the rising edge when it's released.
+    """
+    _pending_presses.append(pin)
+    _held_until[pin] = time.monotonic() + hold_ms / 1000
+    _call_irq_handlers(pin)
+    if _irq_handlers.get(pin):
+        release = threading.Timer(hold_ms / 1000, _call_irq_handlers, (pin,))
+        release.daemon = True
+        release.start()
+
+
+def _call_irq_handlers(pin):
+    for pin_object, handler in _irq_handlers.get(pin, ()):
+        handler(pin_object)
+
+
+def register_irq(pin, pin_object, handler):
+    """Called by the machine.Pin stand-in when an IRQ handler is set."""
+    _irq_handlers[pin] = [entry for entry in _irq_handlers.get(pin, ()) if entry[0] is not pin_object]
+    if handler:
+        _irq_handlers[pin].append((pin_object, handler))
+
+
+def take_press(pin):
+    """Returns True (once) if a press is queued for pin."""
+    if pin in _pending_presses:
+        _pending_presses.remove(pin)
+        return True
+    return False
+
+
+def is_held(pin):
+    return time.monotonic() < _held_until.get(pin, 0)
+
+
+class SimPicoGraphics:
+    """
+    Implements the subset of the PicoGraphics API used by this project.
+    The simulated panel contents (what was last pushed by update/partial_update)
+    are kept separately from the framebuffer, like on the real device.
+    """
+    def __init__(self, display=DISPLAY_INKY_PACK, pen_type=PEN_1BIT, rotate=0, realtime=False):
+        self.buffer = bytearray(BUFFER_SIZE) # Exposed to DisplayManager in place of memoryview(display)
+        self.panel = bytearray(BUFFER_SIZE)  # What the simulated e-ink panel currently shows
+        self.realtime = realtime             # If True, update() sleeps for the simulated refresh time
+        self.pen = 15
+        self.font = "bitmap8"
+        self.thickness = 1
+        self.update_speed = 0
+
+        self.draw_calls = []  # (method name, args) for every drawing call
+        self.updates = []     # dicts describing every panel update, see _record_update
+        self._render_start = time.perf_counter()
+
+    # --- Framebuffer access ---
+
+    def __buffer__(self, flags):
+        # Python 3.12+: lets memoryview(display) work exactly as on the device
+        return memoryview(self.buffer)
+
+    def _packed(self):
+        return np.frombuffer(self.buffer, dtype=np.uint8).reshape(WIDTH, BANKS)
+
+    def pixels(self, source=None):
+        """Returns the framebuffer (or the given buffer) as a (HEIGHT, WIDTH) array, 1 = white."""
+        return panel_format.unpack(source if source is not None else self.buffer)
+
+    def _store(self, pixels):
+        self.buffer[:] = panel_format.pack(pixels)
+
+    def _draw(self, name, args, mask_fn):
+        """Applies a drawing operation given as a function that sets True in a mask array."""
+        self.draw_calls.append((name, args))
+        mask = np.zeros((HEIGHT, WIDTH), dtype=bool)
+        mask_fn(mask)
+        pixels = self.pixels()
+        pixels[mask] = 1 if self.pen >= 8 else 0
+        self._store(pixels)
+
+    # --- Pens and state ---
+
+    def create_pen(self, r, g, b):
+        return 15 if (r * 299 + g * 587 + b * 114) // 1000 >= 128 else 0
+
+    def set_pen(self, pen):
+        self.pen = pen
+
+    def set_font(self, font):
+        self.font = font
+
+    def set_thickness(self, thickness):
+        self.thickness = thickness
+
+    def set_update_speed(self, speed):
+        self.update_speed = speed
+
+    def get_bounds(self):
+        return WIDTH, HEIGHT
+
+    # --- Drawing ---
+
+    def clear(self):
+        self.draw_calls.append(("clear", ()))
+        self._packed()[:] = 0xFF if self.pen >= 8 else 0x00
+
+    def pixel(self, x, y):
+        def mask_fn(mask):
+            if 0 <= x < WIDTH and 0 <= y < HEIGHT:
+                mask[y, x] = True
+        self._draw("pixel", (x, y), mask_fn)
+
+    def pixel_span(self, x, y, length):
+        self.rectangle(x, y, length, 1)
+
+    def rectangle(self, x, y, w, h):
+        def mask_fn(mask):
+            mask[max(0, y):max(0, y + h), max(0, x):max(0, x + w)] = True
+        self._draw("rectangle", (x, y, w, h), mask_fn)
+
+    def line(self, x1, y1, x2, y2, thickness=None):
+        def mask_fn(mask):
+            steps = max(abs(x2 - x1), abs(y2 - y1), 1)
+            xs = np.rint(np.linspace(x1, x2, steps + 1)).astype(int)
+            ys = np.rint(np.linspace(y1, y2, steps + 1)).astype(int)
+            keep = (xs >= 0) & (xs < WIDTH) & (ys >= 0) & (ys < HEIGHT)
+            mask[ys[keep], xs[keep]] = True
+        self._draw("line", (x1, y1, x2, y2), mask_fn)
+
+    def circle(self, x, y, r):
+        def mask_fn(mask):
+            yy, xx = np.ogrid[:HEIGHT, :WIDTH]
+            mask[(xx - x) ** 2 + (yy - y) ** 2 <= r * r] = True
+        self._draw("circle", (x, y, r), mask_fn)
+
+    def measure_text(self, text, scale=1, spacing=1, fixed_width=False):
+        return len(text) * 6 * scale
+
+    def text(self, text, x, y, wordwrap=None, scale=1, angle=0, spacing=1, fixed_width=False):
+        def mask_fn(mask):
+            cursor = x
+            for char in text:
+                glyph = _glyph_mask(char, scale)
+                x0, y0 = cursor, y
+                x1, y1 = x0 + glyph.shape[1], y0 + glyph.shape[0]
+                cx0, cy0 = max(0, x0), max(0, y0)
+                cx1, cy1 = min(WIDTH, x1), min(HEIGHT, y1)
+                if cx0 < cx1 and cy0 < cy1:
+                    mask[cy0:cy1, cx0:cx1] |= glyph[cy0 - y0:cy1 - y0, cx0 - x0:cx1 - x0]
+                cursor += 6 * scale
+        self._draw("text", (text, x, y, scale), mask_fn)
+
+    # --- Panel updates ---
+
+    def update(self):
+        self._record_update("full", (0, 0, WIDTH, HEIGHT))
+        self.panel[:] = self.buffer
+
+    def partial_update(self, x, y, w, h):
+        if y % 8 or h % 8:
+            raise ValueError("partial_update y and h must be multiples of 8")
+        self._record_update("partial", (x, y, w, h))
+        for column in range(max(0, x), min(WIDTH, x + w)):
+            start = column * BANKS + y // 8
+            end = start + h // 8
+            self.panel[start:end] = self.buffer[start:end]
+
+    def _record_update(self, kind, region):
+        now = time.perf_counter()
+        panel_seconds = UPDATE_SECONDS.get(self.update_speed, 1.0)
+        self.updates.append({
+            "kind": kind,
+            "region": region,
+            "speed": self.update_speed,
+            "render_ms": (now - self._render_start) * 1000, # Host time spent drawing since the last update
+            "draw_calls": len(self.draw_calls),
+            "panel_seconds": panel_seconds, # Estimated time the real panel would take
+        })
+        if self.realtime:
+            time.sleep(panel_seconds)
+        self._render_start = time.perf_counter()
+
+    def reset_recording(self):
+        """Clears the recorded draw calls and updates."""
+        self.draw_calls = []
+        self.updates = []
+        self._render_start = time.perf_counter()
+
+    # --- Snapshots ---
+
+    def snapshot(self, path, panel=True):
+        """
+        Saves the panel contents (or the framebuffer, with panel=False) as a
+        PBM or PNG file, chosen by the file extension.
+        """
+        panel_format.save_image(path, self.pixels(self.panel if panel else self.buffer))
+
+
+# Classic 5x7 font, printable ASCII from 0x20. Five column bytes per glyph, LSB = top row.
+_FONT_5X7 = bytes.fromhex(
+    "0000000000" "00005f0000" "0007000700" "147f147f14" "242a7f2a12" "2313086462" "3649552250" "0005030000"
+    "001c224100" "0041221c00" "082a1c2a08" "08083e0808" "0050300000" "0808080808" "0060600000" "2010080402"
+    "3e5149453e" "00427f4000" "4261514946" "2141454b31" "1814127f10" "2745454539" "3c4a494930" "0171090503"
+    "3649494936" "064949291e" "0036360000" "0056360000" "0008142241" "1414141414" "4122140800" "0201510906"
+    "3249794d3e" "7e1111117e" "7f49494936" "3e41414122" "7f4141221c" "7f49494941" "7f09090101" "3e41415132"
+    "7f0808087f" "00417f4100" "2040413f01" "7f08142241" "7f40404040" "7f0204027f" "7f0408107f" "3e4141413e"
+    "7f09090906" "3e4151215e" "7f09192946" "4649494931" "01017f0101" "3f4040403f" "1f2040201f" "7f2018207f"
+    "6314081463" "0304780403" "6151494543" "00007f4141" "0204081020" "41417f0000" "0402010204" "4040404040"
+    "0001020400" "2054545478" "7f48444438" "3844444420" "384444487f" "3854545418" "087e090102" "081454543c"
+    "7f08040478" "00447d4000" "2040443d00" "007f102844" "00417f4000" "7c0418047c" "7c08040478" "3844444438"
+    "7c14141408" "081414187c" "7c08040408" "4854545420" "043f444020" "3c4040207c" "1c2040201c" "3c4030403c"
+    "4428102844" "0c5050503c" "4464544c44" "0008364100" "00007f0000" "0041360800" "0804081008"
+)
+
+_glyph_cache = {}
+
+
+def _glyph_mask(char, scale):
+    """Returns a (7 * scale, 5 * scale) boolean array for a character."""
+    key = (char, scale)
+    if key not in _glyph_cache:
+        code = ord(char) - 0x20
+        if not 0 <= code < len(_FONT_5X7) // 5:
+            code = ord("?") - 0x20
+        columns = np.frombuffer(_FONT_5X7[code * 5:code * 5 + 5], dtype=np.uint8)
+        glyph = ((columns[np.newaxis, :] >> np.arange(7)[:, np.newaxis]) & 1).astype(bool)
+        _glyph_cache[key] = np.kron(glyph, np.ones((scale, scale), dtype=bool))
+    return _glyph_cache[key]
@@ -0,0 +1,73 @@
+# machine.py (host stand-in) - Just enough of MicroPython's machine module for the app.
+# Input pins read the simulator's buttons (pressed = 0, pull-up), and their IRQ handlers
+# are called by simulator.press().
+
+import utime
+
+
+class Pin:
+    IN = 0
+    OUT = 1
+    PULL_UP = 1
+    PULL_DOWN = 2
+    IRQ_FALLING = 4
+    IRQ_RISING = 8
+
+    def __init__(self, pin_id, mode=IN, pull=None, value=None):
+        self.pin_id = pin_id
+        self.mode = mode
+        self._value = value or 0
+        self.handler = None
+
+    def value(self, value=None):
+        if value is None:
+            if self.mode == Pin.IN:
+                import simulator
+                return 0 if simulator.is_held(self.pin_id) else 1
+            return self._value
+        self._value = value
+
+    def irq(self, handler=None, trigger=IRQ_FALLING | IRQ_RISING, wake=None, hard=False):
+        import simulator
+        self.handler = handler
+        simulator.register_irq(self.pin_id, self, handler)
+
+
+class RTC:
+    def datetime(self, datetime_tuple=None):
+        """(year, month, day, weekday, hours, minutes, seconds, subseconds), UTC."""
+        if datetime_tuple is None:
+            t = utime.localtime()
+            return (t[0], t[1], t[2], t[6], t[3], t[4], t[5], 0)
+        year, month, day, _, hour, minute, second = datetime_tuple[:7]
+        utime.set_time(utime.mktime((year, month, day, hour, minute, second, 0, 0)))
+
+
+def disable_irq():
+    return 0
+
+
+def enable_irq(state=0):
+    pass
+
+
+def reset():
+    raise SystemExit("machine.reset()")
+
+
+# The host can't wait for a button IRQ while blocked in a sleep (run_app.py's scripted
+# presses run on the same event loop), so lightsleep returns after at most this long,
+# like an early wake on the device.
+LIGHTSLEEP_MAX_MS = 100
+
+
+def lightsleep(ms=None):
+    utime.sleep_ms(min(ms, LIGHTSLEEP_MAX_MS) if ms else LIGHTSLEEP_MAX_MS)
+
+
+def deepsleep(ms=None):
+    utime.sleep_ms(ms or 0)
+
+
+def unique_id():
+    return b"\x00HOSTSIM"
@@ -0,0 +1,81 @@
+# network.py (host stand-in) - A WLAN interface that "connects" instantly.
+# Set network.FAIL_CONNECT = True to simulate an unreachable access point, and
+# network.CONNECT_DELAY_S to make connections take that long (like a real association).
+# A connect() targeted at the access point's BSSID (a remembered one) skips the scan,
+# so it takes CACHED_CONNECT_FACTOR of that.
+
+import time as _time
+
+STA_IF = 0
+AP_IF = 1
+STAT_IDLE = 0
+STAT_CONNECTING = 1
+STAT_GOT_IP = 3
+STAT_CONNECT_FAIL = -1
+
+FAIL_CONNECT = False
+CONNECT_DELAY_S = 0
+CACHED_CONNECT_FACTOR = 0.3
+AP_BSSID = b"\x9c\x53\x22\x10\x20\x30"
+AP_CHANNEL = 6
+
+
+class WLAN:
+    def __init__(self, interface=STA_IF):
+        self._active = False
+        self._connected = False
+        self._connect_started = None
+        self._ifconfig = ("192.168.0.50", "255.255.255.0", "192.168.0.1", "192.168.0.1")
+        self._config = {"mac": b"\x28\xcd\xc1\x00\x00\x01", "ssid": "", "channel": AP_CHANNEL, "bssid": AP_BSSID}
+        self._delay = CONNECT_DELAY_S
+
+    def active(self, is_active=None):
+        if is_active is None:
+            return self._active
+        self._active = bool(is_active)
+        if not self._active:
+            self._connected = False
+            self._connect_started = None
+
+    def connect(self, ssid=None, key=None, bssid=None, channel=None):
+        self._config["ssid"] = ssid
+        wrong_ap = (bssid is not None and bssid != AP_BSSID) or (channel is not None and channel != AP_CHANNEL)
+        self._delay = CONNECT_DELAY_S * (CACHED_CONNECT_FACTOR if bssid == AP_BSSID else 1)
+        if wrong_ap:
+            self._connect_started = None # Never associates
+            return
+        self._connected = self._active and not FAIL_CONNECT and not self._delay
+        self._connect_started = _time.monotonic() if self._active and not FAIL_CONNECT else None
+
+    def disconnect(self):
+        self._connected = False
+        self._connect_started = None
+
+    def isconnected(self):
+        if not self._connected and self._connect_started is not None:
+            self._connected = _time.monotonic() - self._connect_started >= self._delay
+        return self._connected
+
+    def status(self, param=None):
+        if param == "rssi":
+            return -55
+        if self.isconnected():
+            return STAT_GOT_IP
+        if self._connect_started is not None:
+            return STAT_CONNECTING
+        return STAT_CONNECT_FAIL if FAIL_CONNECT else STAT_IDLE
+
+    def ifconfig(self, config=None):
+        if config is None:
+            return self._ifconfig
+        if config == "dhcp":
+            return
+        self._ifconfig = tuple(config)
+
+    def config(self, *args, **kwargs):
+        if args:
+            return self._config.get(args[0])
+        self._config.update(kwargs)
+
+    def scan(self):
+        return []
@@ -0,0 +1,12 @@
+# ntptime.py (host stand-in) - settime() is a no-op, the host clock is already right.
+
+host = "pool.ntp.org"
+
+
+def time():
+    import utime
+    return utime.time()
+
+
+def settime():
+    pass
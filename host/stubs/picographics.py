@@ -0,0 +1,3 @@
+# picographics.py (host stand-in) - Exposes the simulator as PicoGraphics.
+
+from simulator import SimPicoGraphics as PicoGraphics, DISPLAY_INKY_PACK, PEN_1BIT
@@ -0,0 +1,15 @@
+# pimoroni.py (host stand-in) - Buttons driven from the simulator's input queue.
+
+import simulator
+
+
+class Button:
+    """Stand-in for pimoroni.Button: read() returns True once per simulated press."""
+    def __init__(self, pin, invert=True, repeat_time=200, hold_time=1000):
+        self.pin = pin
+
+    def read(self):
+        return simulator.take_press(self.pin)
+
+    def raw(self):
+        return simulator.is_held(self.pin)
@@ -0,0 +1,79 @@
+# utime.py (host stand-in) - MicroPython's utime on top of CPython's time module.
+# The device RTC runs on UTC, so localtime() here is UTC too.
+# For repeatable screen snapshots the clock can be frozen with freeze().
+# Setting the RTC (machine.RTC().datetime(...)) calls set_time(), which offsets the
+# running clock so the new second starts at that moment, like on the RP2040.
+
+import calendar
+import time as _time
+
+_frozen_time = None # Epoch seconds, or None for the real clock
+_offset = 0.0       # Seconds added to the real clock (set by set_time)
+_ticks_origin = _time.monotonic_ns()
+TICKS_PERIOD = 1 << 30 # MicroPython small-int ticks wrap around at 2**30
+
+
+def freeze(epoch_seconds):
+    """Freezes time()/localtime() at the given UTC epoch seconds (None unfreezes)."""
+    global _frozen_time
+    _frozen_time = epoch_seconds
+
+
+def advance(seconds):
+    """Moves a frozen clock forward."""
+    global _frozen_time
+    _frozen_time += seconds
+
+
+def set_time(epoch_seconds):
+    """Sets the clock to the start of the given second (moves a frozen clock there)."""
+    global _frozen_time, _offset
+    if _frozen_time is not None:
+        _frozen_time = epoch_seconds
+    else:
+        _offset = epoch_seconds - _time.time()
+
+
+def time():
+    return int(_frozen_time if _frozen_time is not None else _time.time() + _offset)
+
+
+def localtime(secs=None):
+    """Returns (year, month, mday, hour, minute, second, weekday, yearday), like MicroPython."""
+    return tuple(_time.gmtime(time() if secs is None else secs))[:8]
+
+
+gmtime = localtime
+
+
+def mktime(time_tuple):
+    return calendar.timegm(tuple(time_tuple[:6]) + (0, 0, 0))
+
+
+def sleep(seconds):
+    _time.sleep(seconds)
+
+
+def sleep_ms(ms):
+    _time.sleep(ms / 1000)
+
+
+def sleep_us(us):
+    _time.sleep(us / 1000000)
+
+
+def ticks_ms():
+    return ((_time.monotonic_ns() - _ticks_origin) // 1000000) % TICKS_PERIOD
+
+
+def ticks_us():
+    return ((_time.monotonic_ns() - _ticks_origin) // 1000) % TICKS_PERIOD
+
+
+def ticks_add(ticks, delta):
+    return (ticks + delta) % TICKS_PERIOD
+
+
+def ticks_diff(end, start):
+    diff = (end - start) % TICKS_PERIOD
+    return diff - TICKS_PERIOD if diff >= TICKS_PERIOD // 2 else diff
@@ -0,0 +1,96 @@
+# boot_profiler.py (Version 0.1.0 - Boot phase timings, kept for the last few boots)
+# Times the phases of a boot (imports, display init, config load, WiFi connect, NTP
+# sync, ...) with utime.ticks_us, plus milestones measured from the moment this module
+# was first imported (main.py imports it first): the first render, and the first render
+# of the synced clock ("time to clock"). When the boot is finished the timings are
+# appended to a small JSON file holding the last few boots, so regressions between
+# firmware versions show up on the diagnostics screen.
+#
+# Spans are no-ops once the boot is finished, so e.g. the daily NTP resync isn't timed:
+#     with profiler.span("ntp"):
+#         await self._sync_ntp_time()
+
+import utime
+import json
+
+class _Span:
+    """Context manager timing one phase."""
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0
+
+    def __enter__(self):
+        self.start = utime.ticks_us()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.profiler.add(self.name, utime.ticks_diff(utime.ticks_us(), self.start))
+        return False
+
+class BootProfiler:
+    """
+    Collects the current boot's phase durations and milestones, and the saved history.
+    Times are kept in ms (rounded to 0.1 ms).
+    """
+    def __init__(self, path="boot_times.json", keep=5):
+        self.origin = utime.ticks_us()
+        self.path = path
+        self.keep = keep         # Boots kept in the file
+        self.phases = {}         # Phase name -> ms (summed if a phase runs more than once)
+        self.order = []          # Phase names in the order they first ran
+        self.marks = {}          # Milestone name -> ms since boot
+        self.finished = False
+
+    def span(self, name):
+        """Returns a context manager that times a phase of the boot."""
+        return _Span(self, name)
+
+    def add(self, name, duration_us):
+        """Adds duration_us to a phase."""
+        if self.finished:
+            return
+        if name not in self.phases:
+            self.phases[name] = 0
+            self.order.append(name)
+        self.phases[name] = round(self.phases[name] + duration_us / 1000, 1)
+
+    def mark(self, name):
+        """Records a milestone (the first time only), in ms since boot."""
+        if self.finished or name in self.marks:
+            return
+        self.marks[name] = round(utime.ticks_diff(utime.ticks_us(), self.origin) / 1000, 1)
+
+    def current(self):
+        """Returns the current boot's record."""
+        return {
+            "time": utime.time(),
+            "phases": [[name, self.phases[name]] for name in self.order],
+            "marks": self.marks,
+        }
+
+    def history(self):
+        """Returns the saved boot records, oldest first (the current boot once finished)."""
+        try:
+            with open(self.path) as f:
+                boots = json.load(f)
+            return boots if isinstance(boots, list) else []
+        except (OSError, ValueError):
+            return []
+
+    def finish(self):
+        """Ends the boot: stops timing and saves its record with the last keep boots."""
+        if self.finished:
+            return
+        self.finished = True
+        boots = self.history()
+        boots.append(self.current())
+        boots = boots[-self.keep:]
+        try:
+            with open(self.path, "w") as f:
+                json.dump(boots, f)
+        except OSError as e:
+            print("BootProfiler: Error saving {}: {}".format(self.path, e))
+
+# Shared by main.py and the managers whose work is part of the boot
+profiler = BootProfiler()
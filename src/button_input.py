@@ -0,0 +1,155 @@
+# button_input.py (Version 0.1.0 - Interrupt-driven buttons with an event queue)
+# The Inky Pack's buttons pull their pins low when pressed. An IRQ on both edges records
+# each press and release the moment it happens (even during a long blocking
+# display.update()), presses going into a small preallocated event queue that the main
+# loop drains when it's free. So a button pressed twice during one panel update gives
+# two PRESS events.
+#
+# Debouncing needs no sleeping: a press is ignored until the button has been released
+# for DEBOUNCE_MS, and a release until it has been pressed for DEBOUNCE_MS. While a
+# button is held the input task wakes every POLL_MS to generate LONG_PRESS and REPEAT
+# events; with no button held it just waits for the next IRQ.
+#
+# The IRQ handler only touches preallocated buffers and small ints, so it is safe as a
+# hard IRQ (no heap allocation).
+
+import utime
+import machine
+from machine import Pin
+
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio # CPython (host simulator)
+
+PRESS = 1
+LONG_PRESS = 2 # Once, after the button has been held for LONG_PRESS_MS
+REPEAT = 3     # Every REPEAT_MS after the long press, while still held
+RELEASE = 4    # When the button is let go (e.g. to tell a tap from a hold)
+
+class ButtonInput:
+    """
+    Turns button pins into PRESS / LONG_PRESS / REPEAT / RELEASE events for buttons 0, 1, 2, ...
+    (in the order of the pins given).
+    """
+    def __init__(self, pins, queue_size=16):
+        self.DEBOUNCE_MS = 30
+        self.LONG_PRESS_MS = 800
+        self.REPEAT_MS = 250
+        self.POLL_MS = 20
+
+        count = len(pins)
+        self.pins = [Pin(pin, Pin.IN, Pin.PULL_UP) for pin in pins]
+        self._held = bytearray(count)
+        self._pressed_at = [0] * count  # ticks_ms of the press, for debouncing the release
+        self._released_at = [0] * count # ticks_ms of the release, for debouncing the next press
+        self._next_event_at = [0] * count # ticks_ms of the next LONG_PRESS / REPEAT
+        self._long_sent = bytearray(count) # LONG_PRESS already sent for the current press
+
+        # Ring buffer of events, each encoded as (kind << 4) | button. Indices run over
+        # 0 .. 2 * size - 1 so full and empty can be told apart; only the writer moves
+        # _tail and only the reader moves _head, so no locking is needed against the IRQ.
+        self._events = bytearray(queue_size)
+        self._head = 0
+        self._tail = 0
+        self.dropped = 0 # Events lost because the queue was full
+
+        # Wakes the input task from the IRQ (ThreadSafeFlag on MicroPython)
+        flag_class = getattr(asyncio, "ThreadSafeFlag", None)
+        self._flag = flag_class() if flag_class else asyncio.Event()
+
+        self._handlers = []
+        for button in range(count):
+            handler = self._make_handler(button)
+            self._handlers.append(handler) # Keep a reference, the IRQ holds only the callable
+            trigger = Pin.IRQ_FALLING | Pin.IRQ_RISING
+            try:
+                self.pins[button].irq(handler=handler, trigger=trigger, hard=True)
+            except TypeError:
+                self.pins[button].irq(handler=handler, trigger=trigger) # Ports without hard IRQs
+
+    def _make_handler(self, button):
+        def handler(pin):
+            if pin.value(): # High: released
+                self._on_release(button)
+            else:
+                self._on_press(button)
+        return handler
+
+    def _on_press(self, button):
+        """IRQ context: registers a press unless it's a bounce. Must not allocate."""
+        now = utime.ticks_ms()
+        if self._held[button] or utime.ticks_diff(now, self._released_at[button]) < self.DEBOUNCE_MS:
+            return
+        self._held[button] = 1
+        self._pressed_at[button] = now
+        self._next_event_at[button] = utime.ticks_add(now, self.LONG_PRESS_MS)
+        self._long_sent[button] = 0
+        self._push(PRESS, button)
+
+    def _on_release(self, button):
+        """IRQ context: registers a release unless it's a bounce of the press. Must not allocate."""
+        now = utime.ticks_ms()
+        if not self._held[button] or utime.ticks_diff(now, self._pressed_at[button]) < self.DEBOUNCE_MS:
+            return
+        self._held[button] = 0
+        self._released_at[button] = now
+        self._push(RELEASE, button)
+
+    def pending(self):
+        """Number of events waiting in the queue."""
+        return (self._tail - self._head) % (2 * len(self._events))
+
+    def _push(self, kind, button):
+        size = len(self._events)
+        if self.pending() == size:
+            self.dropped += 1
+            return
+        self._events[self._tail % size] = (kind << 4) | button
+        self._tail = (self._tail + 1) % (2 * size)
+        self._flag.set()
+
+    def any_held(self):
+        for held in self._held:
+            if held:
+                return True
+        return False
+
+    def poll(self):
+        """Generates LONG_PRESS / REPEAT events for held buttons (releases are seen by the IRQ)."""
+        now = utime.ticks_ms()
+        for button in range(len(self.pins)):
+            if not self._held[button]:
+                continue
+            if self.pins[button].value():
+                # Released, but the release edge came within DEBOUNCE_MS of the press
+                # (a very short tap) and was ignored as a bounce
+                state = machine.disable_irq()
+                self._on_release(button)
+                machine.enable_irq(state)
+            elif utime.ticks_diff(now, self._next_event_at[button]) >= 0:
+                state = machine.disable_irq() # The IRQ is the queue's other writer
+                self._push(REPEAT if self._long_sent[button] else LONG_PRESS, button)
+                machine.enable_irq(state)
+                self._long_sent[button] = 1
+                self._next_event_at[button] = utime.ticks_add(now, self.REPEAT_MS)
+
+    def get(self):
+        """Returns the next event as (kind, button), or None if the queue is empty."""
+        if self._head == self._tail:
+            return None
+        size = len(self._events)
+        event = self._events[self._head % size]
+        self._head = (self._head + 1) % (2 * size)
+        return event >> 4, event & 0x0F
+
+    async def wait(self):
+        """Waits for the next event: sleeps POLL_MS while a button is held, else until the next IRQ."""
+        while self._head == self._tail:
+            if self.any_held():
+                await asyncio.sleep(self.POLL_MS / 1000)
+                self.poll()
+            else:
+                await self._flag.wait()
+                if not getattr(asyncio, "ThreadSafeFlag", None):
+                    self._flag.clear() # asyncio.Event (host) doesn't clear itself
@@ -2,6 +2,7 @@
 
 import os
 import re # Make sure re (regex) is imported
+from boot_profiler import profiler
 
 class ConfigManager:
     def __init__(self, display_manager_instance=None):
@@ -9,10 +10,10 @@ class ConfigManager:
         self.config_file = 'config.toml'
         self.display_manager = display_manager_instance # For logging messages
 
-    def _log(self, message):
+    def _log(self, message, *args):
         """Internal helper to log messages to display (if available) and console."""
         if self.display_manager:
-            self.display_manager.add_log_message(message)
+            self.display_manager.add_log_message(message, *args)
 
     def _parse_line(self, line):
         """
@@ -35,7 +36,7 @@ class ConfigManager:
         # This regex now captures the key and the raw value string
         match_kv = re.match(r'^\s*([a-zA-Z0-9_]+)\s*=\s*(.*)\s*$', line)
         if not match_kv:
-            self._log(f"Warning: Unrecognized config line format: {line}")
+            self._log("Warning: Unrecognized config line format: {}", line)
             return None, None
         
         key = match_kv.group(1)
@@ -67,7 +68,7 @@ class ConfigManager:
         # Fallback: if none of the above, treat as a plain string (unquoted)
         # This can be useful for simpler config, but TOML strictly requires quotes for strings.
         # However, for robustness, we'll allow it but log a warning.
-        self._log(f"Warning: Interpreting unquoted value '{value_raw}' for key '{key}' as string. TOML usually requires strings to be quoted.")
+        self._log("Warning: Interpreting unquoted value '{}' for key '{}' as string. TOML usually requires strings to be quoted.", value_raw, key)
         return key, value_raw
 
     def load_config(self):
@@ -75,10 +76,14 @@ class ConfigManager:
         Loads configuration from the config.toml file.
         Returns a dictionary with sections and key-value pairs.
         """
+        with profiler.span("config"):
+            return self._load_config()
+
+    def _load_config(self):
         self.config = {}
         current_section = None
         
-        self._log(f"Loading config from {self.config_file}...")
+        self._log("Loading config from {}...", self.config_file)
 
         try:
             with open(self.config_file, 'r') as f:
@@ -94,13 +99,13 @@ class ConfigManager:
                     elif current_section is not None:
                         self.config[current_section][key] = value
                     else:
-                        self._log(f"Warning: Key-value pair '{key}={value}' found outside a section. Ignoring.")
+                        self._log("Warning: Key-value pair '{}={}' found outside a section. Ignoring.", key, value)
             self._log("Config loaded successfully.")
             return self.config
 
         except OSError as e:
-            self._log(f"Error opening/reading config file '{self.config_file}': {e}")
+            self._log("Error opening/reading config file '{}': {}", self.config_file, e)
             return None
         except Exception as e:
-            self._log(f"An unexpected error occurred during config parsing: {e}")
+            self._log("An unexpected error occurred during config parsing: {}", e)
             return None
\ No newline at end of file
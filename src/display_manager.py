@@ -1,19 +1,44 @@
 # display_manager.py (Updated to be an orchestrator, minimal boot flashes)
-import utime
+import hashlib
 from picographics import PicoGraphics, DISPLAY_INKY_PACK 
 import time
 
+import framebuffer
+from text_cache import TextCache
+from refresh_policy import RefreshPolicy
+from ring_log import RingLog, INFO
+
 class DisplayManager:
     def __init__(self):
         self.display = None
-        self.log_messages = []
-        self.MAX_LOG_MESSAGES = 8
+        self.MAX_LOG_MESSAGES = 64 # The log screen only draws the visible lines, so this can be generous
+        self.log = RingLog(self.MAX_LOG_MESSAGES) # Formatted lazily, see ring_log.py
 
         self.BLACK = 0
         self.WHITE = 15
 
-        self.WIDTH = 296
-        self.HEIGHT = 128
+        self.WIDTH = framebuffer.WIDTH
+        self.HEIGHT = framebuffer.HEIGHT
+        self.font = "bitmap8"
+
+        # Partial refresh: if the changed area is bigger than this fraction of the panel,
+        # a single full update is quicker than several partial ones.
+        self.PARTIAL_UPDATE_MAX_AREA = 0.5
+
+        # Copy of the frame last pushed to the panel, used to find what changed.
+        self._framebuffer = None # memoryview onto the PicoGraphics buffer (if supported)
+        self._last_frame = bytearray(framebuffer.BUFFER_SIZE)
+        self._last_frame_valid = False # False until the first full update has been sent
+        self._last_frame_hash = None # sha256 of the frame on the panel, for the identical-frame gate
+
+        # Update speed / ghost-clearing policy (reconfigured from config.toml by configure())
+        self.refresh_policy = RefreshPolicy()
+        self._update_speed = None # Speed last set on the display
+        self.skipped_updates = 0 # Updates skipped because the frame was unchanged
+        self.buffer_owner = None # Name of the screen whose content is in the buffer (see begin_screen)
+
+        self.text_cache = TextCache(self)
+        self.TEXT_CACHE_ENABLED = True # Set False to always draw/measure text directly (e.g. to benchmark)
         
         self.init_display()
 
@@ -23,30 +48,185 @@ class DisplayManager:
             self.display = PicoGraphics(display=DISPLAY_INKY_PACK)
             self.add_log_message("DisplayManager: PicoGraphics initialized successfully.") 
 
+            self.display.set_font(self.font)
             self.display.set_pen(self.WHITE)
             #self.display.clear()
+            self._framebuffer = self._get_framebuffer()
 
         except Exception as e:
-            self.add_log_message(f"DisplayManager: Error initializing display: {e}")
+            self.add_log_message("DisplayManager: Error initializing display: {}", e)
             self.add_log_message("DisplayManager: Please ensure PicoGraphics libraries are correctly installed and connected for Inky Pack.")
             self.display = None 
 
-    def add_log_message(self, message):
-        """Adds a message to the internal log list and prints to console."""
-        timestamp = utime.localtime()
-        ts_str = "{:02d}:{:02d}:{:02d}".format(timestamp[3], timestamp[4], timestamp[5])
-        log_entry = f"[{ts_str}] {message}"
-        self.log_messages.append(log_entry)
-        if len(self.log_messages) > self.MAX_LOG_MESSAGES:
-            self.log_messages.pop(0) 
-        print(log_entry) # Always print to console
+    def configure(self, display_config, clock=None):
+        """
+        Applies the [display] section of config.toml.
+        clock() should return the local time tuple (used for the daily ghost-clearing refresh).
+        """
+        self.refresh_policy = RefreshPolicy(display_config, clock)
+
+    def configure_log(self, log_config):
+        """Applies the level and console echo settings of the [log] section of config.toml."""
+        self.log.set_level(log_config.get("level", "info"))
+        self.log.set_echo(log_config.get("echo", False))
+
+    def _get_framebuffer(self):
+        """
+        Returns a memoryview onto the display's 1-bpp framebuffer, or None if the
+        display does not expose one in the expected layout (partial updates are then disabled).
+        """
+        try:
+            frame = memoryview(self.display)
+        except TypeError:
+            # Backends that can't export the buffer protocol (e.g. the host simulator
+            # on Python < 3.12) expose the framebuffer as a 'buffer' attribute instead.
+            buffer = getattr(self.display, "buffer", None)
+            if buffer is None:
+                self.add_log_message("DisplayManager: Framebuffer not accessible, using full updates only.")
+                return None
+            frame = memoryview(buffer)
+        if len(frame) != framebuffer.BUFFER_SIZE:
+            self.add_log_message("DisplayManager: Unexpected framebuffer size {}, using full updates only.", len(frame))
+            return None
+        return frame
+
+    def add_log_message(self, message, *args, level=INFO):
+        """
+        Adds a message to the log (and prints it to the console if [log] echo is on).
+        message is a str.format template for args; formatting is deferred until the
+        line is printed or shown, and nothing happens at all below the log level.
+        """
+        self.log.log(level, message, args)
+
+    @property
+    def log_messages(self):
+        """The kept log lines, formatted, oldest first."""
+        return list(self.log.lines())
 
     def clear_display_buffer(self):
         """Clears the display buffer (sets all pixels to white) without updating."""
+        self.buffer_owner = None
         if self.display:
             self.display.set_pen(self.WHITE)
             self.display.clear()
 
+    def begin_screen(self, name):
+        """
+        Called by screens that redraw only what changed (see widgets.py).
+        Returns False if the buffer still holds this screen's previous render, otherwise
+        clears the buffer, records the screen as its owner and returns True (full redraw needed).
+        """
+        if self.buffer_owner == name:
+            return False
+        self.clear_display_buffer()
+        self.buffer_owner = name
+        return True
+
+    def set_font(self, font):
+        """Changes the PicoGraphics font (cached text is keyed on the font, so it stays valid)."""
+        self.font = font
+        if self.display:
+            self.display.set_font(font)
+
+    def measure_text(self, text, scale=1):
+        """Returns the pixel width of text at the given scale (memoised)."""
+        if not self.TEXT_CACHE_ENABLED:
+            return self.display.measure_text(text, scale=scale)
+        return self.text_cache.measure(text, scale)
+
+    def draw_text(self, text, x, y, scale=1, cached=False):
+        """
+        Draws black text into the display buffer.
+        With cached=True the rasterised text is kept and blitted on later calls; use it for
+        strings that rarely change (day/month names, labels), not for e.g. the clock.
+        """
+        if not self.display:
+            return
+        if cached and self.TEXT_CACHE_ENABLED:
+            self.text_cache.draw(text, x, y, scale)
+        else:
+            self.display.set_pen(self.BLACK)
+            self.display.text(text, x, y, scale=scale)
+
+    def update(self):
+        """
+        Pushes the display buffer to the panel.
+        Only the rectangles that changed since the last update are refreshed (partial update).
+        Falls back to a full update for the first frame, when the framebuffer is not
+        accessible, or when the changed area is too big for partial updates to pay off.
+        If the frame is identical to what is already on the panel, nothing is sent.
+        """
+        if not self.display:
+            return
+
+        frame = self._framebuffer
+        if frame is None or not self._last_frame_valid:
+            self._full_update(ghost_clear=self.refresh_policy.ghost_clear_due())
+            return
+
+        # Cheap gate first: hashing runs in C, diffing the columns runs in Python.
+        frame_hash = hashlib.sha256(frame).digest()
+        if frame_hash == self._last_frame_hash:
+            self.skipped_updates += 1
+            return
+
+        regions = framebuffer.find_dirty_regions(self._last_frame, frame)
+        if not regions:
+            self.skipped_updates += 1
+            self._last_frame_hash = frame_hash
+            return # Nothing changed, no need to touch the panel
+
+        if self.refresh_policy.ghost_clear_due():
+            self._full_update(ghost_clear=True)
+            return
+
+        max_area = framebuffer.WIDTH * framebuffer.HEIGHT * self.PARTIAL_UPDATE_MAX_AREA
+        if framebuffer.regions_area(regions) > max_area or not hasattr(self.display, "partial_update"):
+            self._full_update()
+            return
+
+        self._set_update_speed(self.refresh_policy.speed_for(partial=True))
+        for x, y, w, h in regions:
+            self.display.partial_update(x, y, w, h)
+        self._last_frame[:] = frame
+        self._last_frame_hash = frame_hash
+
+    def _full_update(self, ghost_clear=False):
+        """
+        Refreshes the whole panel and remembers the frame that is now shown.
+        A ghost-clearing refresh uses the slow update speed to wipe residual images.
+        """
+        self._set_update_speed(self.refresh_policy.speed_for(partial=False, ghost_clear=ghost_clear))
+        self.display.update()
+        if self._framebuffer is not None:
+            self._last_frame[:] = self._framebuffer
+            self._last_frame_hash = hashlib.sha256(self._last_frame).digest()
+            self._last_frame_valid = True
+
+    def _set_update_speed(self, speed):
+        """Sets the e-ink update speed, skipping the call if it is already set."""
+        if speed != self._update_speed and hasattr(self.display, "set_update_speed"):
+            self.display.set_update_speed(speed)
+            self._update_speed = speed
+
+    def get_update_stats(self):
+        """
+        Returns a dict of panel update counters since boot: refreshes performed by kind
+        (partial, full, ghost_clear), and updates skipped because the frame was unchanged.
+        """
+        stats = self.refresh_policy.get_stats()
+        stats["performed"] = stats["partial"] + stats["full"] + stats["ghost_clear"]
+        stats["skipped"] = self.skipped_updates
+        return stats
+
+    def invalidate(self):
+        """
+        Forgets the last shown frame and the buffer's owner, so the next render redraws
+        the whole screen and the next update() refreshes the whole panel.
+        """
+        self._last_frame_valid = False
+        self.buffer_owner = None
+
     def show_connection_error(self):
         """Displays a generic Wi-Fi connection error message."""
         if self.display:
@@ -54,7 +234,7 @@ class DisplayManager:
             self.display.set_pen(self.BLACK) 
             self.display.text("WiFi Error!", 5, 5, scale=2)
             self.display.text("Check config.toml and network", 5, 30, scale=1)
-            self.display.update()
+            self.update()
             time.sleep(1) # Small pause for visibility
 
     def show_ntp_error(self):
@@ -65,7 +245,7 @@ class DisplayManager:
             self.display.text("NTP Error!", 5, 5, scale=2)
             self.display.text("Could not sync time.", 5, 30, scale=1)
             self.display.text("Check WiFi connection & NTP server.", 5, 45, scale=1)
-            self.display.update()
+            self.update()
             time.sleep(1) # Small pause for visibility
 
-    # Screen-specific rendering methods are in 'screens' directory.
\ No newline at end of file
+    # Screen-specific rendering methods are in 'screens' directory.
@@ -0,0 +1,220 @@
+# flash_log.py (Version 0.1.0 - Persistent, segment-rotating flash log)
+# Keeps the log across resets. Lines are appended to numbered segment files in a log
+# directory ("logs/00001.log", ...); when the newest segment reaches segment_bytes a new
+# one is started and the oldest is deleted beyond max_segments, capping the total size.
+#
+# Flash wears with every erase, and each write to a littlefs file rewrites at least one
+# block, so entries are collected in preallocated slots and written in batches: when
+# the slots are full, when the device is idle and the oldest pending entry is older
+# than flush_interval_ms, or straight away for errors (so a crash's cause isn't lost).
+# Like RingLog, a slot holds the raw timestamp, level, template and args; lines are only
+# formatted when the batch is written, so logging an entry costs no formatting either.
+#
+# LogCursor pages backwards through the segments a chunk at a time, so history can be
+# browsed on the log screen without reading whole files into RAM.
+
+import os
+import utime
+
+from ring_log import INFO, ERROR
+
+LEVEL_CHARS = {10: "D", 20: "I", 30: "W", 40: "E"}
+
+class FlashLog:
+    """
+    Append-only log on flash. Used as a RingLog sink (see RingLog.set_sink).
+    """
+    def __init__(self, directory="logs", segment_bytes=4096, max_segments=4, buffer_bytes=512,
+                 flush_interval_ms=60 * 1000, level=INFO, batch=16):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.max_segments = max_segments
+        self.flush_interval_ms = flush_interval_ms
+        self.level = level # Only entries at or above this level are persisted
+        self._times = [0] * batch
+        self._levels = bytearray(batch)
+        self._messages = [None] * batch
+        self._args = [None] * batch
+        self._count = 0 # Entries pending in the slots
+        self._buffer = bytearray(buffer_bytes) # Formatted lines on their way to the file
+        self._view = memoryview(self._buffer)
+        self._pending_since = None # ticks_ms of the oldest pending entry
+        self.writes = 0 # Flushes to flash since startup
+        self._segments = None # Segment numbers, oldest first (read lazily)
+        self._segment_size = 0 # Size of the newest segment
+
+    # --- Segments ---
+
+    def _path(self, number):
+        return "{}/{:05d}.log".format(self.directory, number)
+
+    def segments(self):
+        """Returns the segment numbers on flash, oldest first."""
+        if self._segments is None:
+            try:
+                names = os.listdir(self.directory)
+            except OSError:
+                os.mkdir(self.directory)
+                names = []
+            self._segments = sorted(int(name[:-4]) for name in names if name.endswith(".log") and name[:-4].isdigit())
+            self._segment_size = os.stat(self._path(self._segments[-1]))[6] if self._segments else 0
+        return self._segments
+
+    def segment_path(self, number):
+        """Path of the segment with the given number (see segments())."""
+        return self._path(number)
+
+    def _rotate(self):
+        """Starts a new segment and deletes the oldest ones beyond max_segments."""
+        segments = self.segments()
+        segments.append(segments[-1] + 1 if segments else 1)
+        self._segment_size = 0
+        while len(segments) > self.max_segments:
+            try:
+                os.remove(self._path(segments.pop(0)))
+            except OSError:
+                pass
+
+    # --- Writing ---
+
+    def write(self, timestamp, level, message, args):
+        """RingLog sink: keeps one entry for the next flush, flushing first if the slots are full."""
+        if level < self.level:
+            return
+        if self._count == len(self._levels):
+            self.flush()
+        slot = self._count
+        self._times[slot] = timestamp
+        self._levels[slot] = level
+        self._messages[slot] = message
+        self._args[slot] = args
+        self._count += 1
+        if self._pending_since is None:
+            self._pending_since = utime.ticks_ms()
+        if level >= ERROR:
+            self.flush()
+
+    def _line(self, slot):
+        """Formats a pending entry as one UTF-8 line, cut to fit the buffer (at a character boundary)."""
+        t = utime.localtime(self._times[slot])
+        message = self._messages[slot]
+        args = self._args[slot]
+        if args:
+            message = message.format(*args)
+        if "\n" in message:
+            message = message.replace("\n", " ") # One line per entry (the log screen counts on it)
+        line = "{:04d}-{:02d}-{:02d} {:02d}:{:02d}:{:02d} {} {}\n".format(
+            t[0], t[1], t[2], t[3], t[4], t[5], LEVEL_CHARS.get(self._levels[slot], "?"), message).encode()
+        if len(line) > len(self._buffer):
+            end = len(self._buffer) - 1
+            while end and line[end] & 0xC0 == 0x80: # Don't split a multi-byte character
+                end -= 1
+            line = line[:end] + b"\n"
+        return line
+
+    def flush(self):
+        """Formats the pending entries and appends them to the newest segment (one file open)."""
+        if not self._count:
+            return
+        segments = self.segments()
+        if not segments or self._segment_size >= self.segment_bytes:
+            self._rotate()
+        try:
+            with open(self._path(segments[-1]), "ab") as f:
+                length = 0
+                for slot in range(self._count):
+                    line = self._line(slot)
+                    if length + len(line) > len(self._buffer):
+                        f.write(self._view[:length])
+                        length = 0
+                    self._buffer[length:length + len(line)] = line
+                    length += len(line)
+                    self._segment_size += len(line)
+                f.write(self._view[:length])
+            self.writes += 1
+        except OSError as e:
+            print("FlashLog: Write failed: {}".format(e)) # Not logged, that would recurse
+        for slot in range(self._count):
+            self._messages[slot] = None # Don't keep the args (e.g. exceptions) alive
+            self._args[slot] = None
+        self._count = 0
+        self._pending_since = None
+
+    def flush_if_idle(self):
+        """Called when the device is idle: flushes once the oldest pending entry is old enough."""
+        if self._pending_since is not None and \
+                utime.ticks_diff(utime.ticks_ms(), self._pending_since) >= self.flush_interval_ms:
+            self.flush()
+
+    def ms_until_flush(self):
+        """ms until flush_if_idle() will flush (None if nothing is pending)."""
+        if self._pending_since is None:
+            return None
+        return max(0, self.flush_interval_ms - utime.ticks_diff(utime.ticks_ms(), self._pending_since))
+
+    def pending(self):
+        """Number of entries waiting to be written."""
+        return self._count
+
+    def cursor(self):
+        """Returns a LogCursor positioned after the newest entry (pending entries are flushed first)."""
+        self.flush()
+        return LogCursor(self)
+
+
+class LogCursor:
+    """
+    Reads the flash log backwards, newest entry first, a chunk at a time.
+    """
+    def __init__(self, flash_log, chunk_size=256):
+        self.flash_log = flash_log
+        self.chunk_size = chunk_size
+        segments = flash_log.segments()
+        # Segment number being read (not a list index: rotation shifts those)
+        self._segment = segments[-1] if segments else None
+        self._offset = None # Read position in that segment (None = its end)
+        self._carry = b""   # Start of a line split by the chunk boundary
+        self._ready = []    # Lines read but not yet returned, newest first
+
+    def at_start(self):
+        """True once every line has been returned."""
+        return self._segment is None and not self._ready
+
+    def older(self, count):
+        """Returns up to count lines older than the previous call's, newest first."""
+        while len(self._ready) < count and self._segment is not None:
+            self._read_chunk()
+        lines = self._ready[:count]
+        self._ready = self._ready[count:]
+        return lines
+
+    def _read_chunk(self):
+        path = self.flash_log.segment_path(self._segment)
+        try:
+            if self._offset is None:
+                self._offset = os.stat(path)[6]
+            start = max(0, self._offset - self.chunk_size)
+            with open(path, "rb") as f:
+                f.seek(start)
+                data = f.read(self._offset - start) + self._carry
+        except OSError:
+            start, data = 0, self._carry # Segment deleted by rotation meanwhile
+        self._offset = start
+
+        parts = data.split(b"\n")
+        self._carry = parts[0] if start else b"" # Partial unless it starts the file
+        first = 1 if start else 0
+        for i in range(len(parts) - 1, first - 1, -1):
+            if parts[i]:
+                try:
+                    self._ready.append(parts[i].decode())
+                except UnicodeError: # Cut mid-character (by an older version) or corrupted
+                    self._ready.append(str(parts[i])[2:-1])
+        if not start:
+            self._segment = self._previous() # Move on to the previous segment
+            self._offset = None
+
+    def _previous(self):
+        """The newest segment number older than the one just read, or None."""
+        older = [number for number in self.flash_log.segments() if number < self._segment]
+        return older[-1] if older else None
@@ -0,0 +1,122 @@
+# frame_codec.py (Version 0.1.0 - Streaming decoder for compressed frames)
+# Compressed frames (.rle) are run-length encoded frame bytes (see framebuffer.py for
+# the raw layout). E-ink content is mostly white, so long runs of 0xFF get a compact
+# token; and scaled text has strokes several pixels wide, so a column often repeats the
+# one before it, which gets an LZ-style back-reference of one column (16 bytes).
+# Frames are encoded on the host (host/frame_encoder.py) and decoded here in a
+# single pass, straight into the display buffer, using one small fixed-size read buffer.
+#
+# File format:
+#   header: b"IKRL", version byte (1), decoded size (uint16, little-endian)
+#   tokens:
+#     0x00-0x3F  c          literal: the next c + 1 bytes are copied as-is
+#     0x40-0x7F  c          column copy: (c & 0x3F) + 1 bytes copied from one column back
+#     0x80-0xBF  c, lo      white run: ((c & 0x3F) << 8 | lo) + 1 bytes of 0xFF
+#     0xC0-0xFF  c, lo, v   run: ((c & 0x3F) << 8 | lo) + 1 bytes of value v
+
+MAGIC = b"IKRL"
+VERSION = 1
+HEADER_SIZE = 7
+MAX_LITERAL = 0x40
+MAX_COPY = 0x40
+MAX_RUN = 0x4000
+COPY_DISTANCE = 16 # One framebuffer column (framebuffer.BANKS)
+
+class FrameDecoder:
+    """
+    Decodes .rle frame files into a writable buffer (normally the framebuffer memoryview).
+    All working memory is allocated once, in __init__.
+    """
+    def __init__(self, chunk_size=256):
+        self.chunk = bytearray(chunk_size)  # Compressed input, refilled with readinto
+        self.view = memoryview(self.chunk)
+        self.fill = bytearray(chunk_size)   # Source for run fills
+        self.fill_view = memoryview(self.fill)
+        self.fill_value = 0
+        self._file = None
+        self._length = 0 # Bytes currently in chunk
+        self._pos = 0    # Read position in chunk
+
+    def read_header(self, f):
+        """Reads and checks the header. Returns the decoded size in bytes."""
+        header = f.read(HEADER_SIZE)
+        if len(header) != HEADER_SIZE or header[:4] != MAGIC or header[4] != VERSION:
+            raise ValueError("Not a compressed frame")
+        return header[5] | (header[6] << 8)
+
+    def decode(self, f, out):
+        """
+        Decodes the file f (positioned at the start) into out, which must be at least
+        the decoded size long. Returns the number of bytes written.
+        """
+        size = self.read_header(f)
+        if size > len(out):
+            raise ValueError("Compressed frame too big for the buffer")
+        self._file = f
+        self._length = 0
+        self._pos = 0
+        written = 0
+        while written < size:
+            token = self._byte()
+            if token < 0x80:
+                count = (token & 0x3F) + 1
+                if written + count > size:
+                    raise ValueError("Corrupt compressed frame")
+                if token < 0x40:
+                    self._copy(out, written, count)
+                else:
+                    if written < COPY_DISTANCE:
+                        raise ValueError("Corrupt compressed frame")
+                    self._copy_back(out, written, count)
+            else:
+                count = (((token & 0x3F) << 8) | self._byte()) + 1
+                if written + count > size:
+                    raise ValueError("Corrupt compressed frame")
+                self._repeat(out, written, count, 0xFF if token < 0xC0 else self._byte())
+            written += count
+        self._file = None
+        return written
+
+    def _refill(self):
+        self._length = self._file.readinto(self.view)
+        self._pos = 0
+        if not self._length:
+            raise ValueError("Compressed frame truncated")
+
+    def _byte(self):
+        if self._pos >= self._length:
+            self._refill()
+        value = self.chunk[self._pos]
+        self._pos += 1
+        return value
+
+    def _copy(self, out, start, count):
+        """Copies count literal bytes from the input into out[start:]."""
+        while count:
+            if self._pos >= self._length:
+                self._refill()
+            n = min(count, self._length - self._pos)
+            out[start:start + n] = self.view[self._pos:self._pos + n]
+            self._pos += n
+            start += n
+            count -= n
+
+    def _copy_back(self, out, start, count):
+        """Copies count bytes from COPY_DISTANCE bytes back, in pieces that never overlap."""
+        while count:
+            n = min(count, COPY_DISTANCE)
+            out[start:start + n] = out[start - COPY_DISTANCE:start - COPY_DISTANCE + n]
+            start += n
+            count -= n
+
+    def _repeat(self, out, start, count, value):
+        """Writes count copies of value into out[start:]."""
+        if value != self.fill_value:
+            for i in range(len(self.fill)):
+                self.fill[i] = value
+            self.fill_value = value
+        while count:
+            n = min(count, len(self.fill))
+            out[start:start + n] = self.fill_view[:n]
+            start += n
+            count -= n
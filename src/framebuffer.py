@@ -0,0 +1,97 @@
+# framebuffer.py (Version 0.1.0 - Inky Pack framebuffer layout and dirty-region diffing)
+# This module knows how the Inky Pack (UC8151) 1-bpp framebuffer is laid out and
+# works out which parts of it changed between two frames.
+#
+# Layout: the buffer is column-major. Each of the WIDTH columns is BANKS bytes long,
+# and each byte holds 8 vertically stacked pixels (a "bank"), MSB = top pixel.
+# A set bit is a white pixel, a cleared bit is black.
+# It has no hardware imports so it can be exercised on a Linux host.
+
+WIDTH = 296
+HEIGHT = 128
+BANK_HEIGHT = 8                   # Pixels per byte, stacked vertically
+BANKS = HEIGHT // BANK_HEIGHT     # Bytes per column
+BUFFER_SIZE = WIDTH * BANKS       # 4736 bytes for the full panel
+
+
+def pixel_offset(x, y):
+    """Returns (byte_index, bit_mask) for the pixel at (x, y)."""
+    return x * BANKS + (y >> 3), 0x80 >> (y & 7)
+
+
+def find_dirty_regions(previous, current, merge_gap=8, max_regions=4):
+    """
+    Compares two framebuffers and returns the changed areas as a list of
+    (x, y, w, h) rectangles. y and h are always multiples of BANK_HEIGHT,
+    as required by the UC8151 partial update.
+
+    Args:
+        previous: The frame currently shown on the panel (bytes-like, BUFFER_SIZE long).
+        current: The newly rendered frame (bytes-like, BUFFER_SIZE long).
+        merge_gap: Dirty columns closer than this many pixels are joined into one rectangle.
+        max_regions: If more rectangles than this are found, they are merged into one
+                     bounding box (each partial update is a separate panel refresh).
+
+    Returns an empty list if the frames are identical.
+    """
+    regions = []
+    run_start = -1   # First column of the current dirty run
+    run_end = -1     # Last dirty column of the current dirty run
+    run_top = BANKS  # Lowest dirty bank index in the current run
+    run_bottom = -1  # Highest dirty bank index in the current run
+
+    for x in range(WIDTH):
+        base = x * BANKS
+        top = -1
+        bottom = -1
+        for bank in range(BANKS):
+            if current[base + bank] != previous[base + bank]:
+                if top < 0:
+                    top = bank
+                bottom = bank
+        if top < 0:
+            continue # Column unchanged
+
+        if run_start >= 0 and x - run_end - 1 <= merge_gap:
+            # Close enough to the previous dirty column, extend the run
+            run_end = x
+        else:
+            if run_start >= 0:
+                regions.append(_region(run_start, run_end, run_top, run_bottom))
+            run_start = x
+            run_end = x
+            run_top = BANKS
+            run_bottom = -1
+        if top < run_top:
+            run_top = top
+        if bottom > run_bottom:
+            run_bottom = bottom
+
+    if run_start >= 0:
+        regions.append(_region(run_start, run_end, run_top, run_bottom))
+
+    if len(regions) > max_regions:
+        regions = [bounding_box(regions)]
+    return regions
+
+
+def bounding_box(regions):
+    """Returns the smallest (x, y, w, h) rectangle containing all given rectangles."""
+    x0 = min(r[0] for r in regions)
+    y0 = min(r[1] for r in regions)
+    x1 = max(r[0] + r[2] for r in regions)
+    y1 = max(r[1] + r[3] for r in regions)
+    return (x0, y0, x1 - x0, y1 - y0)
+
+
+def regions_area(regions):
+    """Returns the total pixel area covered by a list of (x, y, w, h) rectangles."""
+    return sum(r[2] * r[3] for r in regions)
+
+
+def _region(first_column, last_column, top_bank, bottom_bank):
+    """Converts a run of dirty columns and banks into a pixel rectangle."""
+    return (first_column,
+            top_bank * BANK_HEIGHT,
+            last_column - first_column + 1,
+            (bottom_bank - top_bank + 1) * BANK_HEIGHT)
@@ -0,0 +1,103 @@
+# image_loader.py (Version 0.1.0 - Streaming loader for pre-packed 1-bpp frames)
+# Picture mode shows frames stored on flash already in the panel's native format:
+# exactly framebuffer.BUFFER_SIZE bytes, in the layout described in framebuffer.py
+# (column-major, 8 vertical pixels per byte, MSB = top, set bit = white).
+# Frames are produced on a host computer, so the device does no image decoding at all.
+#
+# The file is streamed in bands of columns straight into the PicoGraphics framebuffer
+# with readinto(), so no second copy of the image is ever held in RAM.
+# Compressed frames (.rle, see frame_codec.py) are decoded straight into the framebuffer.
+
+import os
+
+import framebuffer
+from frame_codec import FrameDecoder
+
+BAND_COLUMNS = 32                                 # Columns per read
+BAND_SIZE = BAND_COLUMNS * framebuffer.BANKS      # 512 bytes, one flash block
+
+class ImageLoader:
+    """
+    Streams frame files into the display buffer band by band.
+    The band buffer is allocated once and only used when the framebuffer
+    can't be written to directly.
+    """
+    def __init__(self, display_manager):
+        self.display_manager = display_manager
+        self.band = bytearray(BAND_SIZE)
+        self.band_view = memoryview(self.band)
+        self.decoder = FrameDecoder()
+
+    def _log(self, message, *args):
+        """Internal helper to log messages to display (if available) and console."""
+        if self.display_manager:
+            self.display_manager.add_log_message(message, *args)
+
+    def is_compressed(self, path):
+        """Returns True for compressed (.rle) frame files."""
+        return path.endswith(".rle")
+
+    def is_valid_frame(self, path):
+        """Returns True if path exists and is exactly one frame long (raw) or has a frame header (.rle)."""
+        try:
+            if self.is_compressed(path):
+                with open(path, "rb") as f:
+                    return self.decoder.read_header(f) == framebuffer.BUFFER_SIZE
+            return os.stat(path)[6] == framebuffer.BUFFER_SIZE
+        except (OSError, ValueError):
+            return False
+
+    def load(self, path, out=None):
+        """
+        Streams the frame at path into the display buffer (without updating the panel),
+        or into out, a writable buffer of framebuffer.BUFFER_SIZE bytes, if given.
+        Returns True on success, False if the file is missing, the wrong size, corrupt or unreadable.
+        """
+        if not self.is_valid_frame(path):
+            self._log("ImageLoader: {} is missing or not a {} byte frame.", path, framebuffer.BUFFER_SIZE)
+            return False
+
+        frame = out if out is not None else self.display_manager._framebuffer
+        try:
+            with open(path, "rb") as f:
+                if self.is_compressed(path):
+                    if frame is None:
+                        self._log("ImageLoader: Compressed frames need framebuffer access.")
+                        return False
+                    self.decoder.decode(f, frame)
+                elif frame is not None:
+                    self._stream_into(f, frame)
+                else:
+                    self._stream_pixels(f)
+            return True
+        except (OSError, ValueError) as e:
+            self._log("ImageLoader: Error reading {}: {}", path, e)
+            return False
+
+    def _stream_into(self, f, frame):
+        """Reads the file straight into the framebuffer, one band at a time."""
+        for start in range(0, framebuffer.BUFFER_SIZE, BAND_SIZE):
+            end = min(start + BAND_SIZE, framebuffer.BUFFER_SIZE)
+            if f.readinto(frame[start:end]) != end - start:
+                raise OSError("Frame file truncated")
+
+    def _stream_pixels(self, f):
+        """
+        Fallback when the framebuffer isn't accessible: reads each band into the
+        preallocated band buffer and plots its black pixels (much slower).
+        """
+        display_manager = self.display_manager
+        display = display_manager.display
+        display_manager.clear_display_buffer()
+        display.set_pen(display_manager.BLACK)
+        for first_column in range(0, framebuffer.WIDTH, BAND_COLUMNS):
+            read = f.readinto(self.band_view)
+            for i in range(read):
+                byte = self.band[i]
+                if byte == 0xFF:
+                    continue # All white
+                x = first_column + i // framebuffer.BANKS
+                y = (i % framebuffer.BANKS) * framebuffer.BANK_HEIGHT
+                for bit in range(framebuffer.BANK_HEIGHT):
+                    if not byte & (0x80 >> bit):
+                        display.pixel(x, y + bit)
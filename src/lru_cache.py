@@ -0,0 +1,61 @@
+# lru_cache.py (Version 0.1.0 - Small bounded LRU cache)
+# Shared by the text/glyph cache and other caches that need bounded memory use.
+
+from collections import OrderedDict
+
+class LRUCache:
+    """
+    A least-recently-used cache bounded by a total size.
+    Each entry has a size (1 by default, so the capacity is an entry count),
+    or e.g. its length in bytes, making the capacity a byte budget.
+    """
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict() # key -> (value, size), oldest first
+
+    def get(self, key, default=None):
+        """Returns the cached value for key (marking it most recently used), or default."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            self.misses += 1
+            return default
+        self._entries[key] = entry # Re-insert as the newest entry
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, value, size=1):
+        """Adds or replaces an entry, evicting the least recently used ones to stay within capacity."""
+        self.remove(key)
+        if size > self.capacity:
+            return # Would never fit, don't flush the whole cache for it
+        while self.size + size > self.capacity:
+            self.remove(next(iter(self._entries)))
+        self._entries[key] = (value, size)
+        self.size += size
+
+    def remove(self, key):
+        """Drops an entry if present."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[1]
+
+    def pop_oldest(self):
+        """Removes the least recently used entry and returns (key, value), e.g. to reuse its buffer."""
+        key = next(iter(self._entries))
+        value, size = self._entries.pop(key)
+        self.size -= size
+        return key, value
+
+    def clear(self):
+        """Drops all entries."""
+        self._entries = OrderedDict()
+        self.size = 0
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
@@ -1,185 +1,441 @@
-# main.py (Final version with separate screen files and optimized boot)
+# main.py (asyncio runtime: input, rendering and networking run as separate tasks)
+# Nothing here blocks for long: WiFi connections and NTP syncs run in their own tasks
+# (batched into short network windows with the radio off in between, see radio_manager.py),
+# so the buttons stay responsive and the panel keeps showing the last good time
+# while the network is slow or down. Under CPython the standard asyncio module is used,
+# so the same code runs on the host simulator (see host/run_app.py).
 
+from boot_profiler import profiler # First, so the boot is timed from here
 import time
 import network
 import machine
 import utime
-import gc
 
-from machine import Pin 
-from pimoroni import Button 
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio # CPython (host simulator)
+
+from machine import Pin
 
 # Import our custom manager classes
 from display_manager import DisplayManager
-from config_manager import ConfigManager 
-from time_manager import TimeManager     
-from wifi_manager import WifiManager 
+from config_manager import ConfigManager
+from time_manager import TimeManager
+from rtc_drift import DriftModel
+from wifi_manager import WifiManager
+import framebuffer
+from image_loader import ImageLoader
+from slideshow import Slideshow, find_frames
+from ring_log import DEBUG
+from flash_log import FlashLog
+from button_input import ButtonInput, PRESS, LONG_PRESS, RELEASE
+from power_manager import PowerManager
+from screen_registry import ScreenRegistry
+from memory_manager import MemoryManager
+from wifi_supervisor import WifiSupervisor, CONNECTED, BACKOFF
+from radio_manager import RadioManager
+from scheduler import Scheduler
 
-# Import screen rendering modules
-import screens.datetime_screen
-import screens.log_screen
-import screens.todo_picture_screen
+profiler.add("imports", utime.ticks_diff(utime.ticks_us(), profiler.origin))
 
 # --- Global Instance for Managers ---
 display_manager = None
 config_manager = None
-wifi_manager = None 
+wifi_manager = None
+wifi_supervisor = None
+radio_manager = None
 time_manager = None
+image_loader = None
+slideshow = None
+flash_log = None
+power_manager = None
+screen_registry = None
+memory_manager = None
 
 # --- Button Setup for Pico Inky Pack ---
 BUTTON_A_PIN = 12
 BUTTON_B_PIN = 13
 BUTTON_C_PIN = 14
 
-button_a = Button(BUTTON_A_PIN)
-button_b = Button(BUTTON_B_PIN)
-button_c = Button(BUTTON_C_PIN)
+# Presses are caught by pin IRQs and queued as events (see button_input.py)
+button_input = ButtonInput((BUTTON_A_PIN, BUTTON_B_PIN, BUTTON_C_PIN))
+BUTTON_A = 0
+BUTTON_B = 1
+BUTTON_C = 2
 
 # --- Display Modes (strings for clarity) ---
 DATE_TIME_MODE = "main_info"
-PICTURE_MODE = "todo_photo"
+PICTURE_MODE = "photo"
 LOG_MODE = "log"
+DIAGNOSTICS_MODE = "diagnostics"
+
+# Screens: mode -> module (imported the first time it's shown), the context objects its
+# render() takes, and whether it may be unloaded when memory is low
+SCREENS = (
+    (DATE_TIME_MODE, "screens.datetime_screen", ("time_manager", "wifi_supervisor"), False), # Shown most of the time
+    (LOG_MODE, "screens.log_screen", (), True),
+    (PICTURE_MODE, "screens.picture_screen", ("slideshow",), True),
+    (DIAGNOSTICS_MODE, "screens.diagnostics_screen", ("boot_profiler", "memory_manager"), True),
+)
 
 # --- Screen Management Variables ---
-current_screen_mode = DATE_TIME_MODE 
-last_drawn_screen_mode = None     
-should_refresh_display = True     
+current_screen_mode = DATE_TIME_MODE
+last_drawn_screen_mode = None
+should_refresh_display = True
 
+# --- Task Timing ---
+LOG_FLUSH_CHECK_MS = 5 * 1000          # How often buffered flash log entries are considered
+POWER_SETTLE_MS = 20                   # Idle time before sleeping, so woken tasks can finish first
+POWER_REPORT_MS = 60 * 60 * 1000       # How often the power summary is logged in low-power mode
+
+# Created in run(), inside the event loop
+render_event = None # Set to wake the render task
+wifi_status = "" # WiFi status line last seen by on_wifi_change()
+
+# Deadlines the low-power sleep must wake for: "render" (the screen's next content
+# change), "log" (the flash log's next batch write) and "radio" (the next network check)
+scheduler = Scheduler()
+
+
+async def sleep_ms(ms):
+    """asyncio.sleep_ms for both MicroPython and CPython."""
+    await asyncio.sleep(ms / 1000)
 
-# --- Main Application Loop ---
-def main_loop():
-    global display_manager, config_manager, wifi_manager, time_manager 
-    global current_screen_mode, last_drawn_screen_mode, should_refresh_display
+
+def request_render():
+    """Asks the render task to redraw the current screen."""
+    global should_refresh_display
+    should_refresh_display = True
+    if render_event:
+        render_event.set()
+
+
+# --- Setup ---
+def setup():
+    """
+    Creates the managers from config.toml. Doesn't touch the network:
+    connecting and syncing is left to the WiFi and NTP tasks.
+    """
+    global display_manager, config_manager, wifi_manager, wifi_supervisor, radio_manager, time_manager
+    global image_loader, slideshow, flash_log, power_manager, screen_registry, memory_manager
+    global current_screen_mode
 
     # Step 1: Initialize Display Manager.
     # This will cause ONE initial flash due to display.clear() in its __init__ method.
     # This is typically unavoidable for e-ink display initialization.
-    display_manager = DisplayManager()
+    with profiler.span("display"):
+        display_manager = DisplayManager()
     display_manager.add_log_message("System booting...") # Logs to console
     display_manager.add_log_message("Initializing managers...") # Logs to console
-    
-    config_manager = ConfigManager(display_manager) 
-    
+
+    screen_registry = ScreenRegistry(display_manager)
+    for mode, module_name, args, unloadable in SCREENS:
+        screen_registry.register(mode, module_name, args, unloadable)
+
+    config_manager = ConfigManager(display_manager)
+
     config = config_manager.load_config()
     if not config:
         display_manager.add_log_message("Failed to load config.toml! Resetting...")
         # If config fails, we must show an error. Use the log screen for details, then reset.
         current_screen_mode = LOG_MODE # Set mode for eventual display
-        screens.log_screen.render(display_manager) # Force render error on screen immediately
+        screen_registry.render(LOG_MODE) # Force render error on screen immediately
         time.sleep(5)
-        machine.reset() 
+        machine.reset()
 
     # Extract configs
     wifi_config = config.get("wifi", {})
     ntp_config = config.get("ntp", {})
+    display_config = config.get("display", {})
+    picture_config = config.get("picture", {})
+    log_config = config.get("log", {})
+    power_config = config.get("power", {})
+    screens_config = config.get("screens", {})
+    diagnostics_config = config.get("diagnostics", {})
+    memory_config = config.get("memory", {})
+
+    # Garbage is collected when free heap runs low or after heavy operations, not after every render
+    memory_manager = MemoryManager(display_manager, memory_config)
+
+    # Boot timings kept for the diagnostics screen
+    profiler.keep = diagnostics_config.get("boot_history", 5)
+
+    # Screens not being shown are unloaded when free memory drops below this
+    screen_registry.unload_below = screens_config.get("unload_below", 0)
+
+    # Log level: messages below it (e.g. "debug" button presses) are dropped at no cost.
+    # Entries are only printed to the console with [log] echo = true (e.g. while debugging over USB).
+    display_manager.configure_log(log_config)
+
+    # Persistent log on flash, written in batches (boot messages so far are included)
+    if log_config.get("persist", True):
+        flash_log = FlashLog(
+            log_config.get("directory", "logs"),
+            segment_bytes=log_config.get("segment_bytes", 4096),
+            max_segments=log_config.get("max_segments", 4),
+        )
+        display_manager.log.set_sink(flash_log)
+
+    # Low-power mode: lightsleep between updates
+    power_manager = PowerManager(display_manager, power_config)
+    if power_manager.enabled:
+        display_manager.add_log_message("Low-power mode on.")
+
+    # The radio is only powered for network windows, unless always_on (never in low-power mode)
+    always_on = wifi_config.get("always_on", False) and not power_manager.enabled
 
     # Initialize WifiManager
     wifi_manager = WifiManager(
-        ssid=wifi_config.get("ssid"), 
-        password=wifi_config.get("password"), 
+        ssid=wifi_config.get("ssid"),
+        password=wifi_config.get("password"),
         display_manager=display_manager,
+        reuse_ip=wifi_config.get("reuse_ip", False),
+        power_on=always_on,
     )
+    power_manager.set_radio(wifi_manager.is_active())
+    # Connects with backoff; screens keep running meanwhile
+    wifi_supervisor = WifiSupervisor(wifi_manager, display_manager, wifi_config, connect=connect_wifi)
+    wifi_supervisor.on_change = on_wifi_change
+    radio_manager = RadioManager(wifi_supervisor, power_manager, display_manager, always_on=always_on)
 
     # Initialize TimeManager
-    ntp_server = ntp_config.get("server", "pool.ntp.org") 
-    time_manager = TimeManager(ntp_server, display_manager) 
-
-    # --- Connection and Sync Steps ---
-    # Attempt WiFi connection. Only show error if it fails.
-    if not wifi_manager.connect_to_wifi():
-        display_manager.add_log_message("Exiting due to WiFi connection failure.")
-        current_screen_mode = LOG_MODE # Set screen mode to log/error
-        display_manager.show_connection_error() # Directly show error on screen and update
-        # Enter infinite loop displaying error, waiting for user interaction or reset
-        while True: 
-            # Allow cycling to log screen for more details if user presses C
-            if button_c.read():
-                current_screen_mode = LOG_MODE
-                # If we switch to log, force a refresh for the logs
-                screens.log_screen.render(display_manager)
-                time.sleep(0.5) 
-            elif button_a.read() or button_b.read(): 
-                # If user presses A or B, attempt to go back to main screen but keep showing error
-                current_screen_mode = DATE_TIME_MODE 
-                display_manager.show_connection_error() # Re-show error message
-                time.sleep(0.5)
-            gc.collect()
-            utime.sleep_ms(100) 
-
-    # Attempt NTP Time Sync. Only show error if it fails.
-    if not time_manager.sync_ntp_time(): 
-        display_manager.add_log_message("Exiting due to NTP sync failure.")
-        current_screen_mode = LOG_MODE # Set screen mode to log/error
-        display_manager.show_ntp_error() # Directly show error on screen and update
-        # Enter infinite loop displaying error, waiting for user interaction or reset
-        while True: 
-            # Allow cycling to log screen for more details if user presses C
-            if button_c.read():
-                current_screen_mode = LOG_MODE
-                # If we switch to log, force a refresh for the logs
-                screens.log_screen.render(display_manager)
-                time.sleep(0.5)
-            elif button_a.read() or button_b.read():
-                # If user presses A or B, attempt to go back to main screen but keep showing error
-                current_screen_mode = DATE_TIME_MODE
-                display_manager.show_ntp_error() # Re-show error message
-                time.sleep(0.5)
-            gc.collect()
-            utime.sleep_ms(100) 
-
-    # If we reach here, WiFi and NTP sync were successful.
-    display_manager.add_log_message("System ready.") # Logs to console
-    
-    # Set initial screen to DATE_TIME_MODE and flag for first render in main loop.
-    # This will be the first time the date/time screen is drawn to the e-ink.
+    ntp_servers = [server.strip() for server in ntp_config.get("servers", ntp_config.get("server", "pool.ntp.org")).split(",")]
+    # The RTC's drift is estimated at each sync (and saved), corrected for, and sets the resync interval
+    drift_model = DriftModel(display_manager, ntp_config)
+    time_manager = TimeManager(ntp_servers, display_manager, int(ntp_config.get("timeout", 2) * 1000), drift_model)
+    radio_manager.add_job("ntp", time_manager.sync_due, ntp_job)
+
+    # Update speed / ghost-clearing policy, using London local time for the daily clear
+    display_manager.configure(display_config, clock=lambda: time_manager.get_london_localtime()[0])
+
+    # Picture mode is a slideshow of pre-packed frames streamed from flash
+    image_loader = ImageLoader(display_manager)
+    picture_paths = find_frames(picture_config.get("directory", "pictures"))
+    if not picture_paths and picture_config.get("path"):
+        picture_paths = [picture_config.get("path")] # Single picture
+    slideshow = Slideshow(
+        display_manager, image_loader, picture_paths,
+        cache_bytes=picture_config.get("cache_bytes", 4 * framebuffer.BUFFER_SIZE),
+        interval_s=picture_config.get("interval", 0),
+    )
+    display_manager.add_log_message("Slideshow: {} picture(s).", len(picture_paths))
+
+    screen_registry.set_context(time_manager=time_manager, wifi_supervisor=wifi_supervisor, slideshow=slideshow,
+                                boot_profiler=profiler, memory_manager=memory_manager)
+
+    # The clock screen shows "Time Not Synced" until the NTP task has set the RTC
     current_screen_mode = DATE_TIME_MODE
-    should_refresh_display = True # Forces the first render in the main loop
+    request_render()
+
+
+# --- Button Handlers ---
+def on_button_a():
+    global current_screen_mode
+    display_manager.add_log_message("Button A pressed!", level=DEBUG)
+    if current_screen_mode == DATE_TIME_MODE:
+        # "Press A to retry": WiFi or a job (e.g. NTP) failing, or the clock not synced yet
+        if wifi_supervisor.failures or radio_manager.failing() or not time_manager.is_synced():
+            radio_manager.retry_now() # Opens a window now, without the job backoff
+            if radio_manager.always_on:
+                wifi_supervisor.retry_now() # Windows wait for the supervisor's reconnect
+    current_screen_mode = DATE_TIME_MODE
+    request_render()
+
+def on_button_b():
+    global current_screen_mode
+    if current_screen_mode == LOG_MODE:
+        screen_registry.module(LOG_MODE).scroll(display_manager, -1) # Newer messages
+    elif current_screen_mode == PICTURE_MODE:
+        display_manager.add_log_message("Button B pressed! Next picture...", level=DEBUG)
+        slideshow.advance()
+    else:
+        display_manager.add_log_message("Button B pressed! Switching to Picture Mode...", level=DEBUG)
+        current_screen_mode = PICTURE_MODE
+    request_render()
+
+def on_button_c():
+    global current_screen_mode
+    if current_screen_mode == LOG_MODE:
+        screen_registry.module(LOG_MODE).scroll(display_manager, 1, flash_log) # Older messages, then flash history
+    else:
+        display_manager.add_log_message("Button C pressed! Switching to Log mode...", level=DEBUG)
+        current_screen_mode = LOG_MODE
+        screen_registry.module(LOG_MODE).reset()
+    request_render()
 
-    # --- Main Application Loop ---
+PRESS_HANDLERS = (on_button_a, on_button_b, on_button_c)
+press_modes = [None, None, None] # Screen mode each button was last pressed in
+long_pressed = [False, False, False] # The current (or last) press became a LONG_PRESS
+
+def on_button_event(kind, button):
+    """
+    Dispatches a queued button event. Holding B or C repeats it on the screens where
+    that scrolls (log) or steps (pictures); holding A forces a full, ghost-clearing refresh.
+    Holding C from any screen but the log opens the diagnostics screen; there a tap of C
+    only switches to the log once released, so a hold doesn't render the log first.
+    """
+    global current_screen_mode
+    if kind == PRESS:
+        press_modes[button] = current_screen_mode
+        long_pressed[button] = False
+        if button == BUTTON_C and current_screen_mode != LOG_MODE:
+            return # Log on release, diagnostics on LONG_PRESS
+        PRESS_HANDLERS[button]()
+    elif kind == RELEASE:
+        if button == BUTTON_C and press_modes[button] != LOG_MODE and not long_pressed[button]:
+            on_button_c()
+    elif button == BUTTON_C and kind == LONG_PRESS and press_modes[button] != LOG_MODE:
+        long_pressed[button] = True
+        display_manager.add_log_message("Button C held: diagnostics.", level=DEBUG)
+        current_screen_mode = DIAGNOSTICS_MODE
+        request_render()
+    elif button == BUTTON_A:
+        if kind == LONG_PRESS:
+            display_manager.add_log_message("Button A held: clearing ghosting.", level=DEBUG)
+            display_manager.refresh_policy.request_ghost_clear()
+            display_manager.invalidate()
+            request_render()
+    elif current_screen_mode in (LOG_MODE, PICTURE_MODE):
+        PRESS_HANDLERS[button]() # LONG_PRESS and REPEAT keep scrolling / stepping
+
+
+# --- Tasks ---
+async def input_task():
+    """Handles queued button events; sleeps until a button IRQ arrives."""
+    while True:
+        event = button_input.get()
+        while event is not None:
+            on_button_event(event[0], event[1])
+            event = button_input.get()
+        await button_input.wait()
+
+
+def render_current_screen():
+    """Renders the current screen. Returns ms until its content next changes (None = only on request)."""
+    return screen_registry.render(current_screen_mode)
+
+
+async def render_task():
+    """Redraws the screen when asked to (render_event) or when its content deadline is reached."""
+    global last_drawn_screen_mode, should_refresh_display
+    next_refresh_ms = None
+    while True:
+        if not should_refresh_display and current_screen_mode == last_drawn_screen_mode:
+            try:
+                await asyncio.wait_for(render_event.wait(), None if next_refresh_ms is None else next_refresh_ms / 1000)
+            except asyncio.TimeoutError:
+                # The screen's content deadline was reached (e.g. new minute)
+                if current_screen_mode == PICTURE_MODE:
+                    slideshow.advance() # Slideshow auto-advance
+            render_event.clear()
+
+        should_refresh_display = False
+        last_drawn_screen_mode = current_screen_mode
+        # Loading a picture allocates (and frees) frame-sized buffers
+        with memory_manager.operation(current_screen_mode, heavy=current_screen_mode == PICTURE_MODE):
+            next_refresh_ms = render_current_screen()
+        scheduler.schedule("render", next_refresh_ms)
+        if not profiler.finished:
+            profiler.mark("first_render")
+            if time_manager.is_synced():
+                if current_screen_mode == DATE_TIME_MODE:
+                    profiler.mark("clock") # Time to the first synced clock
+                profiler.finish()
+
+        # Housekeeping, only after doing real work
+        memory_manager.maybe_collect()
+        await sleep_ms(0) # Let input run between back-to-back renders
+
+
+async def connect_wifi():
+    """Connects to WiFi (the network stack allocates heavily while connecting)."""
+    with memory_manager.operation("wifi", heavy=True):
+        return await wifi_manager.connect_async()
+
+
+def on_wifi_change(state):
+    """WiFi supervisor state changes: sync once connected, and show the new status."""
+    global wifi_status
+    if state == CONNECTED and radio_manager.always_on:
+        radio_manager.request() # Run due jobs as soon as there's a connection
+    elif state == BACKOFF:
+        profiler.finish() # Boot over without a synced clock
+    status = wifi_supervisor.status_text()
+    if status != wifi_status: # Only a failure streak starting or ending shows
+        wifi_status = status
+        if current_screen_mode == DATE_TIME_MODE:
+            request_render() # The clock screen shows the WiFi status
+
+
+async def ntp_job():
+    """Network job: syncs the RTC from NTP. The clock keeps running (and showing) meanwhile."""
+    was_synced = time_manager.is_synced()
+    with memory_manager.operation("ntp", heavy=True):
+        synced = await time_manager.sync_ntp_time()
+    if synced:
+        if not was_synced:
+            display_manager.add_log_message("System ready.")
+        request_render() # The time may have jumped
+    else:
+        profiler.finish() # Boot over without a synced clock
+    return synced
+
+
+async def log_task():
+    """Writes buffered log entries once they've waited long enough (batched to save flash wear)."""
     while True:
-        # --- Button Handling ---
-        if button_a.read(): 
-            display_manager.add_log_message("Button A pressed!")
-            if current_screen_mode == DATE_TIME_MODE:
-                # If already on date_time, force a refresh (e.g., to update seconds)
-                should_refresh_display = True 
-            else:
-                current_screen_mode = DATE_TIME_MODE
-                should_refresh_display = True 
-            time.sleep(0.5) # Debounce
-
-        if button_b.read():
-            display_manager.add_log_message("Button B pressed! Switching to Picture Mode...")
-            current_screen_mode = PICTURE_MODE
-            should_refresh_display = True 
-            time.sleep(0.5) # Debounce
-
-        if button_c.read():
-            display_manager.add_log_message("Button C pressed! Switching to Log mode...")
-            current_screen_mode = LOG_MODE
-            should_refresh_display = True 
-            time.sleep(0.5) # Debounce
-
-        # --- Screen Rendering ---
-        # Only redraw the screen if the mode has changed or if a refresh is explicitly requested
-        if current_screen_mode != last_drawn_screen_mode or should_refresh_display:
-            if current_screen_mode == DATE_TIME_MODE:
-                screens.datetime_screen.render(display_manager, time_manager)
-            elif current_screen_mode == LOG_MODE:
-                screens.log_screen.render(display_manager)
-            elif current_screen_mode == PICTURE_MODE:
-                screens.todo_picture_screen.render(display_manager)
-            
-            last_drawn_screen_mode = current_screen_mode
-            should_refresh_display = False # Reset flag after drawing
-
-        # --- Periodic Tasks ---
-        time_manager.check_and_sync_ntp() 
-
-        # Housekeeping
-        gc.collect() 
-        time.sleep(0.1) # Short delay to prevent busy-waiting
+        await sleep_ms(LOG_FLUSH_CHECK_MS)
+        flash_log.flush_if_idle()
+
+
+def can_sleep():
+    """True when nothing needs the CPU until the next deadline or button press."""
+    return not (should_refresh_display or power_manager.radio_on
+                or button_input.any_held() or button_input.pending())
+
+
+async def power_task():
+    """
+    Low-power mode: once the other tasks are idle, lightsleeps until the earliest
+    deadline (the screen's next content change, the flash log's batch write or the next
+    network check) or a button press, whichever comes first.
+    """
+    last_report = utime.ticks_ms()
+    while True:
+        await sleep_ms(POWER_SETTLE_MS)
+        if not can_sleep():
+            continue
+        if flash_log:
+            flash_log.flush_if_idle() # Idle now; log_task may not be due before the sleep ends
+            scheduler.schedule("log", flash_log.ms_until_flush())
+        scheduler.schedule("radio", radio_manager.ms_until_check())
+        power_manager.sleep(scheduler.ms_until_next(power_manager.MAX_SLEEP_MS))
+        if utime.ticks_diff(utime.ticks_ms(), last_report) >= POWER_REPORT_MS:
+            last_report = utime.ticks_ms()
+            power_manager.log_summary()
+
+
+async def run():
+    """Starts every task and runs until one of them fails."""
+    global render_event
+    render_event = asyncio.Event()
+    tasks = [input_task(), render_task(), radio_manager.run()]
+    if radio_manager.always_on:
+        tasks.append(wifi_supervisor.run()) # Keeps the connection up between windows
+    if power_manager.enabled:
+        tasks.append(power_task())
+    if flash_log:
+        tasks.append(log_task())
+    await asyncio.gather(*tasks)
+
+
+# --- Main Application Loop ---
+def main_loop():
+    with profiler.span("setup"): # Includes the display and config phases
+        setup()
+    asyncio.run(run())
 
 # --- Entry Point ---
 if __name__ == "__main__":
-    main_loop()
\ No newline at end of file
+    main_loop()
@@ -0,0 +1,159 @@
+# memory_manager.py (Version 0.1.0 - Garbage collection on demand, heap statistics)
+# A full gc.collect() takes several ms on the RP2040, so instead of collecting after
+# every bit of work the app asks maybe_collect(), which only collects once free heap
+# has dropped below collect_below. Heavy operations (loading a picture, an NTP sync, a
+# WiFi connection) are wrapped in operation(name, heavy=True), which collects after them.
+# (MicroPython also collects by itself whenever an allocation would otherwise fail.)
+#
+# Each operation records how much it allocated (the gc.mem_alloc() delta, which can be
+# negative when an automatic collection ran meanwhile), and every reading of free heap
+# updates the low-water mark. After a collection that leaves less than collect_below
+# free (or every PROBE_INTERVAL_MS otherwise) a frame-sized block is test-allocated: if
+# that fails with plenty of heap free, the heap is fragmented, and a warning is logged
+# before a real allocation ends in MemoryError.
+#
+# gc.mem_free/mem_alloc only exist on MicroPython; host tests pass their own. Without
+# them there's no way to tell the heap is short, so maybe_collect() never collects.
+
+import gc
+import utime
+
+import framebuffer
+from ring_log import WARNING
+
+class MemoryManager:
+    """
+    Decides when to collect garbage and keeps heap statistics.
+    """
+    def __init__(self, display_manager, memory_config=None, mem_free=None, mem_alloc=None):
+        memory_config = memory_config or {}
+        self.display_manager = display_manager
+        self.collect_below = memory_config.get("collect_below", 48 * 1024) # Collect once free heap is below this
+        self.warn_below = memory_config.get("warn_below", 16 * 1024)       # Warn when a collection leaves less free
+        self.PROBE_BYTES = framebuffer.BUFFER_SIZE # Largest block the app allocates (a frame)
+        self.PROBE_INTERVAL_MS = 10 * 60 * 1000    # Fragmentation check interval while the heap is roomy
+
+        self.mem_free = mem_free or getattr(gc, "mem_free", None)
+        self.mem_alloc = mem_alloc or getattr(gc, "mem_alloc", None)
+
+        self.collections = 0
+        self.collect_ms = 0      # Total time spent collecting
+        self.skipped = 0         # maybe_collect() calls that didn't need to collect
+        self.low_water = None    # Lowest free heap seen
+        self.operations = {}     # name -> [count, last delta, largest delta] in bytes
+        self.warnings = 0
+        self._warned = False     # A low/fragmented warning is active (logged once until it clears)
+        self._probed_at = None   # ticks_ms of the last fragmentation probe
+
+    def _log(self, message, *args):
+        """Internal helper to log messages to display (if available) and console."""
+        if self.display_manager:
+            self.display_manager.add_log_message(message, *args, level=WARNING)
+
+    def free(self):
+        """Returns free heap in bytes (None if unknown), updating the low-water mark."""
+        if not self.mem_free:
+            return None
+        free = self.mem_free()
+        if self.low_water is None or free < self.low_water:
+            self.low_water = free
+        return free
+
+    def collect(self):
+        """Collects now, then checks for low or fragmented memory."""
+        self.free() # Low-water mark before the garbage is reclaimed
+        start = utime.ticks_ms()
+        gc.collect()
+        self.collect_ms += utime.ticks_diff(utime.ticks_ms(), start)
+        self.collections += 1
+        self._check()
+
+    def maybe_collect(self):
+        """Collects only if free heap is below collect_below (known). Returns True if it collected."""
+        free = self.free()
+        if free is None or free >= self.collect_below:
+            self.skipped += 1
+            return False
+        self.collect()
+        return True
+
+    def _check(self):
+        """Warns (once until it clears) if free heap is low or the heap is too fragmented for a frame."""
+        free = self.free()
+        if free is None:
+            return
+        problem = None
+        if free < self.warn_below:
+            problem = "low"
+        elif free >= 2 * self.PROBE_BYTES:
+            now = utime.ticks_ms()
+            if free >= self.collect_below and self._probed_at is not None and \
+                    utime.ticks_diff(now, self._probed_at) < self.PROBE_INTERVAL_MS:
+                return # Plenty free and probed recently: keep the last verdict
+            self._probed_at = now
+            try:
+                probe = bytearray(self.PROBE_BYTES)
+                del probe
+            except MemoryError:
+                problem = "fragmented"
+        if problem is None:
+            self._warned = False
+        elif not self._warned:
+            self._warned = True
+            self.warnings += 1
+            if problem == "low":
+                self._log("Memory low: {} bytes free.", free)
+            else:
+                self._log("Memory fragmented: no {} byte block with {} bytes free.", self.PROBE_BYTES, free)
+
+    def operation(self, name, heavy=False):
+        """
+        Returns a context manager that records the allocation delta of the work done
+        inside it under name, and collects afterwards if heavy.
+        """
+        return _Operation(self, name, heavy)
+
+    def _record(self, name, delta):
+        stats = self.operations.get(name)
+        if stats is None:
+            self.operations[name] = [1, delta, delta]
+        else:
+            stats[0] += 1
+            stats[1] = delta
+            if delta > stats[2]:
+                stats[2] = delta
+
+    def get_stats(self):
+        """Returns a dict of collection counts, the heap low-water mark and per-operation allocations."""
+        return {
+            "free": self.free(),
+            "low_water": self.low_water,
+            "collections": self.collections,
+            "collect_ms": self.collect_ms,
+            "skipped": self.skipped,
+            "warnings": self.warnings,
+            "operations": dict((name, tuple(stats)) for name, stats in self.operations.items()),
+        }
+
+class _Operation:
+    """Context manager for MemoryManager.operation()."""
+    def __init__(self, manager, name, heavy):
+        self.manager = manager
+        self.name = name
+        self.heavy = heavy
+        self.start = 0
+
+    def __enter__(self):
+        mem_alloc = self.manager.mem_alloc
+        self.start = mem_alloc() if mem_alloc else 0
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        manager = self.manager
+        if manager.mem_alloc:
+            manager._record(self.name, manager.mem_alloc() - self.start)
+        if self.heavy:
+            manager.collect()
+        else:
+            manager.free()
+        return False
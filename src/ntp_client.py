@@ -0,0 +1,241 @@
+# ntp_client.py (Version 0.1.0 - Multi-server SNTP client with sub-second RTC setting)
+# ntptime.settime() asks one server, blocks until it answers, ignores the round trip
+# and can only set whole seconds. This client sends one request to each configured
+# server at once from a non-blocking UDP socket, and collects the first WANTED good
+# replies (or whatever has arrived by the timeout) without holding up the event loop.
+#
+# Each reply gives the standard NTP offset and round-trip delay:
+#     offset = ((t2 - t1) + (t3 - t4)) / 2     delay = (t4 - t1) - (t3 - t2)
+# where t1/t4 are our send/receive times and t2/t3 the server's receive/transmit times.
+# Replies with a delay over MAX_DELAY_MS are dropped, then any that are more than
+# MAX_SPREAD_MS from the median offset (a "falseticker"), and the survivor with the
+# lowest delay (the tightest error bound) is used.
+#
+# The RTC only counts whole seconds, so our side is timed with ticks_us from the moment
+# the RTC second changes (found by polling), which makes t1/t4 and the offset accurate
+# to a millisecond or so. All arithmetic is in integer microseconds relative to that
+# second: floats on the RP2040 are single precision, far too coarse for epoch times.
+# The RTC can't be slewed, so an offset of at least STEP_MIN_MS is corrected by waiting
+# for the next true second boundary and setting the RTC to it; a smaller one is left.
+#
+# Servers are "host" or "host:port" (the host simulator runs a local stand-in server).
+
+import machine
+import random
+import socket
+import struct
+import utime
+
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio # CPython (host simulator)
+
+# Seconds from the NTP era (1900) to the device epoch (2000 on older MicroPython ports, else 1970)
+NTP_DELTA = 3155673600 if utime.gmtime(0)[0] == 2000 else 2208988800
+NTP_PORT = 123
+
+def _timestamp_us(seconds, fraction, base):
+    """An NTP timestamp as microseconds after the device epoch second base."""
+    if seconds < 0x80000000:
+        seconds += 0x100000000 # NTP era 1 (after 2036)
+    return (seconds - NTP_DELTA - base) * 1000000 + ((fraction * 1000000) >> 32)
+
+class NtpClient:
+    """
+    Queries several NTP servers at once and sets the RTC from the best reply.
+    """
+    def __init__(self, servers, display_manager=None, timeout_ms=2000):
+        self.servers = servers
+        self.display_manager = display_manager
+        self.timeout_ms = timeout_ms
+        self.WANTED = 3           # Good replies to wait for (fewer if fewer servers)
+        self.POLL_MS = 5          # Socket polling interval while waiting for replies
+        self.MAX_DELAY_MS = 500   # Replies with a longer round trip are too uncertain to use
+        self.MAX_SPREAD_MS = 100  # Furthest a usable offset may be from the median offset
+        self.STEP_MIN_MS = 20     # Smaller offsets aren't worth resetting the RTC for
+
+        self._addresses = {}      # server -> resolved address (DNS lookups block, so they're cached
+                                  # until the server fails to answer: pool addresses come and go)
+        self.last = None          # Result of the last sync, see sync()
+        self.syncs = 0
+        self.failures = 0
+
+    def _log(self, message, *args):
+        """Internal helper to log messages to display (if available) and console."""
+        if self.display_manager:
+            self.display_manager.add_log_message(message, *args)
+
+    def _address(self, server):
+        """Resolves "host[:port]" (cached). Returns None if the lookup fails."""
+        address = self._addresses.get(server)
+        if address is None:
+            host, _, port = server.partition(":")
+            try:
+                address = socket.getaddrinfo(host, int(port) if port else NTP_PORT)[0][-1]
+            except (OSError, ValueError) as e:
+                self._log("NTP: can't resolve {}: {}", server, e)
+                return None
+            self._addresses[server] = address
+        return address
+
+    async def _rtc_second(self):
+        """
+        Waits for the RTC second to change. Returns (epoch second, ticks_us when it began),
+        or (current second, None) if it didn't change within 1.1 s (a stopped clock).
+        """
+        second = utime.time()
+        deadline = utime.ticks_add(utime.ticks_ms(), 1100)
+        while utime.ticks_diff(deadline, utime.ticks_ms()) > 0:
+            await asyncio.sleep(0.001)
+            now = utime.time()
+            if now != second:
+                return now, utime.ticks_us()
+        return second, None
+
+    async def _query(self):
+        """
+        Sends a request to every server and collects replies until WANTED good ones have
+        arrived or the timeout passes. Returns a list of [server, t1 ticks_us, t4 ticks_us,
+        t2 seconds, t2 fraction, t3 seconds, t3 fraction]. Servers that sent no good reply
+        are looked up again next time.
+        """
+        sent = {} # originate timestamp (our random transmit timestamp, echoed back) -> [server, t1]
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        replies = []
+        queried = []
+        try:
+            sock.setblocking(False)
+            for server in self.servers:
+                address = self._address(server)
+                if address is None:
+                    continue
+                # LI 0, version 4, mode 3 (client); the transmit timestamp is a nonce, as
+                # our idea of the time is what's in question (and it foils spoofed replies)
+                nonce = struct.pack("!II", random.getrandbits(32), random.getrandbits(32))
+                try:
+                    t1 = utime.ticks_us()
+                    sock.sendto(b"\x23" + bytes(39) + nonce, address)
+                except OSError as e:
+                    self._log("NTP: can't send to {}: {}", server, e)
+                    self._addresses.pop(server, None) # Look it up again next time
+                    continue
+                sent[nonce] = [server, t1]
+                queried.append(server)
+
+            wanted = min(self.WANTED, len(sent))
+            deadline = utime.ticks_add(utime.ticks_ms(), self.timeout_ms)
+            while len(replies) < wanted and utime.ticks_diff(deadline, utime.ticks_ms()) > 0:
+                try:
+                    packet = sock.recv(48)
+                except OSError: # EAGAIN: nothing yet
+                    await asyncio.sleep(self.POLL_MS / 1000)
+                    continue
+                t4 = utime.ticks_us()
+                if len(packet) < 48:
+                    continue
+                header, stratum = packet[0], packet[1]
+                request = sent.pop(packet[24:32], None) # Originate timestamp must be one of ours
+                if (request is None or header & 0x07 != 4   # Not a server reply to us
+                        or header >> 6 == 3                 # Leap indicator "unsynchronised"
+                        or not 1 <= stratum <= 15):         # Kiss-o'-death or unsynchronised
+                    continue
+                t2, t2_fraction, t3, t3_fraction = struct.unpack("!IIII", packet[32:48])
+                if t3 == 0:
+                    continue
+                replies.append(request + [t4, t2, t2_fraction, t3, t3_fraction])
+        finally:
+            sock.close()
+        answered = [reply[0] for reply in replies]
+        for server in queried:
+            if server not in answered:
+                self._addresses.pop(server, None) # A dead address never fails to send to
+        return replies
+
+    def _select(self, samples):
+        """
+        Filters [server, offset_us, delay_us] samples by delay and distance from the median
+        offset. Returns the lowest-delay survivor, or None, and the number rejected.
+        """
+        usable = [s for s in samples if 0 <= s[2] <= self.MAX_DELAY_MS * 1000]
+        if not usable:
+            return None, len(samples)
+        offsets = sorted(s[1] for s in usable)
+        middle = len(offsets) // 2
+        median = offsets[middle] if len(offsets) % 2 else (offsets[middle - 1] + offsets[middle]) // 2
+        usable = [s for s in usable if abs(s[1] - median) <= self.MAX_SPREAD_MS * 1000]
+        if not usable:
+            return None, len(samples) # Two servers that disagree: no way to tell which is right
+        usable.sort(key=lambda s: s[2])
+        return usable[0], len(samples) - len(usable)
+
+    async def _step(self, base, base_ticks, offset_us):
+        """Waits for the next true second boundary and sets the RTC to it."""
+        now_us = utime.ticks_diff(utime.ticks_us(), base_ticks) + offset_us # True time after base
+        second = now_us // 1000000 + 1
+        wait_us = second * 1000000 - now_us
+        if wait_us > 2000:
+            await asyncio.sleep((wait_us - 2000) / 1000000)
+        target = utime.ticks_add(base_ticks, second * 1000000 - offset_us)
+        while utime.ticks_diff(target, utime.ticks_us()) > 0:
+            pass # The last couple of ms, too short for the scheduler to hit reliably
+        year, month, day, hour, minute, sec, weekday, _ = utime.gmtime(base + second)
+        machine.RTC().datetime((year, month, day, weekday, hour, minute, sec, 0))
+
+    async def sync(self):
+        """
+        Queries the servers and corrects the RTC. Returns True on success, with self.last
+        set to a dict of the server used, its offset and delay in ms (offset > 0: the RTC
+        was slow), the replies received and rejected, and whether the RTC was stepped.
+        """
+        replies = await self._query()
+        if not replies:
+            self.failures += 1
+            self._log("NTP: no reply from {} server(s).", len(self.servers))
+            return False
+
+        # Our send/receive times, in us after the start of the current RTC second
+        base, base_ticks = await self._rtc_second()
+        phase_known = base_ticks is not None
+        if not phase_known:
+            base_ticks = utime.ticks_us()
+        samples = []
+        for server, t1, t4, t2, t2_fraction, t3, t3_fraction in replies:
+            t1 = utime.ticks_diff(t1, base_ticks)
+            t4 = utime.ticks_diff(t4, base_ticks)
+            t2 = _timestamp_us(t2, t2_fraction, base)
+            t3 = _timestamp_us(t3, t3_fraction, base)
+            samples.append([server, ((t2 - t1) + (t3 - t4)) // 2, (t4 - t1) - (t3 - t2)])
+
+        best, rejected = self._select(samples)
+        if best is None:
+            self.failures += 1
+            self._log("NTP: {} replies, none usable.", len(samples))
+            return False
+        server, offset_us, delay_us = best
+        # Without the RTC's phase the offset is only good to a second, so always step
+        stepped = not phase_known or abs(offset_us) >= self.STEP_MIN_MS * 1000
+        if stepped:
+            await self._step(base, base_ticks, offset_us)
+
+        self.syncs += 1
+        self.last = {
+            "server": server,
+            "offset_ms": offset_us // 1000 if phase_known else None,
+            "delay_ms": delay_us // 1000,
+            "replies": len(samples),
+            "rejected": rejected,
+            "stepped": stepped,
+        }
+        self._log("NTP: {} offset {} ms, delay {} ms ({} replies){}.", server,
+                  self.last["offset_ms"] if phase_known else "?", self.last["delay_ms"], len(samples),
+                  ", RTC set" if stepped else "")
+        return True
+
+    def get_stats(self):
+        """Returns a dict with the sync counts and the last sync's result."""
+        return {
+            "syncs": self.syncs,
+            "failures": self.failures,
+            "last": self.last,
+        }
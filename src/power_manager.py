@@ -0,0 +1,132 @@
+# power_manager.py (Version 0.1.0 - Low-power sleep and energy accounting)
+# In low-power mode the RP2040 spends the time between screen updates in lightsleep:
+# RAM, the RTC and the e-ink image are kept, the clocks are gated, and the chip wakes
+# when the sleep time is up (e.g. the next minute boundary) or on a pin IRQ (a button
+# press). The radio is kept off while idle (see radio_manager.py), which sleep requires.
+#
+# Deep sleep would save a little more, but the Pico resets on waking: every minute
+# would mean a full boot, config parse and redraw (and losing the RAM log), which costs
+# more than lightsleep saves at this update rate.
+#
+# Awake, asleep and radio-on time are counted from ticks_ms, and turned into an energy
+# estimate with the (configurable) average currents of each state. With battery_mah and
+# target_days set, the average current can be checked against the budget they allow.
+
+import utime
+import machine
+
+class PowerManager:
+    """
+    Puts the device to sleep between updates (when enabled) and keeps the energy budget.
+    """
+    def __init__(self, display_manager, power_config=None):
+        power_config = power_config or {}
+        self.display_manager = display_manager
+        self.enabled = power_config.get("low_power", False)
+
+        # Average currents in mA, for the energy estimate (Pico W + Inky Pack at 3.7 V)
+        self.AWAKE_MA = power_config.get("awake_ma", 25.0)
+        self.SLEEP_MA = power_config.get("sleep_ma", 1.5)
+        self.RADIO_MA = power_config.get("radio_ma", 45.0) # Extra while the WLAN chip is powered
+        self.battery_mah = power_config.get("battery_mah", 0)
+        self.target_days = power_config.get("target_days", 0)
+
+        self.MIN_SLEEP_MS = 50       # Shorter idle gaps aren't worth a sleep
+        self.MAX_SLEEP_MS = 60 * 1000 # Wake at least this often (other tasks' timers run late meanwhile)
+
+        self.awake_ms = 0
+        self.sleep_ms = 0
+        self.radio_ms = 0
+        self.sleeps = 0
+        self.early_wakes = 0 # Sleeps cut short, normally by a button press
+        self.radio_on = False
+        self._last_ticks = utime.ticks_ms()
+
+    def _log(self, message, *args):
+        """Internal helper to log messages to display (if available) and console."""
+        if self.display_manager:
+            self.display_manager.add_log_message(message, *args)
+
+    def _account_awake(self):
+        """Adds the time since the last accounting to the awake (and radio) totals."""
+        now = utime.ticks_ms()
+        elapsed = utime.ticks_diff(now, self._last_ticks)
+        self._last_ticks = now
+        self.awake_ms += elapsed
+        if self.radio_on:
+            self.radio_ms += elapsed
+        return now
+
+    def set_radio(self, on):
+        """Records the WLAN chip being powered up or down."""
+        self._account_awake()
+        self.radio_on = on
+
+    def sleep(self, ms):
+        """
+        Lightsleeps for up to ms (capped at MAX_SLEEP_MS); a button IRQ wakes it early.
+        Returns the ms actually slept, 0 if the gap was too short to bother.
+        """
+        ms = min(ms, self.MAX_SLEEP_MS)
+        if ms < self.MIN_SLEEP_MS:
+            return 0
+        start = self._account_awake()
+        machine.lightsleep(ms)
+        now = utime.ticks_ms()
+        slept = utime.ticks_diff(now, start)
+        self._last_ticks = now
+        self.sleep_ms += slept
+        if self.radio_on:
+            self.radio_ms += slept
+        self.sleeps += 1
+        if slept < ms - self.MIN_SLEEP_MS:
+            self.early_wakes += 1
+        return slept
+
+    # --- Energy budget ---
+
+    def used_mah(self):
+        """Estimated charge used since startup, in mAh."""
+        self._account_awake()
+        ma_ms = self.awake_ms * self.AWAKE_MA + self.sleep_ms * self.SLEEP_MA + self.radio_ms * self.RADIO_MA
+        return ma_ms / 3600000
+
+    def average_ma(self):
+        """Estimated average current since startup."""
+        used = self.used_mah()
+        total_ms = self.awake_ms + self.sleep_ms
+        return used * 3600000 / total_ms if total_ms else 0
+
+    def budget_ma(self):
+        """Average current that lasts target_days on battery_mah, or None if not configured."""
+        if self.battery_mah and self.target_days:
+            return self.battery_mah / (self.target_days * 24)
+        return None
+
+    def get_stats(self):
+        """Returns a dict of time spent in each state and the energy estimate."""
+        average = self.average_ma()
+        budget = self.budget_ma()
+        total_ms = self.awake_ms + self.sleep_ms
+        stats = {
+            "awake_ms": self.awake_ms,
+            "sleep_ms": self.sleep_ms,
+            "radio_ms": self.radio_ms,
+            "awake_pct": round(100 * self.awake_ms / total_ms, 1) if total_ms else 100,
+            "sleeps": self.sleeps,
+            "early_wakes": self.early_wakes,
+            "used_mah": round(self.used_mah(), 3),
+            "average_ma": round(average, 2),
+        }
+        if budget is not None:
+            stats["budget_ma"] = round(budget, 2)
+            stats["within_budget"] = average <= budget
+        if self.battery_mah and average:
+            stats["battery_days"] = round(self.battery_mah / average / 24, 1)
+        return stats
+
+    def log_summary(self):
+        """Logs a one-line summary of get_stats()."""
+        stats = self.get_stats()
+        self._log("Power: awake {}%, radio {} s, avg {} mA, used {} mAh.",
+                  stats["awake_pct"], stats["radio_ms"] // 1000, stats["average_ma"], stats["used_mah"])
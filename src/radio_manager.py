@@ -0,0 +1,179 @@
+# radio_manager.py (Version 0.1.0 - WLAN powered only around batched network windows)
+# The CYW43 radio is by far the largest power draw on the Pico W, and the network is
+# only needed for a few short jobs (the NTP sync, content fetches). Jobs are registered
+# with a due() check; when any is due the radio manager opens a network window: it
+# powers the radio up, connects (through the WiFi supervisor, so the fast reconnect
+# cache is used), runs every due job in one batch, and powers the radio down again.
+# If the connection fails the next window waits for the supervisor's backoff. A job that
+# fails on a working connection (e.g. NTP blocked by a firewall) backs off by itself, with
+# the same exponential policy from JOB_RETRY_MIN_MS, so the radio isn't powered up every
+# CHECK_INTERVAL_MS just to fail again; retry_now() (a button press) cuts that short.
+#
+# With always_on the supervisor keeps the connection up instead and windows only run
+# the jobs (e.g. for a mains-powered display that wants to notice outages quickly).
+#
+# Each window's radio-on time and the jobs it ran are kept for the last few windows.
+
+import utime
+
+from ring_log import INFO, WARNING
+from wifi_supervisor import backoff_delay_ms
+
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio # CPython (host simulator)
+
+class RadioManager:
+    """
+    Batches network jobs into windows, with the radio off in between (unless always_on).
+    """
+    def __init__(self, wifi_supervisor, power_manager, display_manager, always_on=False, history=8):
+        self.wifi_supervisor = wifi_supervisor
+        self.power_manager = power_manager
+        self.display_manager = display_manager
+        self.always_on = always_on
+        self.CHECK_INTERVAL_MS = 60 * 1000 # How often jobs are checked for being due
+        self.RETRY_MIN_MS = 30 * 1000      # Shortest wait after a window that couldn't connect
+        self.JOB_RETRY_MIN_MS = 60 * 1000  # First retry of a job that failed while connected (then doubling)
+        self.JOB_RETRY_MAX_MS = 60 * 60 * 1000
+
+        self.jobs = []         # [name, due, run, failures, retry_at]: due() -> bool, run() -> coroutine
+                               # returning True on success; retry_at is the ticks_ms of the next try
+                               # after failures in a row (None when not backing off)
+        self.history = history
+        self.windows = []      # Last few windows, oldest first: {"jobs", "radio_ms", "connected"}
+        self.window_count = 0
+        self.radio_ms = 0      # Radio-on time across all windows
+        self._event = None     # asyncio.Event, created in run() (inside the event loop)
+        self._check_at = None  # ticks_ms when run() next checks for due jobs (None while checking)
+
+    def _log(self, message, *args, level=INFO):
+        """Internal helper to log messages to display (if available) and console."""
+        if self.display_manager:
+            self.display_manager.add_log_message(message, *args, level=level)
+
+    def add_job(self, name, due, run):
+        """Registers a network job, run in the next window after due() returns True."""
+        self.jobs.append([name, due, run, 0, None])
+
+    def request(self):
+        """Checks for due jobs now rather than at the next interval (e.g. once connected)."""
+        if self._event:
+            self._event.set()
+
+    def retry_now(self):
+        """Like request(), also cutting short the backoff of failed jobs (e.g. "Press A to retry")."""
+        for job in self.jobs:
+            job[4] = None
+        self.request()
+
+    def _ready(self, job, now):
+        """True if a job is due and not waiting out a backoff."""
+        return job[1]() and (job[4] is None or utime.ticks_diff(now, job[4]) >= 0)
+
+    def pending(self):
+        """Returns the names of the jobs that are due (and not backing off)."""
+        now = utime.ticks_ms()
+        return [job[0] for job in self.jobs if self._ready(job, now)]
+
+    def failing(self):
+        """True if any job's last run failed (it's backing off)."""
+        return any(job[3] for job in self.jobs)
+
+    def _ms_until_retry(self):
+        """ms until the earliest job backoff ends (None if no job is backing off)."""
+        now = utime.ticks_ms()
+        waits = [max(0, utime.ticks_diff(job[4], now)) for job in self.jobs if job[4] is not None]
+        return min(waits) if waits else None
+
+    def ms_until_check(self):
+        """ms until run() next checks for due jobs (None while it's checking), for the low-power sleep."""
+        if self._check_at is None:
+            return None
+        return max(0, utime.ticks_diff(self._check_at, utime.ticks_ms()))
+
+    async def _run_job(self, job):
+        """Runs a job, updating its failure count and backoff. Returns True on success."""
+        name, due, run = job[0], job[1], job[2]
+        try:
+            ok = await run()
+        except Exception as e:
+            self._log("Network job {} failed: {}", name, e, level=WARNING)
+            ok = False
+        if ok:
+            job[3] = 0
+            job[4] = None
+            return True
+        job[3] += 1
+        delay = backoff_delay_ms(job[3], self.JOB_RETRY_MIN_MS, self.JOB_RETRY_MAX_MS)
+        job[4] = utime.ticks_add(utime.ticks_ms(), delay)
+        self._log("Network job {}: failure {}, retrying in {} s.", name, job[3], delay // 1000)
+        return False
+
+    async def window(self):
+        """
+        Runs the due jobs in one network window. Returns True if there was nothing to do
+        or the window connected, False if it couldn't connect.
+        """
+        start = utime.ticks_ms()
+        pending = [job for job in self.jobs if self._ready(job, start)]
+        if not pending:
+            return True
+
+        connected = self.wifi_supervisor.wifi_manager.is_connected()
+        if not connected and self.always_on:
+            return False # The supervisor is reconnecting; request() is called once it has
+
+        ran = []
+        try:
+            if not connected:
+                self.power_manager.set_radio(True)
+                connected = await self.wifi_supervisor.connect_once()
+            if connected:
+                for job in pending:
+                    if await self._run_job(job):
+                        ran.append(job[0])
+        finally:
+            if not self.always_on: # Even if a job raised or the task was cancelled
+                self.wifi_supervisor.power_down()
+                self.power_manager.set_radio(False)
+
+        radio_ms = utime.ticks_diff(utime.ticks_ms(), start)
+        self.window_count += 1
+        self.radio_ms += radio_ms
+        self.windows.append({"jobs": ran, "radio_ms": radio_ms, "connected": connected})
+        if len(self.windows) > self.history:
+            self.windows.pop(0)
+        self._log("Network window: {} in {} ms.", ", ".join(ran) if ran else "nothing done", radio_ms)
+        return connected
+
+    async def run(self):
+        """Opens a window whenever jobs are due, forever."""
+        self._event = asyncio.Event()
+        if not self.always_on:
+            self.wifi_supervisor.power_down() # Off until the first window
+            self.power_manager.set_radio(False)
+        while True:
+            wait_ms = self.CHECK_INTERVAL_MS
+            if not await self.window():
+                wait_ms = max(self.RETRY_MIN_MS, self.wifi_supervisor.backoff_ms())
+            retry_ms = self._ms_until_retry()
+            if retry_ms is not None and retry_ms < wait_ms:
+                wait_ms = retry_ms # A failed job's backoff ends first
+            self._check_at = utime.ticks_add(utime.ticks_ms(), wait_ms)
+            try:
+                await asyncio.wait_for(self._event.wait(), wait_ms / 1000)
+            except asyncio.TimeoutError:
+                pass
+            self._event.clear()
+            self._check_at = None
+
+    def get_stats(self):
+        """Returns a dict with the window count, total radio-on time, the recent windows and job failures."""
+        return {
+            "windows": self.window_count,
+            "radio_ms": self.radio_ms,
+            "recent": list(self.windows),
+            "job_failures": dict((job[0], job[3]) for job in self.jobs),
+        }
@@ -0,0 +1,84 @@
+# refresh_policy.py (Version 0.1.0 - E-ink update speed and ghost-clearing policy)
+# Fast e-ink updates leave faint "ghosts" of previous frames behind. This policy lets
+# DisplayManager use the fastest update speed for day-to-day changes, and forces a slow,
+# full refresh every N fast updates and/or once a day at a configured time to clear them.
+#
+# PicoGraphics update speeds for the Inky Pack: 0 = slowest/cleanest ... 3 = fastest.
+
+import utime
+
+class RefreshPolicy:
+    """
+    Decides the update speed for each panel refresh and when a ghost-clearing
+    refresh is due. Configured from the [display] section of config.toml.
+    """
+    def __init__(self, display_config=None, clock=None):
+        display_config = display_config or {}
+        self.partial_update_speed = display_config.get("partial_update_speed", 3)
+        self.full_update_speed = display_config.get("full_update_speed", 2)
+        self.ghost_clear_speed = display_config.get("ghost_clear_speed", 0)
+        self.ghost_clear_every = display_config.get("ghost_clear_every", 30) # Fast updates between clears, 0 = never
+        self.ghost_clear_time = self._parse_time(display_config.get("ghost_clear_time", "03:00")) # (hour, minute) or None
+
+        # clock() returns a local time tuple; defaults to the RTC (UTC)
+        self.clock = clock or utime.localtime
+
+        self.fast_updates_since_clear = 0
+        self.last_clear_yearday = None # Day of the last time-of-day clear
+        self.clear_requested = False   # Set by request_ghost_clear(), e.g. from a held button
+
+        # Refresh counters by kind
+        self.partial_updates = 0
+        self.full_updates = 0
+        self.ghost_clears = 0
+
+    def _parse_time(self, value):
+        """Parses "HH:MM" into (hour, minute). Returns None for an empty or invalid value."""
+        try:
+            hour, minute = value.split(":")
+            return int(hour), int(minute)
+        except (AttributeError, ValueError):
+            return None
+
+    def request_ghost_clear(self):
+        """Makes the next refresh a ghost-clearing one, whatever the schedule."""
+        self.clear_requested = True
+
+    def ghost_clear_due(self):
+        """Returns True if the next refresh should be a slow, full, ghost-clearing one."""
+        if self.ghost_clears == 0 or self.clear_requested:
+            return True # First refresh after boot (start from a clean panel), or asked for
+        if self.ghost_clear_every and self.fast_updates_since_clear >= self.ghost_clear_every:
+            return True
+        if self.ghost_clear_time:
+            local_time = self.clock()
+            if local_time[7] != self.last_clear_yearday and (local_time[3], local_time[4]) >= self.ghost_clear_time:
+                return True
+        return False
+
+    def speed_for(self, partial, ghost_clear=False):
+        """Returns the update speed to use and records the refresh in the counters."""
+        if ghost_clear:
+            self.ghost_clears += 1
+            self.clear_requested = False
+            self.fast_updates_since_clear = 0
+            local_time = self.clock()
+            if self.ghost_clear_time is None or (local_time[3], local_time[4]) >= self.ghost_clear_time:
+                self.last_clear_yearday = local_time[7] # Today's time-of-day clear is covered
+            return self.ghost_clear_speed
+
+        self.fast_updates_since_clear += 1
+        if partial:
+            self.partial_updates += 1
+            return self.partial_update_speed
+        self.full_updates += 1
+        return self.full_update_speed
+
+    def get_stats(self):
+        """Returns a dict of refresh counts by kind."""
+        return {
+            "partial": self.partial_updates,
+            "full": self.full_updates,
+            "ghost_clear": self.ghost_clears,
+            "since_clear": self.fast_updates_since_clear,
+        }
@@ -0,0 +1,129 @@
+# ring_log.py (Version 0.1.0 - Preallocated ring-buffer logger)
+# Log entries are kept in fixed-size slots allocated once at startup: a raw timestamp
+# (utime.time()), a level, the message template and its arguments. Nothing is formatted
+# when a message is logged; the "[HH:MM:SS] text" line is only built when it's drawn on
+# the log screen, or printed to the console if echo is on (off by default: on the device
+# nobody is usually watching the REPL, and printing costs a format and a UART write per
+# entry). Messages below the current level return straight away, so debug logging on hot
+# paths (e.g. button presses) costs almost nothing.
+#
+# Templates use str.format placeholders and are normally string literals, so the entry
+# just references the (interned) template:
+#     log.info("ImageLoader: Error reading {}: {}", path, e)
+
+import utime
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+OFF = 100 # Level that disables logging altogether
+
+LEVELS = {"debug": DEBUG, "info": INFO, "warning": WARNING, "error": ERROR, "off": OFF}
+
+class RingLog:
+    """
+    Fixed-capacity log. Once full, each new entry overwrites the oldest one.
+    """
+    def __init__(self, capacity=8, level=INFO, echo=False):
+        self.capacity = capacity
+        self.level = level  # Entries below this level are dropped
+        self.echo = echo    # Also print each entry to the console
+        self._times = [0] * capacity
+        self._levels = bytearray(capacity)
+        self._messages = [None] * capacity
+        self._args = [None] * capacity
+        self._next = 0  # Slot the next entry is written to
+        self.count = 0  # Number of slots in use
+        self.total = 0  # Entries logged since startup (including overwritten ones)
+        self.sink = None # Optional sink.write(timestamp, level, message, args), e.g. a FlashLog
+
+    def set_level(self, level):
+        """Sets the level from a LEVELS name ("debug", "info", ...) or number."""
+        self.level = LEVELS.get(level, INFO) if isinstance(level, str) else level
+
+    def set_echo(self, echo):
+        """Turns printing each entry to the console on or off, printing the entries already kept when turned on."""
+        if echo and not self.echo:
+            for line in self.lines():
+                print(line)
+        self.echo = echo
+
+    def enabled(self, level):
+        return level >= self.level
+
+    def log(self, level, message, args=()):
+        """Stores an entry (message.format(*args) is only done when it's read or echoed)."""
+        if level < self.level:
+            return
+        slot = self._next
+        self._times[slot] = utime.time()
+        self._levels[slot] = level
+        self._messages[slot] = message
+        self._args[slot] = args
+        self._next = (slot + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+        self.total += 1
+        if self.echo:
+            print(self._format(slot))
+        if self.sink:
+            self.sink.write(self._times[slot], level, message, args)
+
+    def set_sink(self, sink):
+        """Attaches a sink, passing it the entries already kept (e.g. boot messages)."""
+        self.sink = sink
+        if sink:
+            for index in range(self.count):
+                slot = (self._next - self.count + index) % self.capacity
+                sink.write(self._times[slot], self._levels[slot], self._messages[slot], self._args[slot])
+
+    def debug(self, message, *args):
+        self.log(DEBUG, message, args)
+
+    def info(self, message, *args):
+        self.log(INFO, message, args)
+
+    def warning(self, message, *args):
+        self.log(WARNING, message, args)
+
+    def error(self, message, *args):
+        self.log(ERROR, message, args)
+
+    def _format(self, slot):
+        """Builds the display line for a slot."""
+        timestamp = utime.localtime(self._times[slot])
+        message = self._messages[slot]
+        args = self._args[slot]
+        if args:
+            message = message.format(*args)
+        return "[{:02d}:{:02d}:{:02d}] {}".format(timestamp[3], timestamp[4], timestamp[5], message)
+
+    def line(self, index):
+        """Returns the formatted entry at index (0 = oldest kept entry)."""
+        if not 0 <= index < self.count:
+            raise IndexError("log index out of range")
+        return self._format((self._next - self.count + index) % self.capacity)
+
+    def entry_id(self, index):
+        """Returns a number identifying the entry at index for as long as it's kept (e.g. as a cache key)."""
+        return self.total - self.count + index
+
+    def count_at_least(self, level):
+        """Returns how many of the kept entries are at or above level (e.g. those a sink persisted)."""
+        return sum(1 for index in range(self.count)
+                   if self._levels[(self._next - self.count + index) % self.capacity] >= level)
+
+    def lines(self):
+        """Yields the formatted entries, oldest first."""
+        for index in range(self.count):
+            yield self.line(index)
+
+    def clear(self):
+        for slot in range(self.capacity):
+            self._messages[slot] = None
+            self._args[slot] = None
+        self.count = 0
+
+    def __len__(self):
+        return self.count
@@ -0,0 +1,107 @@
+# rtc_drift.py (Version 0.1.0 - RTC drift estimate and adaptive NTP resync interval)
+# The RP2040's RTC gains or loses time at a rate that differs from unit to unit and
+# changes with temperature. Each NTP sync measures how far the RTC has drifted since
+# the previous one; dividing by the time between them gives the drift rate in ppm
+# (1 ppm = 1 ms per 1000 s; positive = the RTC runs slow). The estimate is an average
+# weighted by interval length, with older intervals counting half as much after each
+# sync so it follows seasonal temperature changes.
+#
+# Between syncs TimeManager adds the predicted drift to the RTC time. How wrong the
+# previous prediction turned out to be gives the uncertainty (ppm), and the next sync is
+# scheduled for when the prediction could be max_error out, between resync_min and
+# resync_max. A poor or unknown clock is synced about hourly, a steady one every few days.
+#
+# The estimate is kept in a small JSON file, so it survives reboots (the RTC itself
+# doesn't keep time across a power cycle, so drift is only measured within a boot).
+
+import json
+
+class DriftModel:
+    """
+    Estimates the RTC drift rate from the offsets measured at NTP syncs, and when to resync.
+    """
+    def __init__(self, display_manager=None, ntp_config=None, path="rtc_drift.json"):
+        ntp_config = ntp_config or {}
+        self.display_manager = display_manager
+        self.path = path
+        self.max_error_ms = int(ntp_config.get("max_error", 0.5) * 1000) # Largest predicted error before resyncing
+        self.RESYNC_MIN_S = ntp_config.get("resync_min", 3600)
+        self.RESYNC_MAX_S = ntp_config.get("resync_max", 3 * 24 * 3600)
+        self.INITIAL_UNCERTAINTY_PPM = 100 # Before any measurement (a crystal-clocked RTC is usually within this)
+        self.MIN_UNCERTAINTY_PPM = 2.0     # Temperature changes alone can shift the rate this much
+        self.MAX_PPM = 2000                # A larger rate means the RTC was reset, not that it drifted
+        self.MIN_ELAPSED_S = 600           # Shorter intervals are dominated by measurement error
+        self.DECAY = 0.5                   # Weight kept by older intervals at each update
+
+        self.ppm = 0.0
+        self.uncertainty_ppm = self.INITIAL_UNCERTAINTY_PPM
+        self.weight_s = 0        # Interval seconds behind the estimate (after decay)
+        self.measurements = 0
+        self.load()
+
+    def _log(self, message, *args):
+        """Internal helper to log messages to display (if available) and console."""
+        if self.display_manager:
+            self.display_manager.add_log_message(message, *args)
+
+    def load(self):
+        """Loads the saved estimate, if any."""
+        try:
+            with open(self.path) as f:
+                saved = json.load(f)
+            self.ppm = float(saved["ppm"])
+            self.uncertainty_ppm = max(float(saved["uncertainty_ppm"]), self.MIN_UNCERTAINTY_PPM)
+            self.weight_s = saved.get("weight_s", 0)
+            self.measurements = saved.get("measurements", 0)
+        except (OSError, ValueError, KeyError, TypeError):
+            pass # No estimate yet
+
+    def save(self):
+        try:
+            with open(self.path, "w") as f:
+                json.dump({"ppm": self.ppm, "uncertainty_ppm": self.uncertainty_ppm,
+                           "weight_s": self.weight_s, "measurements": self.measurements}, f)
+        except OSError as e:
+            print("DriftModel: Error saving {}: {}".format(self.path, e))
+
+    def predicted_ms(self, elapsed_s):
+        """The drift expected over elapsed_s seconds, in ms (to add to the RTC time)."""
+        return self.ppm * elapsed_s / 1000
+
+    def update(self, drift_ms, elapsed_s):
+        """
+        Adds a measurement: the RTC drifted drift_ms over elapsed_s seconds since the last
+        sync. Returns True if it was used (not too short an interval, not implausible).
+        """
+        if elapsed_s < self.MIN_ELAPSED_S:
+            return False
+        measured_ppm = drift_ms * 1000 / elapsed_s
+        if abs(measured_ppm) > self.MAX_PPM:
+            self._log("RTC drift of {} ms in {} s ignored.", drift_ms, elapsed_s)
+            return False
+
+        # How far the old estimate was out: a surprise widens the uncertainty at once,
+        # an accurate prediction narrows it gradually
+        error_ppm = abs(measured_ppm - self.ppm)
+        self.uncertainty_ppm = max(self.MIN_UNCERTAINTY_PPM, error_ppm, (self.uncertainty_ppm + error_ppm) / 2)
+
+        weight = self.weight_s * self.DECAY
+        self.ppm = (self.ppm * weight + measured_ppm * elapsed_s) / (weight + elapsed_s)
+        self.weight_s = int(weight + elapsed_s)
+        self.measurements += 1
+        self.save()
+        return True
+
+    def interval_s(self):
+        """Seconds until the predicted time could be max_error out, clamped to resync_min..resync_max."""
+        interval = int(self.max_error_ms * 1000 / self.uncertainty_ppm)
+        return max(self.RESYNC_MIN_S, min(self.RESYNC_MAX_S, interval))
+
+    def get_stats(self):
+        """Returns a dict with the drift estimate, its uncertainty and the resync interval."""
+        return {
+            "ppm": round(self.ppm, 2),
+            "uncertainty_ppm": round(self.uncertainty_ppm, 2),
+            "measurements": self.measurements,
+            "interval_s": self.interval_s(),
+        }
@@ -0,0 +1,39 @@
+# scheduler.py (Version 0.1.0 - Named deadlines for the low-power sleep)
+# The tasks each know when they next have work to do (the screen's next content
+# change, ...), and register it here as a named deadline. In low-power mode the power
+# task sleeps until the earliest one, a button press waking it early.
+
+import utime
+
+class Scheduler:
+    """
+    Keeps a small set of named deadlines (in utime.ticks_ms time).
+    Each job is either scheduled once for a given delay or not scheduled at all.
+    """
+    def __init__(self):
+        self.deadlines = {} # job name -> ticks_ms deadline
+
+    def schedule(self, name, delay_ms):
+        """Schedules (or reschedules) a job to be due in delay_ms. None cancels the job."""
+        if delay_ms is None:
+            self.cancel(name)
+        else:
+            self.deadlines[name] = utime.ticks_add(utime.ticks_ms(), max(0, int(delay_ms)))
+
+    def cancel(self, name):
+        """Removes a job's deadline, if it has one."""
+        if name in self.deadlines:
+            del self.deadlines[name]
+
+    def ms_until_next(self, max_ms):
+        """
+        Returns how long the caller can sleep before the earliest deadline,
+        capped at max_ms (e.g. the longest allowed sleep).
+        """
+        now = utime.ticks_ms()
+        wait_ms = max_ms
+        for deadline in self.deadlines.values():
+            remaining = utime.ticks_diff(deadline, now)
+            if remaining < wait_ms:
+                wait_ms = remaining
+        return max(0, wait_ms)
@@ -0,0 +1,104 @@
+# screen_registry.py (Version 0.1.0 - Screens imported on first use, unloaded when memory is low)
+# Screens are declared by name with the module that draws them and the names of the
+# objects their render() takes after the display manager (looked up in a shared
+# context, e.g. "time_manager"). A screen's module is only imported the first time it
+# is shown, so boot time and the baseline heap don't grow with every screen added.
+#
+# After each render, if free memory is below unload_below bytes, the modules of the
+# other (unloadable) screens are dropped from sys.modules so their code and state can
+# be collected; they're imported again, from scratch, next time they're shown.
+#
+# A screen module provides render(display_manager, *args), and optionally
+# next_refresh_ms(*args): ms until its content next changes (None = only on request).
+
+import sys
+import gc
+import utime
+
+from ring_log import DEBUG, INFO
+
+class ScreenRegistry:
+    """
+    Maps screen names to lazily imported screen modules.
+    """
+    def __init__(self, display_manager, unload_below=0):
+        self.display_manager = display_manager
+        self.unload_below = unload_below # Free bytes below which idle screens are unloaded (0 = never)
+        self.screens = {}  # name -> (module name, context names, unloadable)
+        self.context = {}  # name -> object passed to screens' render()
+        self.loaded = {}   # name -> module, for screens imported so far
+        self.imports = 0   # Imports done (including re-imports after an unload)
+        self.unloads = 0
+
+    def _log(self, message, *args, level=INFO):
+        """Internal helper to log messages to display (if available) and console."""
+        if self.display_manager:
+            self.display_manager.add_log_message(message, *args, level=level)
+
+    def register(self, name, module_name, args=(), unloadable=True):
+        """Declares a screen. Nothing is imported until it's shown."""
+        self.screens[name] = (module_name, args, unloadable)
+
+    def set_context(self, **objects):
+        """Adds objects that screens' render() can take by name."""
+        self.context.update(objects)
+
+    def module(self, name):
+        """Returns the screen's module, importing it if it isn't loaded."""
+        module = self.loaded.get(name)
+        if module is None:
+            module_name = self.screens[name][0]
+            start = utime.ticks_ms()
+            __import__(module_name)
+            module = sys.modules[module_name]
+            self.loaded[name] = module
+            self.imports += 1
+            self._log("Screen {} loaded in {} ms.", name, utime.ticks_diff(utime.ticks_ms(), start), level=DEBUG)
+        return module
+
+    def _args(self, name):
+        return [self.context.get(arg) for arg in self.screens[name][1]]
+
+    def render(self, name):
+        """
+        Renders the named screen. Returns ms until its content next changes
+        (None = only on request).
+        """
+        module = self.module(name)
+        args = self._args(name)
+        module.render(self.display_manager, *args)
+        next_refresh = getattr(module, "next_refresh_ms", None)
+        refresh_ms = next_refresh(*args) if next_refresh else None
+        self.unload_if_low(keep=name)
+        return refresh_ms
+
+    def unload(self, name):
+        """Drops an imported screen module so its memory can be reclaimed."""
+        module = self.loaded.pop(name, None)
+        if module is None:
+            return
+        module_name = self.screens[name][0]
+        sys.modules.pop(module_name, None)
+        package_name, _, attribute = module_name.rpartition(".")
+        package = sys.modules.get(package_name) if package_name else None
+        if package is not None:
+            try:
+                delattr(package, attribute) # The package keeps a reference to its submodules
+            except (AttributeError, TypeError):
+                pass
+        self.unloads += 1
+        self._log("Screen {} unloaded.", name, level=DEBUG)
+
+    def unload_if_low(self, keep=None):
+        """Unloads every unloadable screen but keep if free memory is below unload_below."""
+        mem_free = getattr(gc, "mem_free", None)
+        if not self.unload_below or not mem_free or mem_free() >= self.unload_below:
+            return
+        for name in list(self.loaded):
+            if name != keep and self.screens[name][2]:
+                self.unload(name)
+        gc.collect()
+
+    def get_stats(self):
+        """Returns a dict with the loaded screens and import/unload counts."""
+        return {"loaded": list(self.loaded), "imports": self.imports, "unloads": self.unloads}
@@ -0,0 +1,80 @@
+# screens/diagnostics_screen.py
+# This module is responsible for rendering the diagnostics screen: how long each boot
+# phase took (see boot_profiler.py) for this boot and the previous saved ones, newest
+# first, ending with the milestones (first render, time to a synced clock), and a heap
+# summary from the memory manager on the bottom line.
+
+MARGIN = 5
+TOP = 2
+LINE_HEIGHT = 10
+NAME_WIDTH = 70   # Column for the phase names
+COLUMN_WIDTH = 55 # Column per boot
+COLUMNS = 4       # This boot + the 3 before it
+MAX_ROWS = 11     # Leaves the bottom line for the free heap
+
+MARK_LABELS = (("first_render", "1st render"), ("clock", "to clock"))
+
+def _format_ms(ms):
+    if ms is None:
+        return "-"
+    return "{:.1f}".format(ms) if ms < 100 else str(int(ms))
+
+def _boots(boot_profiler):
+    """Returns up to COLUMNS boot records as {"phases": dict, "marks": dict}, newest first."""
+    boots = boot_profiler.history()
+    if not boot_profiler.finished:
+        boots.append(boot_profiler.current())
+    boots = boots[-COLUMNS:]
+    boots.reverse()
+    for boot in boots:
+        boot["phases"] = dict(boot.get("phases", ()))
+    return boots
+
+def _phase_names(boot_profiler, boots):
+    """Phase names in boot order: this boot's first, then any only in older boots."""
+    names = list(boot_profiler.order)
+    for boot in boots:
+        for name in boot["phases"]:
+            if name not in names:
+                names.append(name)
+    return names
+
+def render(display_manager, boot_profiler=None, memory_manager=None):
+    """
+    Renders the boot timing table to the display buffer and updates.
+
+    Args:
+        display_manager: An instance of DisplayManager for drawing operations.
+        boot_profiler: The BootProfiler holding this boot's timings and the saved ones.
+        memory_manager: The MemoryManager, for the heap summary on the bottom line.
+    """
+    display = display_manager.display
+    if not display:
+        display_manager.add_log_message("Error: Display not initialized for diagnostics screen rendering.")
+        return
+
+    display_manager.clear_display_buffer()
+    display.set_pen(display_manager.BLACK)
+    if boot_profiler is None:
+        display.text("No boot timings", MARGIN, TOP, scale=1)
+        display_manager.update()
+        return
+
+    boots = _boots(boot_profiler)
+    rows = [("Boot ms", ["now" if i == 0 else "-{}".format(i) for i in range(len(boots))])]
+    for name in _phase_names(boot_profiler, boots):
+        rows.append((name, [_format_ms(boot["phases"].get(name)) for boot in boots]))
+    for key, label in MARK_LABELS:
+        rows.append((label, [_format_ms(boot.get("marks", {}).get(key)) for boot in boots]))
+
+    y = TOP
+    for name, values in rows[:MAX_ROWS]:
+        display.text(name, MARGIN, y, scale=1)
+        for column, value in enumerate(values):
+            display.text(value, MARGIN + NAME_WIDTH + column * COLUMN_WIDTH, y, scale=1)
+        y += LINE_HEIGHT
+
+    if memory_manager and memory_manager.free() is not None:
+        display.text("Heap free {}  low {}  gc {}".format(memory_manager.free(), memory_manager.low_water, memory_manager.collections),
+                     MARGIN, display_manager.HEIGHT - LINE_HEIGHT, scale=1)
+    display_manager.update()
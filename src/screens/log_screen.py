@@ -1,9 +1,159 @@
 # screens/log_screen.py
 # This module is responsible for rendering the log messages screen.
+# It shows the latest messages (from RAM) and, scrolling further back, the history
+# saved in the flash log. Each entry is word-wrapped to the panel width once and the
+# result cached, and only the lines inside the visible window are drawn, so render
+# time doesn't grow with the number of entries kept.
+
+import framebuffer
+from lru_cache import LRUCache
+from widgets import CHAR_HEIGHT
+
+MARGIN = 5
+TOP = 2
+LINE_HEIGHT = CHAR_HEIGHT + 2
+VISIBLE_LINES = (framebuffer.HEIGHT - TOP) // LINE_HEIGHT # 12
+WRAP_WIDTH = framebuffer.WIDTH - 2 * MARGIN
+INDENT = "  " # Continuation lines of a wrapped entry
+
+class LogView:
+    """
+    Scroll position and wrap cache for the log screen.
+    offset counts wrapped lines scrolled up from the newest one. In history mode the
+    lines come from the flash log, read through a LogCursor as far as scrolled.
+    """
+    def __init__(self):
+        self.offset = 0
+        self.wraps = LRUCache(128) # entry key -> tuple of wrapped lines
+        self.cursor = None         # LogCursor while showing flash history
+        self.history = []          # Flash log lines read so far, newest first
+
+    def reset(self):
+        """Back to the newest messages."""
+        self.offset = 0
+        self.cursor = None
+        self.history = []
+
+    # --- Entries, newest first ---
+
+    def _entry(self, display_manager, index):
+        """Returns the cache key of the index-th newest entry, or None past the oldest."""
+        if self.cursor is not None:
+            if index >= len(self.history) and not self.cursor.at_start():
+                self.history.extend(self.cursor.older(VISIBLE_LINES))
+            if index >= len(self.history):
+                return None
+            return self.history[index] # Flash lines are read as text already
+        log = display_manager.log
+        if index >= len(log):
+            return None
+        return log.entry_id(len(log) - 1 - index)
+
+    def _text(self, display_manager, index):
+        """Returns the text of the index-th newest entry (formatting it if it's in RAM)."""
+        if self.cursor is not None:
+            return self.history[index]
+        log = display_manager.log
+        return log.line(len(log) - 1 - index)
+
+    def _wrapped(self, display_manager, index, key):
+        """Returns the wrapped lines of the index-th newest entry, formatting and wrapping it only on a cache miss."""
+        lines = self.wraps.get(key)
+        if lines is None:
+            lines = wrap(display_manager, self._text(display_manager, index))
+            self.wraps.put(key, lines)
+        return lines
+
+    def _newest_lines(self, display_manager, count):
+        """Returns up to count wrapped lines, newest (bottom) first, wrapping only the entries needed."""
+        lines = []
+        index = 0
+        while len(lines) < count:
+            key = self._entry(display_manager, index)
+            if key is None:
+                break
+            wrapped = self._wrapped(display_manager, index, key)
+            for i in range(len(wrapped) - 1, -1, -1):
+                lines.append(wrapped[i])
+            index += 1
+        return lines
+
+    # --- Scrolling ---
+
+    def scroll(self, display_manager, pages, flash_log=None):
+        """
+        Scrolls by whole pages (positive = older). Scrolling past the oldest message
+        in RAM continues into the flash log, with the entries older than those in RAM
+        (the newest flash lines are copies of the RAM ones, so they're skipped);
+        scrolling back past the first history page returns to the latest messages.
+        """
+        step = VISIBLE_LINES - 1 # Keep one line of context
+        if pages > 0:
+            available = len(self._newest_lines(display_manager, self.offset + VISIBLE_LINES + step))
+            if self.offset + VISIBLE_LINES < available:
+                self.offset = min(self.offset + pages * step, available - VISIBLE_LINES)
+            elif self.cursor is None and flash_log:
+                self.cursor = flash_log.cursor()
+                self.cursor.older(display_manager.log.count_at_least(flash_log.level)) # Already shown from RAM
+                self.history = []
+                self.offset = 0
+        else:
+            if self.offset > 0:
+                self.offset = max(0, self.offset + pages * step)
+            elif self.cursor is not None:
+                self.reset()
+
+    def visible_lines(self, display_manager):
+        """Returns the lines in the visible window, top to bottom."""
+        lines = self._newest_lines(display_manager, self.offset + VISIBLE_LINES)
+        window = lines[self.offset:self.offset + VISIBLE_LINES]
+        window.reverse()
+        return window
+
+
+def wrap(display_manager, text, width=WRAP_WIDTH):
+    """Word-wraps text at scale 1 into a tuple of lines no wider than width (long words are split)."""
+    # Unmemoised: log text is rarely measured twice, and would evict the clock's labels
+    measure = display_manager.display.measure_text
+    lines = []
+    line = ""
+    for word in text.split(" "):
+        candidate = line + " " + word if line else word
+        if measure(candidate, scale=1) <= width:
+            line = candidate
+            continue
+        if line:
+            lines.append(line)
+            word = INDENT + word
+        while measure(word, scale=1) > width: # Hard-break words longer than a line
+            low, high = 1, len(word) - 1 # Binary search for the longest prefix that fits
+            while low < high:
+                cut = (low + high + 1) // 2
+                if measure(word[:cut], scale=1) <= width:
+                    low = cut
+                else:
+                    high = cut - 1
+            cut = low
+            lines.append(word[:cut])
+            word = INDENT + word[cut:]
+        line = word
+    lines.append(line)
+    return tuple(lines)
+
+
+_view = LogView()
+
+def reset():
+    """Shows the newest messages next time (e.g. when switching to the log screen)."""
+    _view.reset()
+
+def scroll(display_manager, pages, flash_log=None):
+    """Scrolls the log screen by pages (positive = older), see LogView.scroll."""
+    _view.scroll(display_manager, pages, flash_log)
 
 def render(display_manager):
     """
-    Renders the current log messages to the display buffer and updates.
+    Renders the visible window of the log to the display buffer and updates.
 
     Args:
         display_manager: An instance of DisplayManager for drawing operations and log access.
@@ -13,9 +163,9 @@ def render(display_manager):
         return
 
     display_manager.clear_display_buffer()
-    y_offset = 5
-    for msg in display_manager.log_messages: # Access logs from display_manager instance
-        display_manager.display.set_pen(display_manager.BLACK)
-        display_manager.display.text(msg, 5, y_offset, scale=1) # Using scale 1 for small font
-        y_offset += 15 # Line height for scale 1 text + gap
-    display_manager.display.update()
\ No newline at end of file
+    display_manager.display.set_pen(display_manager.BLACK)
+    y_offset = TOP
+    for line in _view.visible_lines(display_manager):
+        display_manager.display.text(line, MARGIN, y_offset, scale=1)
+        y_offset += LINE_HEIGHT
+    display_manager.update()
@@ -0,0 +1,42 @@
+# screens/picture_screen.py
+# This module is responsible for rendering the picture mode screen.
+# Pictures are pre-packed frame files, shown as a slideshow (see slideshow.py).
+
+def render(display_manager, slideshow=None):
+    """
+    Renders the slideshow's current picture, or a placeholder if there is none.
+    After the panel update the next picture is prefetched, so advancing is quick.
+
+    Args:
+        display_manager: An instance of DisplayManager for drawing operations.
+        slideshow: A Slideshow holding the frame files and the frame cache.
+    """
+    if not display_manager.display:
+        display_manager.add_log_message("Error: Display not initialized for picture screen rendering.")
+        return
+
+    image_path = slideshow.current_path() if slideshow else None
+    if image_path:
+        owner = "picture:" + image_path
+        if display_manager.buffer_owner != owner: # Skip reloading if it's already in the buffer
+            if not slideshow.show():
+                _render_placeholder(display_manager, "Picture not found", image_path)
+                return
+            display_manager.buffer_owner = owner
+        display_manager.update()
+        slideshow.prefetch()
+        return
+
+    _render_placeholder(display_manager, "No pictures", "Add frames to [picture] directory")
+
+def next_refresh_ms(slideshow=None):
+    """Returns ms until the slideshow advances by itself, or None if it only advances on button B."""
+    return slideshow.interval_ms if slideshow else None
+
+def _render_placeholder(display_manager, title, detail):
+    """Renders a text placeholder when there is no picture to show."""
+    display_manager.clear_display_buffer()
+    display_manager.display.set_pen(display_manager.BLACK)
+    display_manager.display.text(title, 5, 5, scale=2)
+    display_manager.display.text(detail, 5, 30, scale=1)
+    display_manager.update()
@@ -1,19 +0,0 @@
-# screens/todo_picture_screen.py
-# This module is responsible for rendering the placeholder for the picture mode.
-
-def render(display_manager):
-    """
-    Renders the placeholder for the picture mode.
-
-    Args:
-        display_manager: An instance of DisplayManager for drawing operations.
-    """
-    if not display_manager.display:
-        display_manager.add_log_message("Error: Display not initialized for picture screen rendering.")
-        return
-
-    display_manager.clear_display_buffer()
-    display_manager.display.set_pen(display_manager.BLACK)
-    display_manager.display.text("TODO: Load Photo", 5, 5, scale=2)
-    display_manager.display.text("Not implemented yet!", 5, 30, scale=1)
-    display_manager.display.update()
\ No newline at end of file
@@ -0,0 +1,138 @@
+# slideshow.py (Version 0.1.0 - Picture slideshow with a RAM-budgeted frame cache)
+# Picture mode cycles through the frame files in a directory (see image_loader.py).
+# Recently shown frames, and the one shown next, are kept in an LRU cache of raw frame
+# bytes, so flicking back and forth between a few pictures doesn't touch flash, and the
+# next picture is usually already in RAM when B is pressed (only the panel update is left).
+#
+# The cache is bounded by a byte budget from config.toml, and a new frame buffer is only
+# allocated while gc.mem_free() stays above MIN_FREE_BYTES; otherwise the least recently
+# used frame's buffer is reused, so the cache never forces the rest of the app out of RAM.
+
+import gc
+import os
+
+import framebuffer
+from lru_cache import LRUCache
+
+FRAME_EXTENSIONS = (".bin", ".rle")
+
+def find_frames(directory):
+    """Returns the sorted paths of the frame files (.bin / .rle) in directory."""
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return []
+    return [directory + "/" + name for name in sorted(names) if name[-4:] in FRAME_EXTENSIONS]
+
+def _mem_free():
+    """Free heap in bytes, or None where gc.mem_free isn't available (CPython)."""
+    mem_free = getattr(gc, "mem_free", None)
+    return mem_free() if mem_free else None
+
+class Slideshow:
+    """
+    Keeps the list of frames, the current position and the frame cache.
+    Frames are cached as decoded framebuffer bytes, so compressed and raw files
+    cost the same to show once cached.
+    """
+    def __init__(self, display_manager, image_loader, paths, cache_bytes=4 * framebuffer.BUFFER_SIZE, interval_s=0):
+        self.display_manager = display_manager
+        self.image_loader = image_loader
+        self.paths = paths
+        self.index = 0
+        self.interval_ms = int(interval_s * 1000) if interval_s else None # Auto-advance (None = only on B)
+        self.cache = LRUCache(cache_bytes) # path -> bytearray(framebuffer.BUFFER_SIZE)
+        self.flash_reads = 0
+        self.MIN_FREE_BYTES = 16 * 1024 # Heap to leave free for everything else
+        self._spare = None # Buffer left over from a failed load, reused by the next one
+
+    def _log(self, message, *args):
+        """Internal helper to log messages to display (if available) and console."""
+        if self.display_manager:
+            self.display_manager.add_log_message(message, *args)
+
+    def current_path(self):
+        return self.paths[self.index] if self.paths else None
+
+    def advance(self, step=1):
+        """Moves to the next (or, with step=-1, previous) frame."""
+        if self.paths:
+            self.index = (self.index + step) % len(self.paths)
+
+    def show(self):
+        """
+        Puts the current frame in the display buffer (without updating the panel),
+        from the cache if possible. Returns True on success.
+        """
+        path = self.current_path()
+        frame = self.display_manager._framebuffer
+        cached = self.cache.get(path)
+        if cached is not None and frame is not None:
+            frame[:] = cached
+            return True
+
+        if not self.image_loader.load(path):
+            return False
+        self.flash_reads += 1
+        if frame is not None:
+            buffer = self._take_buffer()
+            if buffer is not None:
+                buffer[:] = frame
+                self.cache.put(path, buffer, framebuffer.BUFFER_SIZE)
+        return True
+
+    def prefetch(self):
+        """Loads the next frame into the cache, ready for the next advance."""
+        if len(self.paths) < 2 or self.display_manager._framebuffer is None:
+            return
+        path = self.paths[(self.index + 1) % len(self.paths)]
+        if path in self.cache:
+            return
+        buffer = self._take_buffer()
+        if buffer is None:
+            return
+        if self.image_loader.load(path, buffer):
+            self.flash_reads += 1
+            self.cache.put(path, buffer, framebuffer.BUFFER_SIZE)
+        else:
+            self._spare = buffer
+
+    def _take_buffer(self):
+        """
+        Returns a frame-sized buffer for a new cache entry, evicting (and reusing the
+        buffers of) the least recently used frames to stay within the byte budget and
+        the free heap reserve. Returns None if the cache can't hold a frame at all.
+        """
+        cache = self.cache
+        if cache.capacity < framebuffer.BUFFER_SIZE:
+            return None
+        buffer, self._spare = self._spare, None
+        while cache.size + framebuffer.BUFFER_SIZE > cache.capacity:
+            buffer = cache.pop_oldest()[1]
+        if buffer is not None:
+            return buffer
+
+        free = _mem_free()
+        if free is not None and free < framebuffer.BUFFER_SIZE + self.MIN_FREE_BYTES:
+            gc.collect()
+            free = _mem_free()
+        if free is None or free >= framebuffer.BUFFER_SIZE + self.MIN_FREE_BYTES:
+            try:
+                return bytearray(framebuffer.BUFFER_SIZE)
+            except MemoryError:
+                pass
+        if len(cache):
+            return cache.pop_oldest()[1] # Low on heap: recycle the oldest frame instead
+        self._log("Slideshow: Not enough free memory to cache frames.")
+        return None
+
+    def get_stats(self):
+        """Returns frame cache statistics."""
+        return {
+            "frames": len(self.paths),
+            "cached": len(self.cache),
+            "cache_bytes": self.cache.size,
+            "hits": self.cache.hits,
+            "misses": self.cache.misses,
+            "flash_reads": self.flash_reads,
+        }
@@ -0,0 +1,125 @@
+# text_cache.py (Version 0.1.0 - Cached text measurement and pre-rasterised labels)
+# PicoGraphics re-rasterises scaled bitmap text on every call. Most of what the screens
+# draw changes once a day at most (day name, date, week, rickdate), so TextCache keeps
+# those as ready-made framebuffer bitmaps and blits them in instead of drawing them again.
+#
+# Cached bitmaps are stored in the panel's own layout (see framebuffer.py): a run of
+# columns, each `banks` bytes tall. They are combined into the frame with AND, so only
+# their black pixels are applied and whatever is already drawn around them is kept.
+
+import framebuffer
+from lru_cache import LRUCache
+
+try:
+    import framebuf # MicroPython's C blitter, used when available
+except ImportError:
+    framebuf = None
+
+class TextCache:
+    """
+    Memoises measure_text() and caches rasterised text for DisplayManager.
+    Both caches are LRU-bounded: measurements by entry count, bitmaps by bytes.
+    """
+    def __init__(self, display_manager, max_measurements=64, max_bitmap_bytes=8192):
+        self.display_manager = display_manager
+        self.measurements = LRUCache(max_measurements)
+        self.bitmaps = LRUCache(max_bitmap_bytes)
+
+    def measure(self, text, scale=1):
+        """Returns the pixel width of text, as display.measure_text() would."""
+        key = (text, scale, self.display_manager.font)
+        width = self.measurements.get(key)
+        if width is None:
+            width = self.display_manager.display.measure_text(text, scale=scale)
+            self.measurements.put(key, width)
+        return width
+
+    def draw(self, text, x, y, scale=1):
+        """
+        Draws text in black at (x, y), blitting a cached bitmap if this string was
+        drawn before at the same scale and vertical alignment.
+        Falls back to display.text() when the framebuffer is not accessible.
+        """
+        display_manager = self.display_manager
+        frame = display_manager._framebuffer
+        display_manager.display.set_pen(display_manager.BLACK)
+        if frame is None:
+            display_manager.display.text(text, x, y, scale=scale)
+            return
+
+        width = self.measure(text, scale)
+        region = self._region(x, y, width, scale)
+        if region is None or region[1] != width:
+            # Off-panel or clipped at the left/right edge: not worth caching
+            display_manager.display.text(text, x, y, scale=scale)
+            return
+
+        # A bitmap only lines up with the banks if drawn at the same y offset within a bank
+        key = (text, scale, display_manager.font, y & 7, region[3])
+        bitmap = self.bitmaps.get(key)
+        if bitmap is None:
+            bitmap = self._rasterise(frame, text, x, y, scale, region)
+            self.bitmaps.put(key, bitmap, len(bitmap))
+        else:
+            _and_blit(frame, bitmap, region)
+
+    def clear(self):
+        """Drops all cached measurements and bitmaps (e.g. after changing font)."""
+        self.measurements.clear()
+        self.bitmaps.clear()
+
+    def _region(self, x, y, width, scale):
+        """
+        Returns the (first_column, column_count, first_bank, bank_count) area that text
+        drawn at (x, y) covers, clipped to the panel, or None if nothing is visible.
+        The height has a spare text row of margin so descenders are never clipped.
+        """
+        x0 = max(0, x)
+        x1 = min(framebuffer.WIDTH, x + width)
+        bank0 = max(0, y) >> 3
+        bank1 = min(framebuffer.BANKS, ((y + 9 * scale - 1) >> 3) + 1)
+        if x1 <= x0 or bank1 <= bank0:
+            return None
+        return (x0, x1 - x0, bank0, bank1 - bank0)
+
+    def _rasterise(self, frame, text, x, y, scale, region):
+        """
+        Draws text with PicoGraphics onto a blank (white) patch of the frame, copies
+        the patch out as the cached bitmap, then merges back what was there before.
+        """
+        first_column, columns, first_bank, banks = region
+        saved = _copy_region(frame, region)
+        for column in range(first_column, first_column + columns):
+            start = column * framebuffer.BANKS + first_bank
+            frame[start:start + banks] = b"\xff" * banks
+        self.display_manager.display.text(text, x, y, scale=scale)
+        bitmap = _copy_region(frame, region)
+        _and_blit(frame, saved, region)
+        return bitmap
+
+
+def _copy_region(frame, region):
+    """Returns a bytearray copy of a (first_column, columns, first_bank, banks) area of the frame."""
+    first_column, columns, first_bank, banks = region
+    copy = bytearray(columns * banks)
+    for i in range(columns):
+        start = (first_column + i) * framebuffer.BANKS + first_bank
+        copy[i * banks:(i + 1) * banks] = frame[start:start + banks]
+    return copy
+
+
+def _and_blit(frame, bitmap, region):
+    """ANDs a bitmap into the frame: its black (0) pixels are applied, white (1) pixels are transparent."""
+    first_column, columns, first_bank, banks = region
+    if framebuf:
+        # Seen transposed, the panel layout is MONO_HLSB with x = panel y and y = panel x,
+        # and blitting with key=1 skips the white pixels.
+        target = framebuf.FrameBuffer(frame, framebuffer.HEIGHT, framebuffer.WIDTH, framebuf.MONO_HLSB)
+        source = framebuf.FrameBuffer(bitmap, banks * framebuffer.BANK_HEIGHT, columns, framebuf.MONO_HLSB)
+        target.blit(source, first_bank * framebuffer.BANK_HEIGHT, first_column, 1)
+        return
+    for i in range(columns):
+        start = (first_column + i) * framebuffer.BANKS + first_bank
+        offset = i * banks
+        for bank in range(banks):
+            frame[start + bank] &= bitmap[offset + bank]
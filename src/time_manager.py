@@ -1,47 +1,79 @@
 # time_manager.py (Version 0.1.0 - Combined and comprehensive)
 
 import utime # Use utime for consistency with localtime, mktime, etc.
-import ntptime # For NTP synchronization
-import machine # For machine.reset() if needed, or other machine-specific ops
-import gc      # For garbage collection
+from ntp_client import NtpClient
+from rtc_drift import DriftModel
+from boot_profiler import profiler
 
 class TimeManager:
     """
     Manages time-related operations, including NTP synchronization,
     automatic British Summer Time (BST) calculation,
     date formatting, and custom time formats like 'rickdate'.
-    Assumes the system's RTC is set to UTC by NTP.
+    Assumes the system's RTC is set to UTC by NTP, and corrects it for the RTC's
+    estimated drift between syncs.
     """
-    def __init__(self, ntp_server, display_manager_instance=None):
-        self.ntp_server = ntp_server
+    def __init__(self, ntp_servers, display_manager_instance=None, ntp_timeout_ms=2000, drift_model=None):
+        self.ntp_servers = ntp_servers # "host" or "host:port", queried all at once
         self.last_sync_time = 0
-        self.NTP_RESYNC_INTERVAL_SECONDS = 3600 * 24 # Resync every 24 hours (can be adjusted)
+        self.residual_ms = 0 # RTC offset left after the last sync (small offsets aren't stepped)
         self.display_manager = display_manager_instance # For logging messages to display
+        self.ntp_client = NtpClient(ntp_servers, display_manager_instance, ntp_timeout_ms)
+        self.drift_model = drift_model or DriftModel(display_manager_instance)
+        self.resync_interval_s = self.drift_model.interval_s() # Adapted to the RTC's drift after each sync
 
-    def _log(self, message):
+    def _log(self, message, *args):
         """Internal helper to log messages to display (if available) and console."""
         if self.display_manager:
-            self.display_manager.add_log_message(message)
+            self.display_manager.add_log_message(message, *args)
 
-    def sync_ntp_time(self):
-        """Synchronizes the Pico W's RTC with NTP (UTC time)."""
+    async def sync_ntp_time(self):
+        """Synchronizes the Pico W's RTC with NTP (UTC time), without blocking the event loop."""
+        with profiler.span("ntp"):
+            return await self._sync_ntp_time()
+
+    async def _sync_ntp_time(self):
         try:
-            self._log(f"Setting NTP server to {self.ntp_server}")
-            ntptime.host = self.ntp_server
-            ntptime.settime() # This sets the RTC to UTC time from NTP
+            if not await self.ntp_client.sync(): # Sets the RTC to UTC time from NTP
+                return False
+            self._update_drift(self.ntp_client.last)
             self.last_sync_time = utime.time() # Store UTC timestamp of last sync
             self._log("RTC synchronized with NTP (UTC).")
             return True
         except Exception as e:
-            self._log(f"Failed to sync RTC with NTP: {e}")
+            self._log("Failed to sync RTC with NTP: {}", e)
             return False
 
-    def check_and_sync_ntp(self):
-        """Checks if NTP resync is needed and performs it."""
-        if utime.time() - self.last_sync_time >= self.NTP_RESYNC_INTERVAL_SECONDS:
-            self._log("NTP resync interval reached. Resyncing...")
-            self.sync_ntp_time()
-            gc.collect() # Clean up memory after sync
+    def _update_drift(self, result):
+        """Feeds the drift since the last sync to the drift model and picks the next resync interval."""
+        offset_ms = result["offset_ms"] # None if it couldn't be measured to better than a second
+        if self.is_synced() and offset_ms is not None:
+            elapsed_s = utime.time() - self.last_sync_time
+            if self.drift_model.update(offset_ms - self.residual_ms, elapsed_s):
+                stats = self.drift_model.get_stats()
+                self._log("RTC drift {} ppm (+-{}), next sync in {} min.",
+                          stats["ppm"], stats["uncertainty_ppm"], stats["interval_s"] // 60)
+        self.residual_ms = 0 if result["stepped"] else offset_ms
+        self.resync_interval_s = self.drift_model.interval_s()
+
+    def now(self):
+        """
+        UTC epoch seconds: the RTC time plus its predicted drift since the last sync
+        (just the RTC time until the first sync).
+        """
+        rtc = utime.time()
+        if not self.is_synced():
+            return rtc
+        correction_ms = self.residual_ms + self.drift_model.predicted_ms(rtc - self.last_sync_time)
+        return rtc + int(correction_ms + 500) // 1000 # Rounded to the nearest second
+
+    def is_synced(self):
+        """True once the RTC has been set from NTP at least once."""
+        return self.last_sync_time != 0
+
+    def sync_due(self):
+        """True if the RTC has never been synced, or the (drift-adapted) resync interval has passed."""
+        return not self.is_synced() or utime.time() - self.last_sync_time >= self.resync_interval_s
 
     def to_base36(self, num):
         """Converts an integer to a base-36 string."""
@@ -93,7 +125,7 @@ class TimeManager:
         Assumes RTC is set to UTC by sync_ntp_time.
         Returns a tuple: (local_time_struct_tuple, offset_seconds).
         """
-        utc_time_tuple = utime.localtime(utime.time()) # Get current UTC time from RTC
+        utc_time_tuple = utime.localtime(self.now()) # Current UTC time from the RTC, drift-corrected
         year, month, day, hour, minute, second, weekday, yearday = utc_time_tuple
 
         is_bst_active = self.is_bst(year, month, day, weekday)
@@ -108,6 +140,15 @@ class TimeManager:
         
         return local_time_tuple, offset_seconds
 
+    def ms_until_next_minute(self):
+        """
+        Returns the number of milliseconds until the next local minute boundary.
+        The RTC only has whole-second resolution, so the result errs on the late side
+        by less than a second (a redraw never happens before the minute has changed).
+        """
+        local_time_tuple, _ = self.get_london_localtime()
+        return (60 - local_time_tuple[5]) * 1000
+
     def get_formatted_datetime(self, time_tuple: tuple) -> tuple:
         """
         Formats a utime.struct_time tuple into a specific set of strings.
@@ -0,0 +1,119 @@
+# widgets.py (Version 0.1.0 - Retained-mode widgets for screens)
+# A screen declares its elements once as Labels positioned in columns. Layout is worked
+# out when the screen is built; on each render the screen only sets the labels' values,
+# and only labels whose value changed are erased and redrawn. Everything else stays in
+# the framebuffer from the previous render, so the partial update only covers what changed.
+
+LEFT = "left"
+RIGHT = "right"
+
+CHAR_HEIGHT = 8 # bitmap8 glyph height at scale 1
+
+class Label:
+    """
+    A single line of text at a fixed position, bound to a value.
+
+    Args:
+        scale: Text scale (height is CHAR_HEIGHT * scale pixels).
+        align: LEFT (x is the left edge) or RIGHT (x is the right edge).
+        cached: Draw through DisplayManager's text cache (for values that rarely change).
+        text: Initial value, e.g. for fixed labels.
+    """
+    def __init__(self, scale=1, align=LEFT, cached=False, text=""):
+        self.scale = scale
+        self.align = align
+        self.cached = cached
+        self.text = text
+        self.x = 0
+        self.y = 0
+        self.dirty = True
+        self.drawn_box = None # (x, y, w, h) of the text currently in the framebuffer
+
+    @property
+    def height(self):
+        return CHAR_HEIGHT * self.scale
+
+    def set(self, text):
+        """Binds a new value; the label is only redrawn if it differs from the current one."""
+        if text != self.text:
+            self.text = text
+            self.dirty = True
+
+    def erase(self, display_manager):
+        """Clears the previously drawn text (if any) back to white."""
+        if self.drawn_box:
+            display_manager.display.set_pen(display_manager.WHITE)
+            display_manager.display.rectangle(*self.drawn_box)
+            self.drawn_box = None
+
+    def draw(self, display_manager):
+        """Draws the current value (call erase() first if it was drawn before)."""
+        if self.text:
+            width = display_manager.measure_text(self.text, scale=self.scale)
+            x = self.x - width if self.align == RIGHT else self.x
+            display_manager.draw_text(self.text, x, self.y, scale=self.scale, cached=self.cached)
+            # Erase one extra row of text pixels below, for descenders (column gaps are >= scale)
+            self.drawn_box = (x, self.y, width, self.height + self.scale)
+        self.dirty = False
+
+    def overlaps(self, box):
+        """Returns True if this label's drawn text intersects the (x, y, w, h) box."""
+        if not self.drawn_box or not box:
+            return False
+        x, y, w, h = self.drawn_box
+        return x < box[0] + box[2] and box[0] < x + w and y < box[1] + box[3] and box[1] < y + h
+
+
+def layout_column(x, y, labels, gap=5, align=LEFT):
+    """
+    Positions labels in a vertical stack from (x, y), with gap pixels between them.
+    With align=RIGHT, x is the right edge and the labels are right-aligned.
+    Called once when a screen is built.
+    """
+    for label in labels:
+        label.align = align
+        label.x = x
+        label.y = y
+        y += label.height + gap
+
+
+class WidgetScreen:
+    """
+    A screen made of named labels (already positioned with layout_column).
+    render() redraws only the labels whose value changed, unless another screen
+    has drawn into the framebuffer since.
+    """
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+
+    def set(self, **values):
+        """Sets label values by name."""
+        for name, text in values.items():
+            self.labels[name].set(text)
+
+    def render(self, display_manager):
+        """Draws dirty labels into the buffer and pushes the changes to the panel."""
+        if display_manager.begin_screen(self.name):
+            # The buffer was cleared or holds another screen: redraw everything
+            for label in self.labels.values():
+                label.dirty = True
+                label.drawn_box = None
+        labels = self.labels.values()
+        # Erasing a label also wipes any neighbour it overlaps, so those are redrawn too
+        changed = True
+        while changed:
+            changed = False
+            for label in labels:
+                if label.dirty:
+                    for other in labels:
+                        if not other.dirty and other.overlaps(label.drawn_box):
+                            other.dirty = True
+                            changed = True
+
+        dirty = [label for label in labels if label.dirty]
+        for label in dirty:
+            label.erase(display_manager)
+        for label in dirty:
+            label.draw(display_manager)
+        display_manager.update()
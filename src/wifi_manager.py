@@ -1,15 +1,34 @@
-# wifi_manager.py (Version 0.1.7 - Optimized for minimal display updates)
+# wifi_manager.py (Version 0.2.0 - Fast reconnects from a cached access point)
+# After each successful connection the access point's BSSID and channel, and the IP
+# configuration DHCP gave us, are saved to flash (only when they change). The next
+# connection first tries a targeted connect to that BSSID/channel, which skips the scan;
+# with reuse_ip it also sets the saved IP configuration statically, skipping DHCP. If that
+# doesn't connect within FAST_CONNECT_MS the cache is dropped and a normal connect (scan,
+# association, DHCP) follows. Connection progress is polled every POLL_MS on ticks_ms.
+#
+# Ports that don't report the BSSID/channel or don't accept them in connect() simply
+# get a cache without them (or fall back to a plain connect).
 
 import network
-import time
+import os
+import utime
 import machine
+import json
+import binascii
+from ring_log import DEBUG
+from boot_profiler import profiler
+
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio # CPython (host simulator)
 
 class WifiManager:
     """
     Manages Wi-Fi connections.
     Requires a DisplayManager instance for visual feedback.
     """
-    def __init__(self, ssid, password, display_manager, led_pin=None):
+    def __init__(self, ssid, password, display_manager, led_pin=None, cache_path="wifi_cache.json", reuse_ip=False, power_on=True):
         self.ssid = ssid
         self.password = password
         self.display_manager = display_manager 
@@ -19,7 +38,64 @@ class WifiManager:
             self.led = machine.Pin(led_pin, machine.Pin.OUT)
             self.led.value(0) 
 
-        self.wlan.active(True) # Activate WLAN interface when manager is initialized
+        self.FAST_CONNECT_MS = 3000 # Give up on the cached access point after this long
+        self.POLL_MS = 50           # Connection status polling interval
+
+        self.cache_path = cache_path
+        self.reuse_ip = reuse_ip # Set the cached IP configuration statically (only if the network allows it)
+        self.cache = self._load_cache() # {"ssid", "bssid", "channel", "ifconfig"} of the last good connection
+        self.fast_connects = 0
+        self.full_connects = 0
+        self.last_connect_ms = None # Time the last successful connection took
+
+        if power_on:
+            self.wlan.active(True) # Activate WLAN interface when manager is initialized (else on the first connect)
+
+    # --- Reconnect cache ---
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path) as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if isinstance(cache, dict) and cache.get("ssid") == self.ssid:
+            return cache
+        return None # Saved for another network
+
+    def _config(self, name):
+        """Returns wlan.config(name), or None where the port doesn't report it."""
+        try:
+            return self.wlan.config(name)
+        except (ValueError, OSError, TypeError):
+            return None
+
+    def _save_cache(self):
+        """Saves the current connection's details, if they differ from the saved ones."""
+        bssid = self._config("bssid")
+        cache = {
+            "ssid": self.ssid,
+            "bssid": binascii.hexlify(bssid).decode() if bssid else None,
+            "channel": self._config("channel"),
+            "ifconfig": list(self.wlan.ifconfig()),
+        }
+        if cache == self.cache:
+            return
+        try:
+            with open(self.cache_path, "w") as f:
+                json.dump(cache, f)
+            self.cache = cache
+        except OSError as e:
+            self.display_manager.add_log_message("WiFi: Error saving {}: {}", self.cache_path, e)
+
+    def _forget_cache(self):
+        self.cache = None
+        try:
+            os.remove(self.cache_path)
+        except OSError:
+            pass
+
+    # --- Connecting ---
 
     def connect_to_wifi(self, timeout_seconds=20):
         """
@@ -27,30 +103,122 @@ class WifiManager:
         Does NOT provide visual feedback on screen unless there's an error.
         Logs messages to console via DisplayManager.
         """
+        with profiler.span("wifi"):
+            if self._start_connect():
+                return True
+
+            start = utime.ticks_ms()
+            # Loop without refreshing screen, just waiting for connection
+            if self.cache:
+                self._begin(fast=True)
+                while self._waiting(start, self.FAST_CONNECT_MS):
+                    utime.sleep_ms(self.POLL_MS)
+                if self.wlan.isconnected():
+                    return self._finish_connect(show_error=True, start=start, fast=True)
+                self._fast_connect_failed()
+
+            self._begin(fast=False)
+            full_start = utime.ticks_ms()
+            while self._waiting(full_start, timeout_seconds * 1000):
+                # No display updates in this loop to minimize flashes
+                utime.sleep_ms(self.POLL_MS) # Still pause to avoid busy-waiting
+
+            return self._finish_connect(show_error=True, start=start)
+
+    async def connect_async(self, timeout_seconds=20, poll_ms=None):
+        """
+        Like connect_to_wifi, but waits for the connection without blocking other
+        asyncio tasks, and doesn't take over the screen on failure.
+        """
+        poll_ms = poll_ms or self.POLL_MS
+        with profiler.span("wifi"):
+            if self._start_connect():
+                return True
+
+            start = utime.ticks_ms()
+            if self.cache:
+                self._begin(fast=True)
+                while self._waiting(start, self.FAST_CONNECT_MS):
+                    await asyncio.sleep(poll_ms / 1000)
+                if self.wlan.isconnected():
+                    return self._finish_connect(show_error=False, start=start, fast=True)
+                self._fast_connect_failed()
+
+            self._begin(fast=False)
+            full_start = utime.ticks_ms()
+            while self._waiting(full_start, timeout_seconds * 1000):
+                await asyncio.sleep(poll_ms / 1000)
+
+            return self._finish_connect(show_error=False, start=start)
+
+    def _waiting(self, start, timeout_ms):
+        """True while a connection attempt is still in progress."""
+        if self.wlan.isconnected():
+            return False
+        if self.wlan.status() < 0: # Failed for good (wrong password, no AP, ...), don't wait out the timeout
+            return False
+        return utime.ticks_diff(utime.ticks_ms(), start) < timeout_ms
+
+    def _start_connect(self):
+        """Prepares a connection attempt. Returns True if already connected."""
         if self.wlan.isconnected():
             ip_info = self.wlan.ifconfig()
-            self.display_manager.add_log_message(f"Already connected. IP: {ip_info[0]}")
+            self.display_manager.add_log_message("Already connected. IP: {}", ip_info[0])
             return True
 
-        self.display_manager.add_log_message(f"Attempting connection to SSID: {self.ssid}...")
+        self.display_manager.add_log_message("Attempting connection to SSID: {}...", self.ssid)
+        if not self.wlan.active():
+            self.wlan.active(True) # Powered down by power_down()
         
         # --- REMOVED: Initial "Connecting WiFi..." screen display ---
         # No screen update here to keep screen blank during successful connection attempt
 
         if self.led:
             self.led.value(1)  # Turn LED on during connection attempt
+        return False
 
+    def _begin(self, fast):
+        """Starts connecting: to the cached access point (and IP configuration) if fast, else normally."""
+        if fast:
+            cache = self.cache
+            if self.reuse_ip and cache.get("ifconfig"):
+                self.wlan.ifconfig(tuple(cache["ifconfig"])) # Static: no DHCP round trips
+            options = {}
+            if cache.get("bssid"):
+                options["bssid"] = binascii.unhexlify(cache["bssid"])
+            if cache.get("channel"):
+                options["channel"] = cache["channel"]
+            try:
+                self.wlan.connect(self.ssid, self.password, **options)
+                return
+            except TypeError:
+                pass # This port's connect() doesn't take bssid/channel
         self.wlan.connect(self.ssid, self.password)
 
-        start_time = time.time()
-        # Loop without refreshing screen, just waiting for connection
-        while not self.wlan.isconnected() and (time.time() - start_time) < timeout_seconds:
-            # No display updates in this loop to minimize flashes
-            time.sleep(1) # Still pause to avoid busy-waiting
+    def _fast_connect_failed(self):
+        """The cached access point didn't answer: forget it and go back to DHCP."""
+        self.display_manager.add_log_message("WiFi: fast reconnect failed, scanning.", level=DEBUG)
+        self.wlan.disconnect()
+        if self.reuse_ip:
+            try:
+                self.wlan.ifconfig("dhcp")
+            except (ValueError, OSError, TypeError):
+                pass
+        self._forget_cache()
 
+    def _finish_connect(self, show_error, start=None, fast=False):
+        """Logs the outcome of a connection attempt. Returns True if connected."""
         if self.wlan.isconnected():
             ip_info = self.wlan.ifconfig()
-            self.display_manager.add_log_message(f"WiFi Connected! IP: {ip_info[0]}")
+            if start is not None:
+                self.last_connect_ms = utime.ticks_diff(utime.ticks_ms(), start)
+            if fast:
+                self.fast_connects += 1
+            else:
+                self.full_connects += 1
+            self.display_manager.add_log_message("WiFi Connected! IP: {} ({} ms{})", ip_info[0],
+                                                 self.last_connect_ms, ", cached AP" if fast else "")
+            self._save_cache()
             
             if self.led:
                 self.led.value(0) # Turn LED off on success
@@ -62,9 +230,21 @@ class WifiManager:
             self.display_manager.add_log_message("WiFi Connection Failed!")
             if self.led:
                 self.led.value(0) # Turn LED off on failure
-            self.display_manager.show_connection_error() # ONLY display feedback on error
+            if show_error:
+                self.display_manager.show_connection_error() # ONLY display feedback on error
             return False
 
     def is_connected(self):
         """Checks if the Wi-Fi interface is currently connected."""
-        return self.wlan.isconnected()
\ No newline at end of file
+        return self.wlan.isconnected()
+
+    def is_active(self):
+        """Checks if the WLAN chip is powered up."""
+        return self.wlan.active()
+
+    def power_down(self):
+        """Disconnects and powers the WLAN chip down (low-power mode); the next connect powers it up."""
+        if self.wlan.active():
+            self.wlan.disconnect()
+            self.wlan.active(False)
+            self.display_manager.add_log_message("WiFi powered down.", level=DEBUG)
@@ -0,0 +1,151 @@
+# wifi_supervisor.py (Version 0.1.0 - Background WiFi connection state machine)
+# Keeps WiFi connected without ever holding up the screens:
+#
+#   CONNECTING --ok--> CONNECTED --link lost--> CONNECTING
+#       |                                           ^
+#       +--failed--> BACKOFF --delay (or retry_now)-+
+#
+# Failed attempts are retried after an exponential backoff (retry_min doubling up to
+# retry_max) with +-25% random jitter, so a roomful of displays doesn't hit the access
+# point at the same moment after it restarts. While connected the link is checked every
+# CHECK_INTERVAL_MS and a loss starts reconnecting straight away. After DEGRADED_AFTER
+# failures in a row the device is "offline": screens keep running from the RTC and show
+# the status line from status_text().
+
+import random
+import utime
+
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio # CPython (host simulator)
+
+OFF = "off"               # Radio powered down (low-power mode) or not started
+CONNECTING = "connecting"
+CONNECTED = "connected"
+BACKOFF = "backoff"       # Waiting to retry after a failed attempt
+
+def backoff_delay_ms(failures, min_ms, max_ms, jitter=0.25):
+    """
+    Delay before retrying after failures failures in a row: min_ms doubling with each
+    failure, capped at max_ms, with +-jitter random spread. Also used for network jobs.
+    """
+    delay = min_ms << min(max(failures - 1, 0), 16)
+    delay = min(delay, max_ms)
+    spread = (random.getrandbits(8) / 128 - 1) * jitter # -jitter .. +jitter
+    return int(delay * (1 + spread))
+
+class WifiSupervisor:
+    """
+    Runs the WiFi connection state machine on top of a WifiManager.
+    on_change(state), if set, is called on every state change.
+    """
+    def __init__(self, wifi_manager, display_manager, wifi_config=None, connect=None):
+        wifi_config = wifi_config or {}
+        self.wifi_manager = wifi_manager
+        self.display_manager = display_manager
+        self.connect = connect or wifi_manager.connect_async # Coroutine function returning True if connected
+
+        self.RETRY_MIN_MS = int(wifi_config.get("retry_min", 5) * 1000)
+        self.RETRY_MAX_MS = int(wifi_config.get("retry_max", 600) * 1000)
+        self.JITTER = 0.25
+        self.CHECK_INTERVAL_MS = 5 * 1000
+        self.DEGRADED_AFTER = 3 # Failures in a row before the device counts as offline
+
+        self.state = OFF
+        self.failures = 0        # Failed attempts since the last successful connection
+        self.retry_at = None     # ticks_ms of the next attempt while in BACKOFF
+        self.connects = 0
+        self.link_losses = 0
+        self.on_change = None
+        self._wake = None        # asyncio.Event, created in run() (inside the event loop)
+
+    def _log(self, message, *args):
+        """Internal helper to log messages to display (if available) and console."""
+        if self.display_manager:
+            self.display_manager.add_log_message(message, *args)
+
+    def _set_state(self, state):
+        if state != self.state:
+            self.state = state
+            if self.on_change:
+                self.on_change(state)
+
+    def degraded(self):
+        """True after DEGRADED_AFTER failed attempts in a row."""
+        return self.failures >= self.DEGRADED_AFTER
+
+    def backoff_ms(self):
+        """Delay before the next attempt: doubles with each failure, capped, with jitter."""
+        return backoff_delay_ms(self.failures, self.RETRY_MIN_MS, self.RETRY_MAX_MS, self.JITTER)
+
+    def status_text(self):
+        """
+        Short status for screens: "" unless attempts are failing, so the routine
+        connect/disconnect of each network window doesn't change the screen.
+        """
+        if not self.failures:
+            return ""
+        if self.state == CONNECTING:
+            return "WiFi retrying"
+        if self.state in (BACKOFF, OFF):
+            return "Offline" if self.degraded() else "WiFi retrying"
+        return ""
+
+    async def connect_once(self):
+        """Makes one connection attempt and updates the state. Returns True if connected."""
+        self._set_state(CONNECTING)
+        if await self.connect():
+            self.failures = 0
+            self.connects += 1
+            self._set_state(CONNECTED)
+            return True
+        self.failures += 1
+        self._set_state(BACKOFF)
+        return False
+
+    def power_down(self):
+        """Powers the radio down (low-power mode). A failure streak is kept for status_text()."""
+        self.wifi_manager.power_down()
+        self._set_state(OFF)
+
+    def retry_now(self):
+        """Cuts a backoff wait short (e.g. "Press A to retry")."""
+        if self._wake:
+            self._wake.set()
+
+    async def _wait(self, ms):
+        """Waits ms, or until retry_now()."""
+        try:
+            await asyncio.wait_for(self._wake.wait(), ms / 1000)
+        except asyncio.TimeoutError:
+            pass
+        self._wake.clear()
+
+    async def run(self):
+        """Connects, watches the link and reconnects, forever."""
+        self._wake = asyncio.Event()
+        while True:
+            if self.state == CONNECTED:
+                await self._wait(self.CHECK_INTERVAL_MS)
+                if self.wifi_manager.is_connected():
+                    continue
+                self.link_losses += 1
+                self._log("WiFi link lost, reconnecting.")
+            elif self.state == BACKOFF:
+                delay = self.backoff_ms()
+                self.retry_at = utime.ticks_add(utime.ticks_ms(), delay)
+                self._log("WiFi: attempt {} failed, retrying in {} s.", self.failures, delay // 1000)
+                await self._wait(delay)
+                self.retry_at = None
+            await self.connect_once()
+
+    def get_stats(self):
+        """Returns a dict with the state and connection counters."""
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "degraded": self.degraded(),
+            "connects": self.connects,
+            "link_losses": self.link_losses,
+        }